@@ -1,12 +1,22 @@
 from flask import Flask, jsonify, request, g
+import atexit
+import os
+import queue
 import sqlite3
+import threading
 from datetime import datetime
 
 app = Flask(__name__)
 
-conn = sqlite3.connect("database.db")
+DATABASE = "database.db"
+
+INSERT_JOB = "INSERT INTO microgrids (Node, CPU, Completed_at) VALUES (?, ?, ?)"
+
+# Seconds over which single /schedule-job posts are coalesced into one commit; 0 commits every post right away
+WRITE_BEHIND_INTERVAL = float(os.environ.get("WRITE_BEHIND_INTERVAL", 0))
 
 count = 0
+count_lock = threading.Lock()
 
 state_object = None
 
@@ -30,19 +40,109 @@ def insert():
 
 @app.route("/delete-db", methods=["DELETE"])
 def delete_db():
-    conn = sqlite3.connect("database.db")
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM microgrids")
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with get_db() as conn:
+        conn.execute("DELETE FROM microgrids")
     return jsonify({"message": "Database cleared!"}), 200
 
 
-@app.route("/schedule-job", methods=["POST"])
-def schedule_job():
+def get_db():
+    """
+    Connection for the current request, opened on first use and closed on teardown.
+    """
+    if "db" not in g:
+        g.db = sqlite3.connect(DATABASE)
+    return g.db
+
+
+@app.teardown_appcontext
+def close_db(exception):
+    db = g.pop("db", None)
+    if db is not None:
+        db.close()
+
+
+def insert_jobs(connection, rows):
+    """
+    Insert rows of (Node, CPU, Completed_at) in a single transaction.
+    """
     global count
-    body = request.get_json()
+    with connection:
+        connection.executemany(INSERT_JOB, rows)
+
+    # Updated from both the request threads and the write-behind thread
+    with count_lock:
+        first = count
+        count += len(rows)
+
+    print("Inserted number ", first, "to", first + len(rows) - 1)
+
+
+class WriteBehindQueue:
+    """
+    Coalesces single job inserts into batched commits.
+
+    Rows put on the queue are inserted by a background thread, in one transaction per `interval` seconds.
+    Rows still queued when the process exits are flushed.
+    """
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self._rows = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def put(self, row):
+        self._rows.put(row)
+
+    def _run(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            while not self._stopped.is_set():
+                try:
+                    rows = [self._rows.get(timeout=self.interval)]
+                except queue.Empty:
+                    continue
+
+                # Let the batch fill up for the rest of the interval
+                self._stopped.wait(self.interval)
+                rows.extend(self._drain())
+                insert_jobs(connection, rows)
+
+            rows = self._drain()
+            if rows:
+                insert_jobs(connection, rows)
+        finally:
+            connection.close()
+
+    def _drain(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self._rows.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def stop(self):
+        """
+        Insert any queued rows and stop the background thread.
+        """
+        self._stopped.set()
+        self._thread.join()
+
+
+write_behind = WriteBehindQueue(DATABASE, WRITE_BEHIND_INTERVAL) if WRITE_BEHIND_INTERVAL > 0 else None
+
+
+def parse_job(body):
+    """
+    Validate a job and convert it to a (Node, CPU, Completed_at) row.
+    Returns the row and None, or None and an error message.
+    """
+    if not isinstance(body, dict):
+        body = None
 
     if (
         not body
@@ -61,34 +161,53 @@ def schedule_job():
             if "Completed_at" not in body:
                 missing.append("Completed_at")
 
-        return jsonify({"error": f"Missing field(s): {', '.join(missing)}"}), 400
+        return None, f"Missing field(s): {', '.join(missing)}"
 
     try:
         completed_at_dt = datetime.fromisoformat(body["Completed_at"])
-    except ValueError:
-        return (
-            jsonify(
-                {
-                    "error": "Invalid datetime format for Completed_at. Expected ISO 8601 format like '2025-04-22T10:05:47'."
-                }
-            ),
-            400,
-        )
+    except (TypeError, ValueError):
+        return None, "Invalid datetime format for Completed_at. Expected ISO 8601 format like '2025-04-22T10:05:47'."
 
     # Format it to 'YYYY-MM-DD HH:MM:SS' string
     completed_at_str = completed_at_dt.strftime("%Y-%m-%d %H:%M:%S")
 
-    conn = sqlite3.connect("database.db")
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO microgrids (Node, CPU, Completed_at) VALUES (?, ?, ?)",
-        (body["Node"].upper(), body["CPU"], completed_at_str),
-    )
-    cursor.close()
-    conn.commit()
-    conn.close()
+    return (body["Node"].upper(), body["CPU"], completed_at_str), None
 
-    print("Inserted number ", count)
-    count += 1
+
+@app.route("/schedule-job", methods=["POST"])
+def schedule_job():
+    row, error = parse_job(request.get_json())
+    if error is not None:
+        return jsonify({"error": error}), 400
+
+    if write_behind is not None:
+        write_behind.put(row)
+        return jsonify({"message": "Queued!"}), 202
+
+    insert_jobs(get_db(), [row])
 
     return jsonify({"message": "Scheduled!"}), 201
+
+
+@app.route("/schedule-jobs", methods=["POST"])
+def schedule_jobs():
+    """
+    Schedule an array of jobs, either as the body itself or under "jobs", in a single transaction.
+    Nothing is inserted if any job is invalid.
+    """
+    body = request.get_json()
+    jobs = body.get("jobs") if isinstance(body, dict) else body
+
+    if not isinstance(jobs, list) or not jobs:
+        return jsonify({"error": "Expected a non-empty array of jobs"}), 400
+
+    rows = []
+    for index, job in enumerate(jobs):
+        row, error = parse_job(job)
+        if error is not None:
+            return jsonify({"error": f"Job {index}: {error}"}), 400
+        rows.append(row)
+
+    insert_jobs(get_db(), rows)
+
+    return jsonify({"message": "Scheduled!", "count": len(rows)}), 201
@@ -1,6 +1,4 @@
 import numpy as np
-import time
-import sqlite3
 import pandas as pd
 import requests
 import os
@@ -13,8 +11,16 @@ from pymgrid.modules import (
     LoadModule,
     GridModule,
     RenewableModule,
-    NodeModule,
+    NodeGroupModule,
+    PowerCurve,
+    ConstantSeries,
 )
+from pymgrid.utils.logger import CSVLogSink
+from functools import partial
+from sharded_fleet import ShardedFleet
+from load_repository import LoadRepository
+from tick_runner import TickRunner
+from input_cache import InputCache
 
 
 def get_column_names(dataframe: pd.DataFrame):
@@ -49,26 +55,17 @@ def remove_aggregated_microgrids(gridnames: list[str]):
     return result
 
 
-def db_load_retrieve():
+def db_load_retrieve(repository: LoadRepository = None, timestamp: datetime = None):
     """
     Retrieve the CPU load from the database for each node in the microgrid.
-    Only retrieves CPU loads that are not completed yet.
+    Only retrieves CPU loads that are not completed yet at `timestamp` (default: now).
+    Reuses the connection of `repository` if given, otherwise opens a one-off one.
     """
-    current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    connection = sqlite3.connect("database.db")
-    cursor = connection.execute(
-        "SELECT Node, SUM(CPU) "
-        "FROM microgrids "
-        "WHERE ? <= Completed_at "
-        "GROUP BY Node",
-        (current_timestamp,),
-    )
-    rows = cursor.fetchall()
-    cursor.close()
-    connection.close()
+    if repository is not None:
+        return repository.current_load(timestamp)
 
-    return rows
+    with LoadRepository("database.db") as repository:
+        return repository.current_load(timestamp)
 
 
 def grid_co2_emission(path: str) -> Dict[str, float]:
@@ -123,32 +120,15 @@ def update_grid_load(grid_dict: dict, rows: list, default_value: float = 120):
     """ 
     The corresponding CPU load in watts for each percentage of load.
     Based on the DELL EIPT for a default setting PowerEdge R660 Server with no additional selected processor and 4 x 32 gb RAM.
+    The CPU load is rounded to the nearest 10% and capped at 100%; nodes closer to 0%, or without any rows, are set to default_value.
     """
-    cpu_load_watts = {
-        "10": 118,
-        "20": 180,
-        "30": 203,
-        "40": 258,
-        "50": 281,
-        "60": 303,
-        "70": 331,
-        "80": 349,
-        "90": 362,
-        "100": 364,
-    }
+    power_curve = PowerCurve.poweredge_r660(idle_watts=default_value)
 
     row_updates = dict(rows)
+    keys = list(grid_dict.keys())
+    utilization = np.array([row_updates.get(key, 0.0) for key in keys], dtype=float)
 
-    for key in grid_dict.keys():
-        raw_value = row_updates.get(key, None)
-
-        if raw_value is not None:
-            # Round to nearest 10, cap at 100
-            rounded = min(round(float(raw_value) / 10) * 10, 100) # If the CPU load is closer to 0%, set to default_value and if it is closer to 10% set to 10%.
-            watt_value = cpu_load_watts.get(str(rounded), default_value)
-            grid_dict[key] = watt_value
-        else:
-            grid_dict[key] = default_value
+    grid_dict.update(zip(keys, power_curve(utilization).tolist()))
 
 
 def generate_grid_modules(c_names: list, co2: dict, final_step: int, electricity_price: dict):
@@ -164,11 +144,8 @@ def generate_grid_modules(c_names: list, co2: dict, final_step: int, electricity
         co2_value = co2.get(name, 999)  # Use 999 if not found
         electricity_value = electricity_price.get(name, 888)  # Use 999 if not found
 
-        import_price = np.full(final_step, electricity_value)
-        export_price = np.full(final_step, electricity_value * 0.9)  # Sell back to the grid for 90% of the import price
-        co2_series = np.full(final_step, co2_value)
-
-        time_series = np.array([import_price, export_price, co2_series]).T
+        # Import price, export price and CO2 are constant; sell back to the grid for 90% of the import price
+        time_series = ConstantSeries([electricity_value, electricity_value * 0.9, co2_value], final_step)
 
         grid = GridModule(max_import=100000, max_export=100000, time_series=time_series)
 
@@ -197,24 +174,20 @@ def generate_battery_modules(c_names: list):
     return battery_modules
 
 
-def generate_node_modules(c_names: list, final_step: int, grid_dict: dict):
+def generate_node_modules(c_names: list, grid_dict: dict):
     """
-    Generate the node modules for each grid name in the c_names list.
+    Generate one node group module, holding all nodes of the grid, for each grid name in the c_names list.
     The load is set to the value in the grid_dict for each node.
     """
     node_modules = {}
 
     for name in c_names:
-        #for i in range(1, 7):  # 1 through 6
-        for i in range (1, 3):
-            node_name = f"{name}-{i}"
-            node = NodeModule(
-                time_series=60 * np.random.rand(final_step),  # Ignored anyway
-                final_step=final_step,
-                load=grid_dict[node_name],  # Use the correct full key
-                node_name=node_name,
-            )
-            node_modules[node_name] = node
+        #node_names = [f"{name}-{i}" for i in range(1, 7)]  # 1 through 6
+        node_names = [f"{name}-{i}" for i in range(1, 3)]
+        node_modules[name] = NodeGroupModule(
+            node_names=node_names,
+            initial_loads=[grid_dict[node_name] for node_name in node_names],
+        )
 
     return node_modules
 
@@ -250,22 +223,59 @@ def generate_microgrids(
             ("pv_source", renewables[name]),
         ]
 
-        # Add the 6 node modules
-        #for i in range(1, 7):
-        for i in range(1, 3):
-            module_list.append(nodes[f"{name}-{i}"])
+        # Add the node group, a single module for all nodes of the grid
+        module_list.append(nodes[name])
 
         # Add the grid module
         module_list.append(grids[name])
 
-        # Create the microgrid
-        microgrid = Microgrid(module_list)
+        # Create the microgrid; the modules' time series are shared rather than copied
+        microgrid = Microgrid(module_list, share_time_series=True)
         microgrid.grid_name = name
         microgrids[name] = microgrid
 
     return microgrids
 
 
+def compute_dispatch(
+    net_load: np.ndarray,
+    soc: np.ndarray,
+    battery_max_charge_power: np.ndarray,
+    battery_max_discharge_power: np.ndarray,
+    grid_max_export_power: np.ndarray,
+    grid_max_import_power: np.ndarray,
+):
+    """
+    Compute the battery and grid commands of every microgrid from its net load.
+    A surplus charges the battery (unless it is full) and the rest is exported to the grid.
+    A deficit discharges the battery and the rest is imported from the grid.
+    """
+    surplus = np.maximum(net_load, 0.0)
+    deficit = np.maximum(-1.0 * net_load, 0.0)
+
+    charging = (net_load > 0) & (soc < 0.999)
+    charge_to_battery = np.where(charging, np.minimum(surplus, battery_max_charge_power), 0.0)
+    remaining_surplus = surplus - charge_to_battery
+    export_to_grid = np.where(
+        remaining_surplus > 0, np.minimum(remaining_surplus, grid_max_export_power), 0.0
+    )
+
+    discharge_from_battery = np.minimum(deficit, battery_max_discharge_power)
+    remaining_deficit = deficit - discharge_from_battery
+    import_from_grid = np.where(
+        remaining_deficit > 0, np.minimum(remaining_deficit, grid_max_import_power), 0.0
+    )
+
+    battery_command = np.where(
+        net_load > 0, -1.0 * charge_to_battery, np.where(net_load < 0, discharge_from_battery, 0.0)
+    )
+    grid_command = np.where(
+        net_load > 0, -1.0 * export_to_grid, np.where(net_load < 0, import_from_grid, 0.0)
+    )
+
+    return battery_command, grid_command
+
+
 def calculate_final_step(dataframe: pd.DataFrame):
     print("length is ", len(dataframe))
 
@@ -331,13 +341,95 @@ def prune_and_forward_fill_solar_data(dataframe: pd.DataFrame):
 
     return df_10min
 
+TOTAL_CAPACITY_OF_INSTALLATIONS = (
+    #1800.0  # W, such that it cannot fully cover the load of nodes at full capacity
+    3600.0 / 3  # W, such that it cannot fully cover the load of nodes at full capacity
+)
+
+# Steps of each zone's log buffered before they are appended to its CSV file: an hour of 10-minute steps.
+LOG_BATCH_SIZE = 6
+
+# Steps of each zone's log kept in memory: a day of 10-minute steps.
+LOG_RETENTION = 144
+
+
+def dispatch_policy(fleet, total_capacity_of_installations: float):
+    """
+    Battery and grid commands of every zone in `fleet` for its current node loads and renewable production.
+    """
+    # Total load of all nodes in each microgrid
+    net_load = -1.0 * fleet.zone_load + fleet.current_renewable * total_capacity_of_installations
+
+    return compute_dispatch(
+        net_load,
+        soc=fleet.battery_soc,
+        battery_max_charge_power=fleet.battery_max_consumption,
+        battery_max_discharge_power=fleet.battery_max_production,
+        grid_max_export_power=fleet.grid_max_consumption,
+        grid_max_import_power=fleet.grid_max_production,
+    )
+
+
+def attach_log_sink(microgrid: Microgrid):
+    """
+    Stream only the newly logged rows of each step to logs/<zone>.csv, appended in batches of LOG_BATCH_SIZE steps,
+    and keep only the last day of steps in memory.
+    """
+    microgrid.set_log_sink(
+        CSVLogSink(f"logs/{microgrid.grid_name}.csv", batch_size=LOG_BATCH_SIZE, overwrite=True),
+        drop_forecasts=True,
+    )
+    microgrid.set_log_retention(LOG_RETENTION)
+
+
+def load_inputs(solar_path: str, emissions_path: str, price_path: str, cache: InputCache):
+    """
+    Load the 10-minute solar data, the grid names, the average CO2 emission and the electricity price of each grid.
+    The preprocessed inputs are cached as memory-mapped arrays, keyed by a hash of the source files,
+    such that an unchanged set of source files is not parsed again.
+    """
+    key = cache.key(solar_path, emissions_path, price_path)
+    cached = cache.load(key)
+
+    if cached is None:
+        df = pd.read_csv(solar_path, dayfirst=True, parse_dates=["Time"])
+        df_solar = prune_and_forward_fill_solar_data(df)
+        column_names = remove_aggregated_microgrids(get_column_names(df_solar))
+        average_co2 = grid_co2_emission(emissions_path)
+        electricity_price_dict = electricity_price(price_path, column_names)
+
+        cache.store(
+            key,
+            arrays={
+                "time": pd.to_datetime(df_solar["Time"], format="%d-%b-%Y %H:%M:%S").to_numpy(),
+                "solar": df_solar.iloc[:, 1:].to_numpy(dtype=np.float64),
+            },
+            meta={
+                "zones": get_column_names(df_solar),
+                "column_names": column_names,
+                "average_co2": {zone: float(value) for zone, value in average_co2.items()},
+                "electricity_price": {zone: float(value) for zone, value in electricity_price_dict.items()},
+            },
+        )
+        cached = cache.load(key)
+    else:
+        print("Loaded preprocessed inputs from cache ", key[:12])
+
+    arrays, meta = cached
+
+    # Zone columns share the memory-mapped solar array, no copies are made
+    df_solar = pd.DataFrame(arrays["solar"], columns=meta["zones"], copy=False)
+    df_solar.insert(0, "Time", arrays["time"])
+
+    return df_solar, meta["column_names"], meta["average_co2"], meta["electricity_price"]
+
+
 def main():
-    # Load the solar data and setup variables for microgrid setup
-    df = pd.read_csv("data/solarPV.csv", dayfirst=True, parse_dates=["Time"])
-    df_solar = prune_and_forward_fill_solar_data(df)
-    #df_solar = pd.read_csv("data/solarPV.csv")
-    column_names_aggregated = get_column_names(df_solar)
-    column_names = remove_aggregated_microgrids(column_names_aggregated)
+    # Load the solar, CO2 emission and electricity price data and setup variables for microgrid setup.
+    # On a cache hit, no CSV file is parsed.
+    df_solar, column_names, average_co2, electricity_price_dict = load_inputs(
+        "data/solarPV.csv", "data/emissions", "data/estat_nrg_pc_204.csv", InputCache("data/cache")
+    )
     # print(column_names)
     export_gridnames_to_csv(column_names)
     final_step = calculate_final_step(df_solar)
@@ -345,28 +437,26 @@ def main():
     # Create the initial grid load dictionary, with everything set to 0.0
     grid_dict = grid_initial_load(column_names)
     # print(grid_dict)
-
-    # Test Co2 emission data
-    average_co2 = grid_co2_emission("data/emissions")
     # print("length is: ", len(average_co2))
     # print(average_co2)
-
-    # Create dict for electricity price
-    electricity_price_dict = electricity_price("data/estat_nrg_pc_204.csv", column_names)
     #print(electricity_price_dict)
 
     # Generate the battery, node, renewable and microgrid modules
     batteries = generate_battery_modules(column_names)
-    nodes = generate_node_modules(column_names, final_step, grid_dict)
+    nodes = generate_node_modules(column_names, grid_dict)
     # print("amount of nodes is: ", len(nodes))
     renewables = generate_renewable_modules(column_names, final_step, df_solar)
     grids = generate_grid_modules(column_names, average_co2, final_step, electricity_price_dict)
     microgrids = generate_microgrids(column_names, batteries, nodes, renewables, grids)
     print("amount of microgrids is: ", len(microgrids))
 
-    # Create the empty action, which will be updated with the load values
-    custom_action = microgrids["ES10"].get_empty_action(sample_flex_modules=False)
-    print(custom_action)
+    # Zones sharded by country over worker processes, each stepping its zones at once
+    fleet = ShardedFleet(
+        microgrids,
+        policy=partial(dispatch_policy, total_capacity_of_installations=TOTAL_CAPACITY_OF_INSTALLATIONS),
+        init_microgrid=attach_log_sink,
+    )
+    print(fleet)
 
     #
     # The actual simulation with updating loads, actions and logging
@@ -377,154 +467,57 @@ def main():
 
     # microgrid.reset()
 
-    wait_time = (
-        120  # 120 seconds to make the simulation 30x times faster than real time.
-    )
-    starttime = time.monotonic()
+    # One simulated hour per tick, 30x faster than real time: a tick every 120 seconds.
+    tick_interval = 3600.0
+    speedup = 30.0
 
-    state_of_charge = []
+    # Persistent connection with running per-node CPU sums, instead of a new connection and GROUP BY per tick
+    load_repository = LoadRepository("database.db", incremental=True)
+    session = requests.Session()
 
-    total_capacity_of_installations = (
-        #1800.0  # W, such that it cannot fully cover the load of nodes at full capacity
-        3600.0 / 3  # W, such that it cannot fully cover the load of nodes at full capacity
-    )
+    def fetch(tick_time):
+        return db_load_retrieve(load_repository, tick_time)
 
-    while True:
-        # for j in range(24):
-        # time.sleep(wait_time - ((time.monotonic() - starttime) % wait_time))
-        state_of_charge.clear()
-        rows = db_load_retrieve()
+    def simulate(rows):
         print("Selected rows ", rows)
-        #print("Grid dict before update ", grid_dict)
-        update_grid_load(grid_dict=grid_dict, rows=rows)
-        # print("------------------------------------------------------------")
-        # print("Grid dict after update ", grid_dict)
-
-        for microgrid in microgrids.values():
-            print("Microgrid Name: ", microgrid.grid_name) # Add this back if it's part of your logging sequence here
-
-            load = 0.0
-            net_load = 0.0
-            
-            #for i in range(0, 6):
-            for i in range(0, 2):
-                # print(microgrid.modules.node[i].node_name) # Original commented-out print
-                microgrid.modules.node[i].update_current_load(
-                    grid_dict[microgrid.modules.node[i].node_name]
-                )
-                load += -1.0 * microgrid.modules.node[i].current_load
-
-            pv = (
-                microgrid.modules.pv_source[0].current_renewable
-                * total_capacity_of_installations
-            )
-
-            net_load = load + pv
-            
-            # if net_load > 0:
-            #     net_load = 0.0
-
-            battery_command = 0.0
-            grid_command = 0.0
-            
-            current_soc = microgrid.modules.battery[0].soc
-
-            battery_max_charge_power = microgrid.modules.battery[0].max_consumption
-            battery_max_discharge_power = microgrid.modules.battery[0].max_production
-            grid_max_export_power = microgrid.modules.grid.item().max_consumption
-            grid_max_import_power = microgrid.modules.grid.item().max_production
-
-            if net_load > 0:
-                surplus_power = net_load
-                if current_soc < 0.999: 
-                    charge_to_battery = min(surplus_power, battery_max_charge_power)
-                    battery_command = -charge_to_battery
-                    
-                    remaining_surplus = surplus_power - charge_to_battery
-                    if remaining_surplus > 0:
-                        export_to_grid = min(remaining_surplus, grid_max_export_power)
-                        grid_command = -export_to_grid
-                else: 
-                    battery_command = 0.0 
-                    export_to_grid = min(surplus_power, grid_max_export_power)
-                    grid_command = -export_to_grid
-
-            elif net_load < 0:
-                deficit_power = -net_load 
-                discharge_from_battery = min(deficit_power, battery_max_discharge_power)
-                battery_command = discharge_from_battery
-                
-                remaining_deficit = deficit_power - discharge_from_battery
-                if remaining_deficit > 0:
-                    import_from_grid = min(remaining_deficit, grid_max_import_power)
-                    grid_command = import_from_grid
-
-            # Total load of all nodes in the microgrid
-            total_load = (
-                microgrid.modules.node[0].current_load
-                + microgrid.modules.node[1].current_load
-                # + microgrid.modules.node[2].current_load
-                # + microgrid.modules.node[3].current_load
-                # + microgrid.modules.node[4].current_load
-                # + microgrid.modules.node[5].current_load
-            )
+        fleet.update_node_utilization(dict(rows))
+        summary = fleet.step()
 
-            total_grid_dict_load = (
-                grid_dict[microgrid.modules.node[0].node_name]
-                + grid_dict[microgrid.modules.node[1].node_name]
-                # + grid_dict[microgrid.modules.node[2].node_name]
-                # + grid_dict[microgrid.modules.node[3].node_name]
-                # + grid_dict[microgrid.modules.node[4].node_name]
-                # + grid_dict[microgrid.modules.node[5].node_name]
-            )
-
-            print("Load ", total_load) 
-            print("Grid dict load ", total_grid_dict_load)
-            print(
-                "Renewable ",
-                microgrid.modules.pv_source[0].current_renewable
-                * total_capacity_of_installations,
-            )
-            print("Battery SOC ", microgrid.modules.battery[0].soc) # This is current_soc before action
-            print(
-                "Battery level of charge ", microgrid.modules.battery[0].current_charge # Before action
-            )
-
-            custom_action.update(
-                {
-                    "battery": [battery_command],
-                    "grid": [grid_command],
-                }
-            )
-            print("Custom action ", custom_action)
-
-            microgrid.step(custom_action, normalized=False)
-
-            log = microgrid.get_log(as_frame=True, drop_forecasts=True)
-            filename = f"logs/{microgrid.grid_name}.csv"
-            os.makedirs("logs", exist_ok=True)
-            log.to_csv(filename, mode="w", header=True, index=False)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        current_renewable = summary["current_renewable"] * TOTAL_CAPACITY_OF_INSTALLATIONS
 
+        state_of_charge = []
+        for j, name in enumerate(fleet.names):
             state_of_charge.append(
                 {
-                    "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "SOC": microgrid.modules.battery[0].soc * 100,
-                    "Current_renewable": microgrid.modules.pv_source[
-                        0
-                    ].current_renewable
-                    * total_capacity_of_installations,
-                    "Current_load": total_load,
-                    "Gridname": microgrid.grid_name,
+                    "Timestamp": timestamp,
+                    "SOC": summary["soc"][j].item() * 100,
+                    "Current_renewable": current_renewable[j].item(),
+                    "Current_load": summary["zone_load"][j].item(),
+                    "Gridname": name,
                 }
             )
             # print(shared_state.state_of_charge)
 
+        return state_of_charge
+
+    def publish(state_of_charge):
         # API STUFF
         url = "http://127.0.0.1:5000/insert"
         data = {"data": state_of_charge}
-        response = requests.post(url, json=data)
-        print(response.status_code, response.json())
-        time.sleep(wait_time)
+        try:
+            response = session.post(url, json=data)
+            print(response.status_code, response.json())
+        except requests.RequestException as e:
+            print("Publishing state of charge failed: ", e)
+
+    # Ticks fire on a monotonic schedule; the next DB read and the previous publish overlap with each step
+    runner = TickRunner(fetch, simulate, publish, interval=tick_interval, speedup=speedup)
+    print(runner)
+    try:
+        runner.run()
+    finally:
+        fleet.close()
 
     # Logging and visualization of the data
 
@@ -21,6 +21,14 @@ cursor.execute(
                 SOC real)"""
 )
 
+cursor.execute(
+    """CREATE INDEX IF NOT EXISTS idx_microgrids_completed_at_node
+             ON microgrids (Completed_at, Node, CPU)"""
+)
+
+# Let the API insert jobs while the simulator reads them
+cursor.execute("PRAGMA journal_mode=WAL")
+
 print("Table(s) created successfully")
 
 cursor.close()
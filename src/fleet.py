@@ -0,0 +1,693 @@
+import numpy as np
+
+from pymgrid.modules import (
+    BatteryModule, ConstantSeries, GridModule, NodeGroupModule, NodeModule, RenewableModule, UnbalancedEnergyModule
+)
+from pymgrid.modules.battery.transition_models import BatteryTransitionModel
+
+
+def node_modules(microgrid):
+    """
+    The node modules of a microgrid: its ``NodeModule``s, followed by its ``NodeGroupModule``s.
+
+    Parameters
+    ----------
+    microgrid : pymgrid.Microgrid
+        Microgrid.
+
+    Returns
+    -------
+    modules : list[NodeModule or NodeGroupModule]
+        The node modules.
+
+    """
+    names = microgrid.modules.names()
+    return [module for name in ('node', 'node_group') if name in names for module in microgrid.modules[name]]
+
+
+def expand_nodes(modules):
+    """
+    The individual nodes of node modules.
+
+    Parameters
+    ----------
+    modules : list[NodeModule or NodeGroupModule]
+        Node modules.
+
+    Returns
+    -------
+    nodes : list[tuple[str, PowerCurve, float]]
+        Name, power curve and current load of each node, in order. A ``NodeGroupModule`` contributes each of its nodes.
+
+    """
+    nodes = []
+    for module in modules:
+        if isinstance(module, NodeGroupModule):
+            nodes.extend((name, module.power_curve, load) for name, load in zip(module.node_names, module.loads.tolist()))
+        else:
+            nodes.append((module.node_name, module.power_curve, module.current_load))
+
+    return nodes
+
+
+def group_power_curves(power_curves):
+    """
+    Group nodes by their power curve.
+
+    Parameters
+    ----------
+    power_curves : list[PowerCurve]
+        Power curve of each node.
+
+    Returns
+    -------
+    groups : list[tuple[PowerCurve, np.ndarray]]
+        Each distinct power curve, with the positions in ``power_curves`` of the nodes that use it.
+
+    """
+    groups = []
+    for j, power_curve in enumerate(power_curves):
+        for curve, positions in groups:
+            if curve == power_curve:
+                positions.append(j)
+                break
+        else:
+            groups.append((power_curve, [j]))
+
+    return [(curve, np.array(positions, dtype=np.intp)) for curve, positions in groups]
+
+
+def node_power(utilization, node_index, power_curves):
+    """
+    Power drawn by each node at the given CPU utilization.
+
+    Parameters
+    ----------
+    utilization : dict[str, float] or array-like, shape (n_nodes, )
+        CPU utilization in percent, either keyed by node name -- nodes that are missing are idle, names that are not in
+        ``node_index`` are ignored -- or aligned with the node order of ``node_index``.
+
+    node_index : dict[str, int]
+        Position of each node, by name.
+
+    power_curves : list[tuple[PowerCurve, np.ndarray]]
+        Power curves and the positions of the nodes that use them, as returned by :func:`.group_power_curves`.
+
+    Returns
+    -------
+    watts : np.ndarray, shape (n_nodes, )
+        Power drawn by each node.
+
+    """
+    if isinstance(utilization, dict):
+        values = np.zeros(len(node_index))
+        for name, value in utilization.items():
+            try:
+                values[node_index[name]] = value
+            except KeyError:
+                pass
+        utilization = values
+    else:
+        utilization = np.asarray(utilization, dtype=float)
+
+    if len(power_curves) == 1:
+        return power_curves[0][0](utilization)
+
+    watts = np.empty_like(utilization)
+    for curve, positions in power_curves:
+        watts[positions] = curve(utilization[positions])
+
+    return watts
+
+
+class FleetSimulator:
+    """
+    Vectorized simulator of a fleet of zone microgrids.
+
+    Every zone microgrid must consist of one battery, one ``pv_source`` renewable module, any number of node modules,
+    one grid module and one balancing module -- the layout built by ``app.generate_microgrids``.
+    The state of all zones is held in struct-of-arrays NumPy buffers, and :meth:`.step` advances every zone at once.
+    The results of a step are identical to calling :meth:`.Microgrid.step` on each zone with the same controls.
+
+    Parameters
+    ----------
+    microgrids : dict[str, pymgrid.Microgrid]
+        Zone microgrids, keyed by zone name.
+
+    write_back : bool, default True
+        Whether to write the state and log entries of each step back to the underlying microgrids, such that
+        e.g. :meth:`.Microgrid.get_log`, log sinks and module attributes stay in sync with the fleet.
+        If False, the microgrids are left untouched after construction.
+
+    write_back_interval : int, default 32
+        Number of steps buffered before they are written back to the microgrids in one batch. Call :meth:`.sync` to
+        write back the buffered steps before reading the microgrids. Ignored if ``write_back`` is False.
+
+    """
+
+    def __init__(self, microgrids, write_back=True, write_back_interval=32):
+        if int(write_back_interval) != write_back_interval or write_back_interval < 1:
+            raise ValueError('write_back_interval must be a positive integer.')
+
+        self.microgrids = dict(microgrids)
+        self.write_back = write_back
+        self.write_back_interval = int(write_back_interval)
+        self._pending = []
+
+        self.names = np.array(list(self.microgrids.keys()), dtype=object)
+        self._modules = [self._check_microgrid(name, microgrid) for name, microgrid in self.microgrids.items()]
+
+        batteries = [modules['battery'] for modules in self._modules]
+        pv_sources = [modules['pv_source'] for modules in self._modules]
+        grids = [modules['grid'] for modules in self._modules]
+        balancing = [modules['balancing'] for modules in self._modules]
+        nodes = [expand_nodes(modules['node'] + modules['node_group']) for modules in self._modules]
+
+        self._current_step = np.array([m.current_step for m in batteries], dtype=np.int64)
+        self._final_step = np.array(
+            [min(pv.final_step, grid.final_step) for pv, grid in zip(pv_sources, grids)],
+            dtype=np.int64
+        )
+
+        self._battery_min_capacity = self._attr_array(batteries, 'min_capacity')
+        self._battery_max_capacity = self._attr_array(batteries, 'max_capacity')
+        self._battery_max_charge = self._attr_array(batteries, 'max_charge')
+        self._battery_max_discharge = self._attr_array(batteries, 'max_discharge')
+        self._battery_efficiency = self._attr_array(batteries, 'efficiency')
+        self._battery_cost_cycle = self._attr_array(batteries, 'battery_cost_cycle')
+        self._battery_min_act = self._attr_array(batteries, 'min_act')
+        self._battery_max_act = self._attr_array(batteries, 'max_act')
+        self._battery_charge = self._attr_array(batteries, 'current_charge')
+        self._battery_soc = self._attr_array(batteries, 'soc')
+
+        self._pv_series = self._stack_time_series(pv_sources)[..., 0]
+        self._grid_series = self._stack_time_series(grids)
+        self._pv_end = np.array([self._end_of_series(pv) for pv in pv_sources])[:, 0]
+        self._grid_end = np.array([self._end_of_series(grid) for grid in grids])
+        self._grid_max_import = self._attr_array(grids, 'max_import')
+        self._grid_max_export = self._attr_array(grids, 'max_export')
+        self._grid_cost_per_unit_co2 = self._attr_array(grids, 'cost_per_unit_co2')
+
+        self._loss_load_cost = self._attr_array(balancing, 'loss_load_cost')
+        self._overgeneration_cost = self._attr_array(balancing, 'overgeneration_cost')
+
+        self.node_names = np.array([name for zone_nodes in nodes for name, _, _ in zone_nodes], dtype=object)
+        self._node_zone = np.repeat(np.arange(len(self.names)), [len(zone_nodes) for zone_nodes in nodes])
+        self._node_load = np.array([load for zone_nodes in nodes for _, _, load in zone_nodes], dtype=float)
+        self._node_index = {name: j for j, name in enumerate(self.node_names)}
+        self._power_curves = group_power_curves([curve for zone_nodes in nodes for _, curve, _ in zone_nodes])
+
+    @staticmethod
+    def _check_microgrid(name, microgrid):
+        if microgrid.reward_shaping_func is not None:
+            raise ValueError(f"Microgrid '{name}' defines a reward_shaping_func, which FleetSimulator does not support.")
+
+        expected = {
+            'battery': BatteryModule,
+            'pv_source': RenewableModule,
+            'grid': GridModule,
+            'balancing': UnbalancedEnergyModule
+        }
+
+        modules = {}
+        names = set(microgrid.modules.names())
+
+        for module_name, cls in expected.items():
+            if module_name not in names or len(microgrid.modules[module_name]) != 1:
+                raise ValueError(f"Microgrid '{name}' must contain exactly one '{module_name}' module.")
+
+            module = microgrid.modules[module_name][0]
+
+            if not isinstance(module, cls):
+                raise TypeError(f"Module '{module_name}' of microgrid '{name}' must be a {cls.__name__}.")
+
+            modules[module_name] = module
+
+        if type(modules['battery'].battery_transition_model) is not BatteryTransitionModel:
+            raise ValueError(f"Battery of microgrid '{name}' must use the default BatteryTransitionModel.")
+
+        if modules['pv_source'].forecast_horizon or modules['grid'].forecast_horizon:
+            raise ValueError(f"Time series modules of microgrid '{name}' must not forecast.")
+
+        modules['node'] = list(microgrid.modules['node']) if 'node' in names else []
+        modules['node_group'] = list(microgrid.modules['node_group']) if 'node_group' in names else []
+
+        if not all(isinstance(node, NodeModule) for node in modules['node']):
+            raise TypeError(f"Modules named 'node' of microgrid '{name}' must be NodeModules.")
+
+        if not all(isinstance(group, NodeGroupModule) for group in modules['node_group']):
+            raise TypeError(f"Modules named 'node_group' of microgrid '{name}' must be NodeGroupModules.")
+
+        unexpected = names - set(modules.keys())
+        if unexpected:
+            raise ValueError(f"Microgrid '{name}' contains unsupported modules {sorted(unexpected)}.")
+
+        return modules
+
+    @staticmethod
+    def _attr_array(modules, attr):
+        return np.array([getattr(module, attr) for module in modules], dtype=float)
+
+    @staticmethod
+    def _stack_time_series(modules):
+        lengths = {len(module) for module in modules}
+        if len(lengths) != 1:
+            raise ValueError(f'Time series of {modules[0].__class__.__name__}s must have equal lengths, '
+                             f'found lengths {sorted(lengths)}.')
+
+        series = [module.time_series for module in modules]
+
+        if all(isinstance(s, ConstantSeries) for s in series):
+            # Read-only view with no memory per step.
+            values = np.stack([s.values[0] for s in series])
+            return np.broadcast_to(values, (lengths.pop(), *values.shape))
+
+        return np.stack(series, axis=1)
+
+    @staticmethod
+    def _end_of_series(module):
+        # Observation of a time series module past the end of its time series: the middle of its observation space.
+        space = module.observation_space['unnormalized']
+        return (space.low + space.high) / 2
+
+    def _current(self, series, end):
+        # Current entry of each zone's time series, or what its module observes once past the end of it.
+        zones = np.arange(len(self.names))
+        in_series = self._current_step < len(series)
+
+        if in_series.all():
+            return series[self._current_step, zones]
+
+        current = end.copy()
+        current[in_series] = series[self._current_step[in_series], zones[in_series]]
+        return current
+
+    def update_node_loads(self, loads):
+        """
+        Set the current load of every node.
+
+        Parameters
+        ----------
+        loads : dict[str, float] or array-like, shape (n_nodes, )
+            Node loads, either keyed by node name or aligned with :attr:`.node_names`.
+
+        """
+        if isinstance(loads, dict):
+            loads = [loads[name] for name in self.node_names]
+
+        loads = np.asarray(loads, dtype=float)
+
+        if loads.shape != self._node_load.shape:
+            raise ValueError(f'Expected loads of shape {self._node_load.shape}, received shape {loads.shape}.')
+
+        self._node_load[:] = loads
+
+    def update_node_utilization(self, utilization):
+        """
+        Set the current load of every node from its CPU utilization, through the power curve of each node.
+
+        Parameters
+        ----------
+        utilization : dict[str, float] or array-like, shape (n_nodes, )
+            CPU utilization in percent, either keyed by node name -- nodes that are missing are idle -- or aligned with
+            :attr:`.node_names`.
+
+        """
+        self.update_node_loads(node_power(utilization, self._node_index, self._power_curves))
+
+    def step(self, battery_control, grid_control):
+        """
+        Run every zone for a single step.
+
+        Parameters
+        ----------
+        battery_control : array-like, shape (n_zones, )
+            Un-normalized battery controls. Positive values discharge the battery, negative values charge it.
+
+        grid_control : array-like, shape (n_zones, )
+            Un-normalized grid controls. Positive values import from the grid, negative values export to it.
+
+        Returns
+        -------
+        reward : np.ndarray, shape (n_zones, )
+            Reward of each zone.
+
+        done : np.ndarray[bool], shape (n_zones, )
+            Whether each zone terminates.
+
+        info : dict[str, dict[str, np.ndarray]]
+            Energy flows of each module type, keyed by module name and then by log field.
+
+        """
+        zones = np.arange(len(self.names))
+        t = self._current_step
+
+        battery_control = np.broadcast_to(np.asarray(battery_control, dtype=float), zones.shape)
+        grid_control = np.broadcast_to(np.asarray(grid_control, dtype=float), zones.shape)
+
+        pre_charge, pre_soc = self._battery_charge.copy(), self._battery_soc.copy()
+        renewable = self._pv_series[t, zones]
+        grid_state = self._grid_series[t, zones]
+
+        # Fixed modules: nodes
+        fixed_consumed = np.bincount(self._node_zone, weights=self._node_load, minlength=len(zones))
+
+        # Controllable modules: battery
+        battery_act = np.clip(battery_control, self._battery_min_act, self._battery_max_act)
+        battery_as_source = battery_act >= 0
+        efficiency = self._battery_efficiency
+
+        battery_provided = np.where(
+            battery_as_source,
+            np.minimum(battery_act, self.battery_max_production),
+            0.0
+        )
+        battery_absorbed = np.where(
+            battery_as_source,
+            0.0,
+            np.minimum(-1.0 * battery_act, self.battery_max_consumption)
+        )
+        internal_change = np.where(battery_as_source, -1.0 * battery_provided / efficiency, battery_absorbed * efficiency)
+
+        self._battery_charge += internal_change
+        np.maximum(self._battery_charge, self._battery_min_capacity, out=self._battery_charge)
+        self._battery_soc = self._battery_charge / self._battery_max_capacity
+        battery_reward = -1.0 * (np.abs(internal_change) * self._battery_cost_cycle)
+
+        # Controllable modules: grid
+        grid_act = np.clip(grid_control, -1 * self._grid_max_export, self._grid_max_import)
+        grid_as_source = grid_act >= 0
+        grid_status = grid_state[:, 3]
+
+        grid_import = np.where(grid_as_source, np.minimum(grid_act, self._grid_max_import * grid_status), 0.0)
+        grid_export = np.where(grid_as_source, 0.0, np.minimum(-1.0 * grid_act, self._grid_max_export * grid_status))
+        co2_production = np.where(grid_as_source, grid_import * grid_state[:, 2], 0.0)
+        co2_cost = -1.0 * self._grid_cost_per_unit_co2 * co2_production
+        grid_reward = np.where(
+            grid_as_source,
+            -1 * grid_state[:, 0] * grid_import + co2_cost,
+            grid_state[:, 1] * grid_export + co2_cost
+        )
+
+        controllable_provided = battery_provided + grid_import
+        controllable_consumed = fixed_consumed + battery_absorbed + grid_export
+        difference = controllable_provided - controllable_consumed
+
+        # Flex modules: pv_source, then balancing
+        excess = difference > 0
+        energy_needed = np.where(excess, 0.0, -1.0 * difference)
+
+        renewable_used = np.where(renewable < energy_needed, renewable, energy_needed)
+        loss_load = energy_needed - renewable_used
+        overgeneration = np.where(excess, difference, 0.0)
+        curtailment = renewable - renewable_used
+
+        balancing_reward = np.where(
+            excess,
+            -1.0 * (self._overgeneration_cost * overgeneration),
+            -1.0 * (self._loss_load_cost * loss_load)
+        )
+
+        provided = controllable_provided + renewable_used + loss_load
+        consumed = controllable_consumed + overgeneration
+        reward = battery_reward + grid_reward + balancing_reward
+
+        if not np.isclose(provided, consumed).all():
+            raise RuntimeError('Microgrid modules unable to balance energy production with consumption.\n'
+                               f'Unbalanced zones: {self.names[~np.isclose(provided, consumed)].tolist()}')
+
+        done = t >= self._final_step - 1
+
+        info = {
+            'battery': dict(discharge_amount=battery_provided, charge_amount=battery_absorbed),
+            'grid': dict(grid_import=grid_import, grid_export=grid_export, co2_production=co2_production),
+            'pv_source': dict(renewable_used=renewable_used, curtailment=curtailment),
+            'balancing': dict(loss_load=loss_load, overgeneration=overgeneration),
+            'balance': dict(
+                overall_provided_to_microgrid=provided,
+                overall_absorbed_from_microgrid=consumed,
+                flex_provided_to_microgrid=provided - controllable_provided,
+                flex_absorbed_from_microgrid=consumed - controllable_consumed,
+                controllable_provided_to_microgrid=controllable_provided,
+                controllable_absorbed_from_microgrid=controllable_consumed - fixed_consumed,
+                fixed_provided_to_microgrid=np.zeros_like(fixed_consumed),
+                fixed_absorbed_from_microgrid=fixed_consumed
+            )
+        }
+
+        self._current_step = t + 1
+
+        if self.write_back:
+            self._pending.append(dict(
+                node_load=self._node_load.copy(),
+                battery_charge=pre_charge,
+                battery_soc=pre_soc,
+                renewable=renewable,
+                grid_state=grid_state,
+                reward=reward,
+                battery_reward=battery_reward,
+                grid_reward=grid_reward,
+                balancing_reward=balancing_reward,
+                fixed_consumed=fixed_consumed,
+                controllable_provided=controllable_provided,
+                controllable_consumed=controllable_consumed,
+                provided=provided,
+                consumed=consumed,
+                **{f'{module}_{key}': value for module in ('battery', 'grid', 'pv_source', 'balancing')
+                   for key, value in info[module].items()}
+            ))
+
+            if len(self._pending) >= self.write_back_interval:
+                self.sync()
+
+        return reward, done, info
+
+    def sync(self):
+        """
+        Write the steps buffered since the last write-back to the underlying microgrids.
+
+        Each module logs its buffered steps at once through
+        :meth:`~pymgrid.modules.base.BaseMicrogridModule.log_steps`, and each microgrid through
+        :meth:`.Microgrid.log_steps`, which streams them to its log sink.
+
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        steps = {key: np.stack([step[key] for step in pending]) for key in pending[0]}
+        n_steps = len(pending)
+
+        node_start = np.concatenate(([0], np.cumsum(np.bincount(self._node_zone, minlength=len(self.names)))))
+
+        for j, (microgrid, modules) in enumerate(zip(self.microgrids.values(), self._modules)):
+            zone_steps = {key: values[:, j] for key, values in steps.items() if key != 'node_load'}
+            zone_steps['node_load'] = steps['node_load'][:, node_start[j]:node_start[j + 1]]
+
+            # Streamed steps must still be in the microgrid's log.
+            batch_size = microgrid.log_retention or n_steps
+            for start in range(0, n_steps, batch_size):
+                batch = slice(start, start + batch_size)
+                self._write_back(microgrid, modules, {key: values[batch] for key, values in zone_steps.items()})
+
+            modules['battery'].current_charge = self._battery_charge[j].item()
+
+    @staticmethod
+    def _write_back(microgrid, modules, steps):
+        zeros = np.zeros(len(steps['reward']))
+
+        def state(module, *columns):
+            return dict(zip(module.state_dict().keys(), columns))
+
+        node_pos = 0
+
+        for node in modules['node']:
+            loads = steps['node_load'][:, node_pos]
+            node.update_current_load(loads[-1].item())
+            node.log_steps(state(node, -1.0 * loads), zeros, absorbed_energy=loads)
+            node_pos += 1
+
+        for group in modules['node_group']:
+            loads = steps['node_load'][:, node_pos:node_pos + group.n_nodes]
+            # Summed in order, as the group sums the loads of its nodes.
+            total = loads.cumsum(axis=1)[:, -1] if group.n_nodes else zeros
+            group.update_loads(loads[-1])
+            group.log_steps(state(group, -1.0 * total), zeros, absorbed_energy=total, **group.load_fields(loads.T))
+            node_pos += group.n_nodes
+
+        modules['battery'].log_steps(
+            dict(soc=steps['battery_soc'], current_charge=steps['battery_charge']),
+            steps['battery_reward'],
+            provided_energy=steps['battery_discharge_amount'],
+            absorbed_energy=steps['battery_charge_amount']
+        )
+
+        grid = modules['grid']
+        grid.log_steps(
+            state(grid, *steps['grid_state'].T),
+            steps['grid_reward'],
+            provided_energy=steps['grid_grid_import'],
+            absorbed_energy=steps['grid_grid_export'],
+            co2_production=steps['grid_co2_production']
+        )
+
+        pv_source = modules['pv_source']
+        pv_source.log_steps(
+            state(pv_source, steps['renewable']),
+            zeros,
+            provided_energy=steps['pv_source_renewable_used'],
+            curtailment=steps['pv_source_curtailment']
+        )
+
+        balancing = modules['balancing']
+        balancing.log_steps(
+            state(balancing),
+            steps['balancing_reward'],
+            provided_energy=steps['balancing_loss_load'],
+            absorbed_energy=steps['balancing_overgeneration']
+        )
+
+        microgrid.log_steps(
+            steps['reward'],
+            (zeros, steps['fixed_consumed']),
+            (steps['controllable_provided'], steps['controllable_consumed']),
+            (steps['provided'], steps['consumed'])
+        )
+
+    @property
+    def current_step(self):
+        """
+        Current step of each zone.
+
+        Returns
+        -------
+        current_step : np.ndarray[int], shape (n_zones, )
+
+        """
+        return self._current_step
+
+    @property
+    def battery_soc(self):
+        """
+        State of charge of each zone's battery.
+
+        Returns
+        -------
+        soc : np.ndarray, shape (n_zones, )
+
+        """
+        return self._battery_soc
+
+    @property
+    def battery_charge(self):
+        """
+        Charge of each zone's battery.
+
+        Returns
+        -------
+        charge : np.ndarray, shape (n_zones, )
+
+        """
+        return self._battery_charge
+
+    @property
+    def battery_max_production(self):
+        """
+        Maximum amount each battery can currently discharge to its microgrid.
+
+        Equivalent to :attr:`.BatteryModule.max_production`.
+
+        Returns
+        -------
+        max_production : np.ndarray, shape (n_zones, )
+
+        """
+        available = np.minimum(self._battery_max_discharge, self._battery_charge - self._battery_min_capacity)
+        return np.where(available < 0, available / self._battery_efficiency, available * self._battery_efficiency)
+
+    @property
+    def battery_max_consumption(self):
+        """
+        Maximum amount each battery can currently absorb from its microgrid.
+
+        Equivalent to :attr:`.BatteryModule.max_consumption`.
+
+        Returns
+        -------
+        max_consumption : np.ndarray, shape (n_zones, )
+
+        """
+        available = np.minimum(self._battery_max_charge, self._battery_max_capacity - self._battery_charge)
+        return np.where(available > 0, available / self._battery_efficiency, available * self._battery_efficiency)
+
+    @property
+    def grid_max_production(self):
+        """
+        Maximum amount each grid can currently provide to its microgrid.
+
+        Once past the end of a zone's time series, as observed by its grid module there.
+
+        Returns
+        -------
+        max_production : np.ndarray, shape (n_zones, )
+
+        """
+        return self._grid_max_import * self._current(self._grid_series, self._grid_end)[:, 3]
+
+    @property
+    def grid_max_consumption(self):
+        """
+        Maximum amount each grid can currently absorb from its microgrid.
+
+        Once past the end of a zone's time series, as observed by its grid module there.
+
+        Returns
+        -------
+        max_consumption : np.ndarray, shape (n_zones, )
+
+        """
+        return self._grid_max_export * self._current(self._grid_series, self._grid_end)[:, 3]
+
+    @property
+    def current_renewable(self):
+        """
+        Current renewable production of each zone.
+
+        Once past the end of a zone's time series, as observed by its renewable module there.
+
+        Returns
+        -------
+        renewable : np.ndarray, shape (n_zones, )
+
+        """
+        return self._current(self._pv_series, self._pv_end)
+
+    @property
+    def node_load(self):
+        """
+        Current load of each node, aligned with :attr:`.node_names`.
+
+        Returns
+        -------
+        load : np.ndarray, shape (n_nodes, )
+
+        """
+        return self._node_load
+
+    @property
+    def zone_load(self):
+        """
+        Total node load of each zone.
+
+        Returns
+        -------
+        load : np.ndarray, shape (n_zones, )
+
+        """
+        return np.bincount(self._node_zone, weights=self._node_load, minlength=len(self.names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f'FleetSimulator(n_zones={len(self.names)}, n_nodes={len(self.node_names)})'
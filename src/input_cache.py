@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+CACHE_VERSION = 1
+
+
+class InputCache:
+    """
+    Cache of preprocessed inputs, stored as memory-mappable ``.npy`` arrays keyed by a hash of the source files.
+
+    Each entry is a directory named after its key, holding one ``.npy`` file per array and a ``meta.json`` file with
+    any JSON-serializable metadata. Entries are written to a temporary directory and renamed into place, so a partially
+    written entry is never loaded.
+
+    Parameters
+    ----------
+    directory : str, default "data/cache"
+        Directory to store cache entries in.
+
+    max_entries : int, default 1
+        Number of entries to keep. The least recently stored entries are removed first.
+
+    """
+
+    def __init__(self, directory="data/cache", max_entries=1):
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer.")
+
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def key(self, *paths):
+        """
+        Hash of the contents of the source files.
+
+        Parameters
+        ----------
+        *paths : str
+            Source files. Directories are expanded to the files they contain, in sorted order.
+
+        Returns
+        -------
+        key : str
+            Hex digest that changes whenever any source file, or the cache version, changes.
+
+        """
+        digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+
+        for path in paths:
+            files = (
+                [os.path.join(path, name) for name in sorted(os.listdir(path))]
+                if os.path.isdir(path)
+                else [path]
+            )
+
+            for file in files:
+                digest.update(os.path.basename(file).encode())
+                with open(file, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        Load a cache entry.
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry, see :meth:`.key`.
+
+        Returns
+        -------
+        entry : tuple[dict[str, np.ndarray], dict] or None
+            Read-only memory-mapped arrays and the metadata of the entry, or None if there is no such entry.
+
+        """
+        entry = os.path.join(self.directory, key)
+
+        try:
+            with open(os.path.join(entry, "meta.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        arrays = {
+            name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+            for name in meta["arrays"]
+        }
+
+        return arrays, meta["meta"]
+
+    def store(self, key, arrays, meta=None):
+        """
+        Store a cache entry, replacing any existing entry with the same key.
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry, see :meth:`.key`.
+
+        arrays : dict[str, np.ndarray]
+            Arrays to store. Object arrays are not supported.
+
+        meta : dict or None, default None
+            JSON-serializable metadata.
+
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self.directory, prefix=f".{key}-")
+
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(array), allow_pickle=False)
+
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({"arrays": list(arrays), "meta": meta or {}}, f)
+
+            entry = os.path.join(self.directory, key)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        self._remove_old_entries()
+
+    def _remove_old_entries(self):
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if not name.startswith(".")
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+
+        for entry in entries[self.max_entries:]:
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def __repr__(self):
+        return f"InputCache(directory={self.directory!r}, max_entries={self.max_entries})"
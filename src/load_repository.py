@@ -0,0 +1,146 @@
+import heapq
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class LoadRepository:
+    """
+    Persistent, indexed access to the job table ``microgrids`` written by ``api.py``.
+
+    A single connection is opened and reused for every query. On construction the database is switched to WAL mode,
+    such that the Flask writer and the simulator reader do not block each other, and an index on
+    ``(Completed_at, Node, CPU)`` is created so that polling for running jobs does not scan the whole table.
+
+    Parameters
+    ----------
+    path : str, default "database.db"
+        Path of the SQLite database.
+
+    incremental : bool, default False
+        Whether to keep running per-node CPU sums, updated from jobs inserted and expired since the previous poll,
+        instead of aggregating all running jobs with ``GROUP BY`` on every poll.
+
+    """
+
+    def __init__(self, path="database.db", incremental=False):
+        self.path = path
+        self.incremental = incremental
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_microgrids_completed_at_node "
+            "ON microgrids (Completed_at, Node, CPU)"
+        )
+        self._connection.commit()
+
+        self._clear_running_sums()
+
+    def _clear_running_sums(self):
+        self._last_id = 0
+        self._first_id = None
+        self._cpu_sum = defaultdict(float)
+        self._job_count = defaultdict(int)
+        self._expiry = []  # heap of (Completed_at, Node, CPU)
+
+    def current_load(self, timestamp=None):
+        """
+        Total CPU load of the jobs that are not completed yet, per node.
+
+        Parameters
+        ----------
+        timestamp : datetime or str or None, default None
+            Time at which to evaluate the load. A job is running if ``timestamp <= Completed_at``.
+            If None, uses the current time.
+
+        Returns
+        -------
+        rows : list[tuple[str, float]]
+            Pairs of ``(Node, SUM(CPU))``, ordered by node, for every node with at least one running job.
+
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.strftime(TIMESTAMP_FORMAT)
+
+        with self._lock:
+            if self.incremental:
+                return self._running_sums(timestamp)
+
+            return self._connection.execute(
+                "SELECT Node, SUM(CPU) "
+                "FROM microgrids "
+                "WHERE ? <= Completed_at "
+                "GROUP BY Node "
+                "ORDER BY Node",
+                (timestamp,),
+            ).fetchall()
+
+    def _running_sums(self, timestamp):
+        first_id = self._connection.execute("SELECT MIN(ID) FROM microgrids").fetchone()[0]
+
+        # Rows are only ever deleted all at once (see /delete-db); a new first ID means the tracked jobs are gone.
+        if first_id != self._first_id and self._last_id:
+            self._clear_running_sums()
+
+        self._first_id = first_id
+
+        new_jobs = self._connection.execute(
+            "SELECT ID, Node, CPU, Completed_at FROM microgrids WHERE ID > ? ORDER BY ID",
+            (self._last_id,),
+        ).fetchall()
+
+        for job_id, node, cpu, completed_at in new_jobs:
+            self._last_id = job_id
+
+            if completed_at is None or completed_at < timestamp:
+                continue
+
+            self._cpu_sum[node] += cpu
+            self._job_count[node] += 1
+            heapq.heappush(self._expiry, (completed_at, node, cpu))
+
+        while self._expiry and self._expiry[0][0] < timestamp:
+            _, node, cpu = heapq.heappop(self._expiry)
+            self._job_count[node] -= 1
+
+            if self._job_count[node]:
+                self._cpu_sum[node] -= cpu
+            else:
+                # Reset instead of subtracting so that floating point error does not accumulate.
+                del self._job_count[node], self._cpu_sum[node]
+
+        return sorted(self._cpu_sum.items())
+
+    def resync(self):
+        """
+        Discard the running per-node sums; they are rebuilt from the table on the next poll.
+
+        Only needed if rows were deleted other than by clearing the whole table.
+        """
+        with self._lock:
+            self._clear_running_sums()
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"LoadRepository(path={self.path!r}, incremental={self.incremental})"
@@ -1,2 +1,4 @@
 from .discrete.discrete import DiscreteMicrogridEnv
 from .continuous.continuous import ContinuousMicrogridEnv, NetLoadContinuousMicrogridEnv
+from .vec.vec_env import MicrogridVecEnv
+from .vec.subproc_vec_env import SubprocMicrogridVecEnv
@@ -8,9 +8,15 @@ from gym.spaces import Box, Dict, Tuple, flatten_space, flatten
 from abc import abstractmethod
 
 from pymgrid import NonModularMicrogrid, Microgrid
+from pymgrid.microgrid import DEFAULT_HORIZON
 from pymgrid.errors.env_signature import environment_signature_error
 
 
+def _no_callback(*args, **kwargs):
+    # Default step and reset callback; a module-level function, unlike a lambda, can be pickled.
+    pass
+
+
 class BaseMicrogridEnv(Microgrid, Env):
     """
     Base class for all microgrid environments.
@@ -95,12 +101,34 @@ class BaseMicrogridEnv(Microgrid, Env):
                          trajectory_func=trajectory_func)
 
         self._flat_spaces = flat_spaces
-        self.observation_keys = self._validate_observation_keys(observation_keys)
-        self.step_callback = step_callback if step_callback is not None else lambda *a, **k: None
-        self.reset_callback = reset_callback if reset_callback is not None else lambda *a, **k: None
+        self._obs_layout = None
+        self.observation_keys = observation_keys
+        self.step_callback = step_callback if step_callback is not None else _no_callback
+        self.reset_callback = reset_callback if reset_callback is not None else _no_callback
 
         self.action_space = self._get_action_space()
         self.observation_space, self._nested_observation_space = self._get_observation_space()
+        self._obs_buffer, self._obs_layout = self._get_obs_layout()
+
+    @property
+    def observation_keys(self):
+        """
+        Keys of the state that are observed.
+
+        Returns
+        -------
+        observation_keys : list[str] or None
+            Observed keys. If empty or None, the entire state is observed.
+
+        """
+        return self._observation_keys
+
+    @observation_keys.setter
+    def observation_keys(self, value):
+        self._observation_keys = self._validate_observation_keys(value)
+
+        if self._obs_layout is not None:
+            self._obs_buffer, self._obs_layout = self._get_obs_layout()
 
     def _validate_observation_keys(self, keys):
         if not keys:
@@ -186,6 +214,49 @@ class BaseMicrogridEnv(Microgrid, Env):
 
         return (flatten_space(obs_space) if self._flat_spaces else obs_space), obs_space
 
+    def _get_obs_layout(self):
+        """
+        Layout of flat observations in a buffer of the normalized state.
+
+        The buffer holds the full normalized state, in the order of :meth:`.state_series`. Each module writes its state
+        into its own slice of the buffer, and observations are read from the positions of ``observation_keys``.
+        Modules without any observed keys are left out.
+
+        Returns
+        -------
+        buffer : np.ndarray, shape (n_state, )
+            Preallocated state buffer.
+
+        layout : tuple[bool, list[tuple[BaseMicrogridModule, slice]], np.ndarray or None]
+            Whether net load -- the first entry of the state -- is observed, the modules to write along with their
+            slices, and the positions of the observation in the buffer. Positions are None if the entire state is
+            observed.
+
+        """
+        state_index = self.state_series().index
+        positions = pd.Series(np.arange(len(state_index)), index=state_index)
+
+        if self.observation_keys:
+            positions = positions.loc[pd.IndexSlice[:, :, self.observation_keys]]
+
+        positions = positions.to_numpy()
+        observed = np.zeros(len(state_index), dtype=bool)
+        observed[positions] = True
+
+        segments, start = [], 1
+
+        for _, module_list in self.modules.iterdict():
+            for module in module_list:
+                stop = start + len(module.state_dict())
+                if observed[start:stop].any():
+                    segments.append((module, slice(start, stop)))
+                start = stop
+
+        if np.array_equal(positions, np.arange(len(state_index))):
+            positions = None
+
+        return np.zeros(len(state_index)), (observed[0].item(), segments, positions)
+
     def potential_observation_keys(self):
         return self.state_series().index.get_level_values(-1).unique()
 
@@ -279,21 +350,49 @@ class BaseMicrogridEnv(Microgrid, Env):
         self._microgrid_logger.log(d)
 
     def _get_obs(self):
+        if self._flat_spaces:
+            return self._get_flat_obs()
+
         if self.observation_keys:
             obs = self.state_series(normalized=True).loc[pd.IndexSlice[:, :, self.observation_keys]]
-
-            if self._flat_spaces:
-                obs = obs.values
-            else:
-                obs = obs.to_frame().unstack(level=1).T.droplevel(level=1, axis=1).to_dict(orient='list')
-
-        elif self._flat_spaces:
-            obs = self.state_series(normalized=True).values
+            obs = obs.to_frame().unstack(level=1).T.droplevel(level=1, axis=1).to_dict(orient='list')
         else:
             obs = self.state_dict(normalized=True, as_run_output=True)
 
         return obs
 
+    def _get_flat_obs(self):
+        # Equivalent to self.state_series(normalized=True)[observation_keys].values, without building the Series.
+        observe_net_load, segments, positions = self._obs_layout
+
+        if any(len(module.state) != segment.stop - segment.start for module, segment in segments):
+            # The length of a module's state changed, e.g. its forecaster was set.
+            self._obs_buffer, self._obs_layout = self._get_obs_layout()
+            observe_net_load, segments, positions = self._obs_layout
+
+        if observe_net_load:
+            self._obs_buffer[0] = self.compute_net_load(normalized=True)
+
+        for module, segment in segments:
+            module.write_state(self._obs_buffer[segment], normalized=True)
+
+        if positions is None:
+            return self._obs_buffer.copy()
+
+        return self._obs_buffer[positions]
+
+    def set_forecaster(self,
+                       forecaster,
+                       forecast_horizon=DEFAULT_HORIZON,
+                       forecaster_increase_uncertainty=False,
+                       forecaster_relative_noise=False):
+        super().set_forecaster(forecaster,
+                               forecast_horizon=forecast_horizon,
+                               forecaster_increase_uncertainty=forecaster_increase_uncertainty,
+                               forecaster_relative_noise=forecaster_relative_noise)
+
+        self._obs_buffer, self._obs_layout = self._get_obs_layout()
+
     def _get_step_callback_info(self, action, obs, reward, done, info):
         return {
             'action': action,
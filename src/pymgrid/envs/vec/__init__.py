@@ -0,0 +1,2 @@
+from .vec_env import MicrogridVecEnv
+from .subproc_vec_env import SubprocMicrogridVecEnv
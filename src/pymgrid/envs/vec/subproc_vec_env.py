@@ -0,0 +1,334 @@
+import multiprocessing as mp
+import os
+import traceback
+import numpy as np
+
+from copy import deepcopy
+
+from pymgrid.envs.vec.vec_env import MicrogridVecEnv
+from pymgrid.utils.rng import as_seed_sequence
+from pymgrid.utils.shared_array import SharedArray
+
+
+def _worker(connection, envs, env_slice, specs):
+    buffers = {}
+
+    try:
+        buffers = {key: SharedArray.attach(spec) for key, spec in specs.items()}
+        out = {key: buffer.array[env_slice] for key, buffer in buffers.items()}
+
+        # The parent's actions are read-only here. Each env gets a copy of its action: retrying a step with a copy, as
+        # ray_decorator does, would repeat the logging done before the env writes into its action.
+        actions = out.pop('actions')
+        actions.flags.writeable = False
+
+        connection.send(('ready', None))
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+        return
+
+    try:
+        while True:
+            command = connection.recv()
+            if command is None:
+                break
+
+            command, args = command
+
+            try:
+                if command == 'step':
+                    for j, env in enumerate(envs):
+                        obs, out['rewards'][j], out['dones'][j], _ = env.step(actions[j].copy())
+
+                        if out['dones'][j]:
+                            out['terminal_obs'][j] = obs
+                            obs = env.reset()
+
+                        out['obs'][j] = obs
+                elif command == 'reset':
+                    for j, env in enumerate(envs):
+                        out['obs'][j] = env.reset()
+                elif command == 'seed':
+                    for env, env_seed in zip(envs, args):
+                        env.seed(env_seed)
+                else:
+                    raise ValueError(f'Unknown command {command}.')
+            except Exception:
+                connection.send(('error', traceback.format_exc()))
+            else:
+                connection.send(('done', None))
+    finally:
+        actions = out = None
+        for buffer in buffers.values():
+            buffer.close()
+
+
+class SubprocMicrogridVecEnv:
+    """
+    A batch of microgrid environments, stepped in lockstep in persistent worker processes.
+
+    Use instead of :class:`.MicrogridVecEnv` for environments whose step is expensive, e.g. with gensets or custom
+    battery transition models. The environments are split into contiguous groups, one per worker, and each worker
+    steps its group for the lifetime of the batch.
+
+    Actions, observations, rewards and dones are exchanged through arrays in shared memory: workers read their actions
+    and write their results in place, and only a short command and acknowledgement are sent over a pipe each step.
+    Shared arrays are never passed to the environments themselves: each environment receives a copy of its action.
+
+    The interface is that of :class:`.MicrogridVecEnv`, except that infos only contain the final observation of
+    environments that were reset, under the key ``'terminal_observation'``; module infos are not sent back.
+
+    Parameters
+    ----------
+    envs : list[BaseMicrogridEnv]
+        Environments. All must have flat spaces, and identical observation and action spaces. Each is sent to its
+        worker once, at construction.
+
+    n_workers : int or None, default None
+        Number of worker processes. If None, uses one per environment up to the number of CPUs.
+
+    mp_context : str or None, default None
+        Multiprocessing start method. If None, uses the platform default.
+
+    """
+
+    def __init__(self, envs, n_workers=None, mp_context=None):
+        envs = list(envs)
+
+        if not envs:
+            raise ValueError('envs must not be empty.')
+
+        MicrogridVecEnv._check_envs(envs)
+
+        if n_workers is None:
+            n_workers = min(len(envs), os.cpu_count() or 1)
+
+        if n_workers < 1:
+            raise ValueError('n_workers must be a positive integer.')
+
+        self.observation_space = envs[0].observation_space
+        self.action_space = envs[0].action_space
+        self._num_envs = len(envs)
+
+        n, obs_shape = len(envs), self.observation_space.shape
+
+        self._buffers = {
+            'actions': SharedArray((n, *self.action_space.shape), dtype=self.action_space.dtype),
+            'obs': SharedArray((n, *obs_shape), dtype=self.observation_space.dtype),
+            'terminal_obs': SharedArray((n, *obs_shape), dtype=self.observation_space.dtype),
+            'rewards': SharedArray((n, )),
+            'dones': SharedArray((n, ), dtype=bool)
+        }
+
+        specs = {key: buffer.spec() for key, buffer in self._buffers.items()}
+
+        ctx = mp.get_context(mp_context)
+        self._connections = []
+        self._processes = []
+        self._env_slices = []
+
+        for positions in np.array_split(np.arange(n), min(n_workers, n)):
+            env_slice = slice(positions[0].item(), positions[-1].item() + 1)
+
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child, envs[env_slice], env_slice, specs), daemon=True)
+            process.start()
+            child.close()
+
+            self._connections.append(parent)
+            self._processes.append(process)
+            self._env_slices.append(env_slice)
+
+        try:
+            self._gather()
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def from_env(cls, env, n_envs, **kwargs):
+        """
+        Construct a batch of copies of an environment.
+
+        Parameters
+        ----------
+        env : BaseMicrogridEnv
+            Environment to copy.
+
+        n_envs : int
+            Number of copies.
+
+        **kwargs
+            Keyword arguments passed to the constructor.
+
+        Returns
+        -------
+        vec_env : SubprocMicrogridVecEnv
+            The batch of environments.
+
+        """
+        return cls([deepcopy(env) for _ in range(n_envs)], **kwargs)
+
+    def _command(self, command, args=None):
+        for connection in self._connections:
+            connection.send((command, args))
+
+        self._gather()
+
+    def _gather(self):
+        errors = []
+        for connection in self._connections:
+            status, message = connection.recv()
+            if status == 'error':
+                errors.append(message)
+
+        if errors:
+            raise RuntimeError('Error in environment worker:\n' + '\n'.join(errors))
+
+    def seed(self, seed=None):
+        """
+        Seed every environment with an independent stream.
+
+        Seeds are identical to those of :meth:`.MicrogridVecEnv.seed`.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed. The seed of each environment is spawned from it, in order.
+
+        Returns
+        -------
+        seed_sequence : np.random.SeedSequence
+            The seed sequence the seeds of the environments were spawned from.
+
+        """
+        seed_sequence = as_seed_sequence(seed)
+        env_seeds = seed_sequence.spawn(self._num_envs)
+
+        for connection, env_slice in zip(self._connections, self._env_slices):
+            connection.send(('seed', env_seeds[env_slice]))
+
+        self._gather()
+        return seed_sequence
+
+    def reset(self):
+        """
+        Reset every environment.
+
+        Returns
+        -------
+        obs : np.ndarray, shape (num_envs, obs_dim)
+            Observation of each environment.
+
+        """
+        self._command('reset')
+        return self._buffers['obs'].array.copy()
+
+    def step(self, actions):
+        """
+        Step every environment with its action.
+
+        Environments whose episode is done are reset, and the observation returned for them is the first of their new
+        episode.
+
+        Parameters
+        ----------
+        actions : array-like, shape (num_envs, act_dim) or (num_envs, )
+            Action of each environment. One-dimensional for discrete environments.
+
+        Returns
+        -------
+        obs : np.ndarray, shape (num_envs, obs_dim)
+            Observation of each environment.
+
+        rewards : np.ndarray, shape (num_envs, )
+            Reward of each environment.
+
+        dones : np.ndarray[bool], shape (num_envs, )
+            Whether the episode of each environment is done.
+
+        infos : list[dict]
+            Info of each environment. Contains the final observation of the episode under ``'terminal_observation'``
+            if the environment was reset, and is empty otherwise.
+
+        """
+        actions = np.asarray(actions)
+        shared_actions = self._buffers['actions'].array
+
+        if actions.shape != shared_actions.shape:
+            raise ValueError(f'Expected actions of shape {shared_actions.shape}, received shape {actions.shape}.')
+
+        shared_actions[:] = actions
+        self._command('step')
+
+        dones = self._buffers['dones'].array.copy()
+        terminal_obs = self._buffers['terminal_obs'].array
+        infos = [{'terminal_observation': terminal_obs[j].copy()} if done else {} for j, done in enumerate(dones)]
+
+        return self._buffers['obs'].array.copy(), self._buffers['rewards'].array.copy(), dones, infos
+
+    def sample_action(self):
+        """
+        Sample an action for every environment.
+
+        Returns
+        -------
+        actions : np.ndarray, shape (num_envs, act_dim) or (num_envs, )
+            Random actions.
+
+        """
+        return np.array([self.action_space.sample() for _ in range(self._num_envs)])
+
+    def close(self):
+        """
+        Stop the workers and release the shared memory.
+        """
+        if self._processes is None:
+            return
+
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                try:
+                    connection.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+
+        for connection, process in zip(self._connections, self._processes):
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+
+        self._processes = None
+
+        for buffer in self._buffers.values():
+            buffer.close(unlink=True)
+
+    @property
+    def num_envs(self):
+        """
+        Number of environments.
+
+        Returns
+        -------
+        num_envs : int
+            The number of environments.
+
+        """
+        return self._num_envs
+
+    @property
+    def n_workers(self):
+        return len(self._processes or [])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._num_envs
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(num_envs={self._num_envs}, n_workers={self.n_workers})'
@@ -0,0 +1,259 @@
+import numpy as np
+
+from copy import deepcopy
+
+from pymgrid.envs.base import BaseMicrogridEnv
+from pymgrid.utils.rng import as_seed_sequence
+
+
+class MicrogridVecEnv:
+    """
+    A batch of microgrid environments, stepped in lockstep.
+
+    Takes one action per environment as a single array, and returns the observations, rewards and dones of all
+    environments as contiguous arrays, e.g. to train a policy on a batch of microgrids at once. Environments whose
+    episode is done are reset automatically; their final observation is then passed in their ``info``, under the key
+    ``'terminal_observation'``.
+
+    Parameters
+    ----------
+    envs : list[BaseMicrogridEnv]
+        Environments. All must have flat spaces, and identical observation and action spaces.
+
+    Examples
+    --------
+    >>> from pymgrid.envs import DiscreteMicrogridEnv
+    >>> vec_env = MicrogridVecEnv.from_env(DiscreteMicrogridEnv.from_scenario(0), n_envs=8)
+    >>> obs = vec_env.reset()
+    >>> obs, rewards, dones, infos = vec_env.step(vec_env.sample_action())
+    >>> obs.shape, rewards.shape, dones.shape
+    ((8, 147), (8,), (8,))
+
+    """
+
+    def __init__(self, envs):
+        self.envs = list(envs)
+
+        if not self.envs:
+            raise ValueError('envs must not be empty.')
+
+        self._check_envs(self.envs)
+
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+
+        self._obs = np.zeros((self.num_envs, *self.observation_space.shape), dtype=self.observation_space.dtype)
+        self._rewards = np.zeros(self.num_envs)
+        self._dones = np.zeros(self.num_envs, dtype=bool)
+
+    @staticmethod
+    def _check_envs(envs):
+        for env in envs:
+            if not isinstance(env, BaseMicrogridEnv):
+                raise TypeError(f'Environments must be BaseMicrogridEnv instances, received {type(env).__name__}.')
+
+            if not env.flat_spaces:
+                raise ValueError('Environments must have flat spaces.')
+
+        first = envs[0]
+        mismatched = [j for j, env in enumerate(envs)
+                      if env.observation_space != first.observation_space or env.action_space != first.action_space]
+
+        if mismatched:
+            raise ValueError(f'Environments {mismatched} do not have the same observation and action spaces as the '
+                             f'first environment.')
+
+    @classmethod
+    def from_env(cls, env, n_envs):
+        """
+        Construct a batch of copies of an environment.
+
+        Parameters
+        ----------
+        env : BaseMicrogridEnv
+            Environment to copy.
+
+        n_envs : int
+            Number of copies.
+
+        Returns
+        -------
+        vec_env : MicrogridVecEnv
+            The batch of environments.
+
+        """
+        return cls([deepcopy(env) for _ in range(n_envs)])
+
+    @classmethod
+    def from_microgrids(cls, microgrids, env_class, **env_kwargs):
+        """
+        Construct a batch of environments from microgrids, e.g. one per zone.
+
+        Parameters
+        ----------
+        microgrids : list[pymgrid.Microgrid]
+            Microgrids to wrap.
+
+        env_class : type
+            Subclass of :class:`.BaseMicrogridEnv` to wrap the microgrids with.
+
+        **env_kwargs
+            Keyword arguments passed to ``env_class.from_microgrid``.
+
+        Returns
+        -------
+        vec_env : MicrogridVecEnv
+            The batch of environments.
+
+        """
+        return cls([env_class.from_microgrid(microgrid, **env_kwargs) for microgrid in microgrids])
+
+    @classmethod
+    def from_scenarios(cls, env_class, microgrid_numbers, **env_kwargs):
+        """
+        Construct a batch of environments from the `pymgrid25` benchmark microgrids.
+
+        Parameters
+        ----------
+        env_class : type
+            Subclass of :class:`.BaseMicrogridEnv` to construct.
+
+        microgrid_numbers : iterable[int]
+            Numbers of the benchmark microgrids. The microgrids must have the same modules, such that their spaces
+            match; e.g. microgrids 0, 4, 6, 11, 12, 14 and 16.
+
+        **env_kwargs
+            Keyword arguments passed to ``env_class.from_scenario``. Pass ``observation_keys`` to observe the same
+            keys in every microgrid.
+
+        Returns
+        -------
+        vec_env : MicrogridVecEnv
+            The batch of environments.
+
+        """
+        return cls([env_class.from_scenario(microgrid_number=n, **env_kwargs) for n in microgrid_numbers])
+
+    def seed(self, seed=None):
+        """
+        Seed every environment with an independent stream.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed. The seed of each environment is spawned from it, in order.
+
+        Returns
+        -------
+        seed_sequence : np.random.SeedSequence
+            The seed sequence the seeds of the environments were spawned from.
+
+        """
+        seed_sequence = as_seed_sequence(seed)
+
+        for env, env_seed in zip(self.envs, seed_sequence.spawn(self.num_envs)):
+            env.seed(env_seed)
+
+        return seed_sequence
+
+    def reset(self):
+        """
+        Reset every environment.
+
+        Returns
+        -------
+        obs : np.ndarray, shape (num_envs, obs_dim)
+            Observation of each environment.
+
+        """
+        for j, env in enumerate(self.envs):
+            self._obs[j] = env.reset()
+
+        return self._obs.copy()
+
+    def step(self, actions):
+        """
+        Step every environment with its action.
+
+        Environments whose episode is done are reset, and the observation returned for them is the first of their new
+        episode.
+
+        Parameters
+        ----------
+        actions : array-like, shape (num_envs, act_dim) or (num_envs, )
+            Action of each environment. One-dimensional for discrete environments.
+
+        Returns
+        -------
+        obs : np.ndarray, shape (num_envs, obs_dim)
+            Observation of each environment.
+
+        rewards : np.ndarray, shape (num_envs, )
+            Reward of each environment.
+
+        dones : np.ndarray[bool], shape (num_envs, )
+            Whether the episode of each environment is done.
+
+        infos : list[dict]
+            Info of each environment. Includes the final observation of the episode under ``'terminal_observation'``
+            if the environment was reset.
+
+        """
+        actions = np.asarray(actions)
+
+        if len(actions) != self.num_envs:
+            raise ValueError(f'Expected {self.num_envs} actions, received {len(actions)}.')
+
+        infos = []
+
+        for j, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, self._rewards[j], self._dones[j], info = env.step(action)
+
+            if self._dones[j]:
+                info = {**info, 'terminal_observation': obs}
+                obs = env.reset()
+
+            self._obs[j] = obs
+            infos.append(info)
+
+        return self._obs.copy(), self._rewards.copy(), self._dones.copy(), infos
+
+    def sample_action(self):
+        """
+        Sample an action for every environment.
+
+        Returns
+        -------
+        actions : np.ndarray, shape (num_envs, act_dim) or (num_envs, )
+            Random actions.
+
+        """
+        return np.array([env.action_space.sample() for env in self.envs])
+
+    def close(self):
+        """
+        Close the environments.
+
+        Present for compatibility with other vectorized environments; there is nothing to release.
+
+        """
+        pass
+
+    @property
+    def num_envs(self):
+        """
+        Number of environments.
+
+        Returns
+        -------
+        num_envs : int
+            The number of environments.
+
+        """
+        return len(self.envs)
+
+    def __len__(self):
+        return self.num_envs
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(num_envs={self.num_envs}, env={self.envs[0].__class__.__name__})'
@@ -1,9 +1,11 @@
 import numpy as np
 from abc import abstractmethod
+from numpy.lib.stride_tricks import sliding_window_view
 
 from pandas.api.types import is_number, is_numeric_dtype
 
 from pymgrid.utils.ray import ray_decorator
+from pymgrid.utils.rng import NormalStream
 from pymgrid.utils.space import ModuleSpace
 
 
@@ -143,11 +145,111 @@ class Forecaster:
         lt_lb = forecast < lb
         gt_ub = forecast > ub
 
-        forecast[lt_lb] = lb[lt_lb]
-        forecast[gt_ub] = ub[gt_ub]
+        # Oracle forecasts are views of the time series, which may be read-only.
+        if lt_lb.any():
+            forecast[lt_lb] = lb[lt_lb]
+        if gt_ub.any():
+            forecast[gt_ub] = ub[gt_ub]
 
         return forecast
 
+    def seed(self, seed=None):
+        """
+        Seed the forecaster's random number generator.
+
+        Deterministic forecasters have none, and ignore the seed.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed.
+
+        """
+        pass
+
+    def snapshot(self):
+        """
+        Current state of the forecaster's random number generator.
+
+        Returns
+        -------
+        snapshot : object
+            State to pass to :meth:`.restore`. None for deterministic forecasters.
+
+        """
+        return None
+
+    def restore(self, snapshot):
+        """
+        Restore the state of the forecaster's random number generator.
+
+        Parameters
+        ----------
+        snapshot : object
+            State returned by :meth:`.snapshot`.
+
+        """
+        pass
+
+    def forecast_episode(self, time_series, start, stop, n):
+        """
+        Forecast from every step in ``[start, stop)`` at once.
+
+        Equivalent to stacking the per-step forecasts, as made by a time series module, from each step.
+        Subclasses may override this with a vectorized implementation.
+
+        Parameters
+        ----------
+        time_series : np.ndarray, shape (len, n_components)
+            The time series to forecast.
+
+        start : int
+            First step to forecast from.
+
+        stop : int
+            Step after the last step to forecast from. May be up to one past the end of the time series.
+
+        n : int
+            Forecast horizon.
+
+        Returns
+        -------
+        forecasts : np.ndarray, shape (stop - start, n, n_components)
+            Forecasts from each step.
+
+        """
+        forecasts = np.empty((stop - start, n, time_series.shape[1]))
+
+        for j, step in enumerate(range(start, stop)):
+            try:
+                val_c = time_series[step, :]
+            except IndexError:
+                forecast = self.full_pad(time_series.shape, n)
+            else:
+                forecast = self(val_c=val_c, val_c_n=time_series[1 + step:1 + step + n, :], n=n)
+
+            forecasts[j] = forecast
+
+        return forecasts
+
+    def _padded_series(self, time_series, start, stop, n):
+        # time_series[start+1:stop+n], with missing rows past the end filled as _pad would.
+        # None if the fill value depends on the position in the horizon.
+        fill = self._fill_arr.reshape((-1, time_series.shape[1]))[-n:]
+
+        if not (fill == fill[0]).all():
+            return None
+
+        available = time_series[start + 1:stop + n, :]
+        pad = np.repeat(fill[:1], stop - start + n - 1 - len(available), axis=0)
+
+        return np.concatenate((available, pad))
+
+    def _bounds(self, n):
+        lb = self._forecast_shaped_space.unnormalized.low[-n:]
+        ub = self._forecast_shaped_space.unnormalized.high[-n:]
+        return lb, ub
+
     @property
     def observation_space(self):
         return self._observation_space
@@ -216,6 +318,28 @@ class OracleForecaster(Forecaster):
     def _forecast(self, val_c, val_c_n, n):
         return val_c_n
 
+    def forecast_episode(self, time_series, start, stop, n):
+        """
+        Forecast from every step in ``[start, stop)`` at once.
+
+        Returns read-only sliding windows over a single padded copy of the time series, without copying the
+        forecast of each step. See :meth:`.Forecaster.forecast_episode`.
+
+        """
+        padded = self._padded_series(time_series, start, stop, n) if n else None
+
+        if padded is None:
+            return super().forecast_episode(time_series, start, stop, n)
+
+        lb, ub = self._bounds(n)
+
+        if (lb == lb[0]).all() and (ub == ub[0]).all():
+            np.clip(padded, lb[0], ub[0], out=padded)
+            return sliding_window_view(padded, n, axis=0).transpose(0, 2, 1)
+
+        forecasts = sliding_window_view(padded, n, axis=0).transpose(0, 2, 1).copy()
+        return np.clip(forecasts, lb, ub, out=forecasts)
+
 
 class GaussianNoiseForecaster(Forecaster):
     """
@@ -249,6 +373,7 @@ class GaussianNoiseForecaster(Forecaster):
 
         self._noise_size = self._forecast_shaped_space.shape
         self._noise_std = self._get_noise_std(time_series)
+        self._noise = None
 
     def _get_noise_std(self, time_series):
         scalar_val = self.input_noise_std
@@ -265,19 +390,75 @@ class GaussianNoiseForecaster(Forecaster):
         else:
             return scalar_val
 
+    def seed(self, seed=None):
+        """
+        Seed the forecaster's random number generator.
+
+        Until seeded, noise is drawn from the global ``np.random`` state. Once seeded, noise is drawn from a
+        :class:`numpy.random.Generator` owned by the forecaster, in large blocks.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed.
+
+        """
+        self._noise = NormalStream(seed)
+
+    def snapshot(self):
+        return None if self._noise is None else self._noise.snapshot()
+
+    def restore(self, snapshot):
+        if snapshot is None:
+            self._noise = None
+            return
+
+        if self._noise is None:
+            self._noise = NormalStream()
+
+        self._noise.restore(snapshot)
+
+    def _normal(self, scale, size):
+        if self._noise is None:
+            return np.random.normal(scale=scale, size=size)
+
+        return scale * self._noise.standard_normal(size)
+
     def _get_noise(self, size):
-        try:
-            return np.random.normal(scale=self._noise_std, size=size)
-        except ValueError:
-            noise_std = self._noise_std[:size[0], :]
+        noise_std = self._noise_std
+
+        if isinstance(noise_std, np.ndarray) and noise_std.shape != tuple(size):
+            noise_std = noise_std[:size[0], :]
             if noise_std.shape != size:
                 raise RuntimeError(f'Cannot broadcast shapes {self._noise_std.shape} and {size}.')
 
-            return np.random.normal(scale=noise_std, size=size)
+        return self._normal(noise_std, size)
 
     def _forecast(self, val_c, val_c_n, n):
         return val_c_n + self._get_noise(val_c_n.shape).reshape(val_c_n.shape)
 
+    def forecast_episode(self, time_series, start, stop, n):
+        """
+        Forecast from every step in ``[start, stop)`` at once.
+
+        Draws the noise of every step in a single call. See :meth:`.Forecaster.forecast_episode`.
+
+        """
+        padded = self._padded_series(time_series, start, stop, n) if n else None
+
+        if padded is None or np.shape(self._noise_std) not in ((), (n, time_series.shape[1])):
+            return super().forecast_episode(time_series, start, stop, n)
+
+        forecasts = sliding_window_view(padded, n, axis=0).transpose(0, 2, 1).copy()
+
+        # Noise is only added to true values, not to the padding past the end of the time series.
+        available = np.arange(start + 1, stop + 1)[:, None] + np.arange(n) < len(time_series)
+        noise = self._normal(self._noise_std, forecasts.shape)
+        forecasts += noise * available[..., None]
+
+        lb, ub = self._bounds(n)
+        return np.clip(forecasts, lb, ub, out=forecasts)
+
     @property
     def noise_std(self):
         return self._noise_std
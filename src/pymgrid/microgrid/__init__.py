@@ -1,3 +1,4 @@
 DEFAULT_HORIZON = 23
 
 from .microgrid import Microgrid
+from .ensemble import MicrogridEnsemble
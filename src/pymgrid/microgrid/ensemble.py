@@ -0,0 +1,675 @@
+import numpy as np
+
+from pymgrid.modules import BatteryModule, GensetModule, GridModule, LoadModule, RenewableModule, UnbalancedEnergyModule
+from pymgrid.modules.battery.transition_models import BatteryTransitionModel
+from pymgrid.utils.rng import as_seed_sequence
+
+
+class _EnsembleModule:
+    """
+    Vectorized copy of a module, holding its state in one entry per realization.
+
+    :meta private:
+
+    """
+    # State of the module when the ensemble is constructed, by attribute name.
+    initial_state = {}
+
+    def __init__(self, module):
+        if module.raise_errors:
+            raise ValueError(f'{module.__class__.__name__} must not raise errors; actions are clipped to the bounds of '
+                             f'each realization.')
+
+        self.module = module
+
+    def reset(self, n_realizations):
+        for key, value in self.initial_state.items():
+            setattr(self, key, np.full(n_realizations, value))
+
+    def state_dict(self):
+        return {}
+
+
+class _TimeSeriesEnsemble(_EnsembleModule):
+    """
+    Time series module whose values are sampled around the module's time series in each realization.
+
+    :meta private:
+
+    """
+    _noisy_columns = slice(None)
+
+    def __init__(self, module, noise_std, relative_noise):
+        super().__init__(module)
+
+        self.time_series = module.time_series
+        self.keys = module._state_dict_keys['current']
+
+        series = np.asarray(self.time_series)
+        scale = np.zeros(series.shape[1])
+
+        if relative_noise:
+            scale[self._noisy_columns] = noise_std * np.abs(series[:, self._noisy_columns].mean(axis=0))
+        else:
+            scale[self._noisy_columns] = noise_std
+
+        self.noise_scale = scale
+
+        # Sampled values keep the sign of the time series, e.g. loads are non-positive.
+        self.lower = np.where(series.min(axis=0) < 0, -np.inf, 0.0)
+        self.upper = np.where(series.max(axis=0) > 0, np.inf, 0.0)
+
+        self.values = None
+
+    def sample(self, step, rng, n_realizations):
+        values = np.repeat(np.asarray(self.time_series[step], dtype=float)[None, :], n_realizations, axis=0)
+
+        if self.noise_scale.any():
+            values += self.noise_scale * rng.standard_normal(values.shape)
+            np.clip(values, self.lower, self.upper, out=values)
+
+        self.values = values
+
+    def state_dict(self):
+        return dict(zip(self.keys, self.values.T))
+
+
+class _LoadEnsemble(_TimeSeriesEnsemble):
+    @property
+    def load(self):
+        return -1.0 * self.values[:, 0]
+
+
+class _RenewableEnsemble(_TimeSeriesEnsemble):
+    @property
+    def renewable(self):
+        return self.values[:, 0]
+
+
+class _GridEnsemble(_TimeSeriesEnsemble):
+    # Noise is added to import and export prices; CO2 intensity and grid status are left as is.
+    _noisy_columns = slice(0, 2)
+
+
+class _ControllableEnsemble(_EnsembleModule):
+    """
+    Controllable module, stepped with one action per realization.
+
+    :meta private:
+
+    """
+    def __init__(self, module):
+        super().__init__(module)
+
+        space = module.action_space
+        self.action_dim = space['normalized'].shape[0]
+        self.clip_vals = space.clip_vals
+
+        self.norm_low, self.norm_high = space['normalized'].low, space['normalized'].high
+        self.unnorm_low, self.unnorm_high = space['unnormalized'].low, space['unnormalized'].high
+
+        # As in ModuleSpace.
+        self.norm_spread = np.where(self.norm_high == self.norm_low, 1.0, self.norm_high - self.norm_low)
+        self.unnorm_spread = np.where(self.unnorm_high == self.unnorm_low, 1.0, self.unnorm_high - self.unnorm_low)
+
+    def denormalize(self, action, normalized):
+        if normalized:
+            if self.clip_vals:
+                action = np.clip(action, self.norm_low, self.norm_high)
+
+            return self.unnorm_low + (self.unnorm_spread / self.norm_spread) * (action - self.norm_low)
+
+        if self.clip_vals:
+            return np.clip(action, self.unnorm_low, self.unnorm_high)
+
+        return action
+
+    def step(self, action, normalized):
+        """
+        Returns
+        -------
+        reward, provided_energy, absorbed_energy : np.ndarray, shape (n_realizations, )
+
+        """
+        raise NotImplementedError
+
+
+class _BatteryEnsemble(_ControllableEnsemble):
+    def __init__(self, module):
+        if type(module.battery_transition_model) is not BatteryTransitionModel:
+            raise ValueError('Batteries must use the default BatteryTransitionModel.')
+
+        super().__init__(module)
+
+        self.min_capacity, self.max_capacity = module.min_capacity, module.max_capacity
+        self.max_charge, self.max_discharge = module.max_charge, module.max_discharge
+        self.efficiency, self.battery_cost_cycle = module.efficiency, module.battery_cost_cycle
+
+        self.initial_state = {'current_charge': float(module.current_charge), 'soc': float(module.soc)}
+        self.current_charge = self.soc = None
+
+    @property
+    def max_production(self):
+        available = np.minimum(self.max_discharge, self.current_charge - self.min_capacity)
+        return np.where(available < 0, available / self.efficiency, available * self.efficiency)
+
+    @property
+    def max_consumption(self):
+        available = np.minimum(self.max_charge, self.max_capacity - self.current_charge)
+        return np.where(available > 0, available / self.efficiency, available * self.efficiency)
+
+    def step(self, action, normalized):
+        energy = self.denormalize(action, normalized)[:, 0]
+        as_source = energy >= 0
+
+        provided = np.where(as_source, np.minimum(energy, self.max_production), 0.0)
+        absorbed = np.where(as_source, 0.0, np.minimum(-1.0 * energy, self.max_consumption))
+        internal_change = np.where(as_source, -1.0 * provided / self.efficiency, absorbed * self.efficiency)
+
+        self.current_charge = np.maximum(self.current_charge + internal_change, self.min_capacity)
+        self.soc = self.current_charge / self.max_capacity
+
+        return -1.0 * (np.abs(internal_change) * self.battery_cost_cycle), provided, absorbed
+
+    def state_dict(self):
+        return {'soc': self.soc, 'current_charge': self.current_charge}
+
+
+class _GensetEnsemble(_ControllableEnsemble):
+    def __init__(self, module):
+        if callable(module.genset_cost):
+            raise ValueError('Gensets must have a scalar genset_cost.')
+
+        super().__init__(module)
+
+        self.running_min_production = module.running_min_production
+        self.running_max_production = module.running_max_production
+        self.marginal_cost = module.genset_cost + module.cost_per_unit_co2 * module.co2_per_unit
+        self.start_up_time, self.wind_down_time = module.start_up_time, module.wind_down_time
+        self.allow_abortion = module.allow_abortion
+
+        state = module.state_dict()
+        self.initial_state = {key: int(state[key])
+                              for key in ('current_status', 'goal_status', 'steps_until_up', 'steps_until_down')}
+
+        self.current_status = self.goal_status = self.steps_until_up = self.steps_until_down = None
+
+    def _reset_up_down_times(self, mask):
+        running = self.current_status == 1
+        self.steps_until_up = np.where(mask, np.where(running, 0, self.start_up_time), self.steps_until_up)
+        self.steps_until_down = np.where(mask, np.where(running, self.wind_down_time, 0), self.steps_until_down)
+
+    def update_status(self, goal_status):
+        """
+        Vectorized :meth:`.GensetModule.update_status`.
+        """
+        goal_status = np.round(goal_status).astype(np.int64)
+
+        # Realizations in equilibrium are left as is.
+        changing = (goal_status != self.current_status) | (self.current_status != self.goal_status)
+
+        instant = ((self.start_up_time == 0) & (goal_status == 1)) | ((self.wind_down_time == 0) & (goal_status == 0))
+        set_goal = changing & (goal_status != self.goal_status) & (self.allow_abortion | instant)
+        self.goal_status = np.where(set_goal, goal_status, self.goal_status)
+
+        # Finish in-progress changes.
+        finish_up = changing & (self.steps_until_up == 0) & (self.goal_status == 1)
+        finish_down = changing & ~finish_up & (self.steps_until_down == 0) & (self.goal_status == 0)
+        finished = finish_up | finish_down
+
+        self.current_status = np.where(finish_up, 1, np.where(finish_down, 0, self.current_status))
+
+        # Non-instantaneous updates: aborting a change, or requesting a new one.
+        pending = changing & ~finished
+        abort = pending & (goal_status == self.current_status) & (self.current_status != self.goal_status)
+        abort &= self.allow_abortion
+        request = pending & ~abort & (self.current_status == self.goal_status) & (self.goal_status != goal_status)
+
+        self._reset_up_down_times(finished | abort | request)
+        self.goal_status = np.where(abort | request, goal_status, self.goal_status)
+
+        in_progress = pending & (self.goal_status != self.current_status)
+        self.steps_until_down = np.where(in_progress & (self.goal_status == 0), self.steps_until_down - 1,
+                                         self.steps_until_down)
+        self.steps_until_up = np.where(in_progress & (self.goal_status == 1), self.steps_until_up - 1,
+                                       self.steps_until_up)
+
+    def step(self, action, normalized):
+        action = self.denormalize(action, normalized)
+        self.update_status(action[:, 0])
+
+        energy = action[:, 1]
+        max_production = self.current_status * self.running_max_production
+        min_production = self.current_status * self.running_min_production
+
+        # Gensets are not sinks: negative energy provides nothing.
+        provided = np.where(energy < 0, 0.0, np.clip(energy, min_production, max_production))
+
+        return -1.0 * self.marginal_cost * provided, provided, np.zeros_like(provided)
+
+    def state_dict(self):
+        return {
+            'current_status': self.current_status,
+            'goal_status': self.goal_status,
+            'steps_until_up': self.steps_until_up,
+            'steps_until_down': self.steps_until_down
+        }
+
+
+class _ControllableGridEnsemble(_ControllableEnsemble):
+    def __init__(self, module, series):
+        super().__init__(module)
+        self.series = series
+        self.max_import, self.max_export = module.max_import, module.max_export
+        self.cost_per_unit_co2 = module.cost_per_unit_co2
+
+    def step(self, action, normalized):
+        energy = self.denormalize(action, normalized)[:, 0]
+        import_price, export_price, co2_per_kwh, status = self.series.values.T
+
+        as_source = energy >= 0
+        provided = np.where(as_source, np.minimum(energy, self.max_import * status), 0.0)
+        absorbed = np.where(as_source, 0.0, np.minimum(-1.0 * energy, self.max_export * status))
+
+        co2_cost = -1.0 * self.cost_per_unit_co2 * provided * co2_per_kwh
+        reward = np.where(as_source, -1 * import_price * provided + co2_cost, export_price * absorbed)
+
+        return reward, provided, absorbed
+
+    def state_dict(self):
+        return self.series.state_dict()
+
+
+class MicrogridEnsemble:
+    """
+    Monte Carlo ensemble of one microgrid, simulated under many realizations of its time series at once.
+
+    Each realization samples the load, renewable production and grid prices of every step around the microgrid's
+    time series, with Gaussian noise as in :class:`.GaussianNoiseForecaster`. The state of every battery and genset is
+    held as an array with one entry per realization, and :meth:`.step` advances all realizations with array
+    operations. With ``noise_std=0``, every realization matches stepping the microgrid itself.
+
+    The microgrid is used as a template and is not modified: the ensemble starts from its current step and state.
+
+    Supported modules are loads, renewables, batteries with the default transition model, gensets with a scalar cost,
+    controllable grids and the unbalanced energy module. Modules must not raise errors; as in the microgrid, actions
+    are clipped to what each realization can provide or absorb.
+
+    Parameters
+    ----------
+    microgrid : pymgrid.Microgrid
+        Microgrid to simulate. Must not define a ``reward_shaping_func``.
+
+    n_realizations : int
+        Number of realizations.
+
+    noise_std : float or dict[str, float], default 0.1
+        Standard deviation of the noise added to time series, either for every time series module or by module name,
+        e.g. ``{'load': 0.1, 'pv': 0.2}``; modules that are missing are not sampled. Sampled values keep the sign of
+        their time series.
+
+    relative_noise : bool, default True
+        Whether ``noise_std`` is relative to the mean of each time series.
+
+    seed : None, int, array-like[int] or np.random.SeedSequence, default None
+        Seed of the noise.
+
+    Examples
+    --------
+    >>> from pymgrid import Microgrid
+    >>> ensemble = MicrogridEnsemble(Microgrid.from_scenario(0), n_realizations=1000, seed=0)
+    >>> results = ensemble.run(np.array([0.5, 0.5]), n_steps=24)
+    >>> results['cost'].shape, results['cost_quantiles'].shape
+    ((1000,), (3,))
+
+    """
+
+    def __init__(self, microgrid, n_realizations, noise_std=0.1, relative_noise=True, seed=None):
+        if microgrid.reward_shaping_func is not None:
+            raise ValueError('MicrogridEnsemble does not support a reward_shaping_func.')
+
+        if int(n_realizations) != n_realizations or n_realizations < 1:
+            raise ValueError('n_realizations must be a positive integer.')
+
+        self.microgrid = microgrid
+        self.n_realizations = int(n_realizations)
+
+        plan = microgrid._step_plan
+        self._modules = {}
+        self._series = []
+
+        def module_noise_std(name):
+            if isinstance(noise_std, dict):
+                return noise_std.get(name, 0.0)
+            return noise_std
+
+        def time_series(name, module, cls):
+            series = cls(module, module_noise_std(name), relative_noise)
+            self._series.append(series)
+            return series
+
+        self._fixed = []
+        for name, modules in plan.fixed:
+            for module in modules:
+                if not isinstance(module, LoadModule):
+                    raise TypeError(f"Fixed module '{name}' must be a LoadModule, not {type(module).__name__}.")
+                self._add(name, time_series(name, module, _LoadEnsemble), self._fixed)
+
+        self._controllable = []
+        for name, modules in plan.controllable:
+            for module in modules:
+                if isinstance(module, BatteryModule):
+                    ensemble_module = _BatteryEnsemble(module)
+                elif isinstance(module, GensetModule):
+                    ensemble_module = _GensetEnsemble(module)
+                elif isinstance(module, GridModule):
+                    ensemble_module = _ControllableGridEnsemble(module, time_series(name, module, _GridEnsemble))
+                else:
+                    raise TypeError(f"Controllable module '{name}' must be a BatteryModule, GensetModule or "
+                                    f"GridModule, not {type(module).__name__}.")
+
+                self._add(name, ensemble_module, self._controllable)
+
+        self._flex = []
+        for name, modules in plan.flex:
+            for module in modules:
+                if isinstance(module, RenewableModule):
+                    ensemble_module = time_series(name, module, _RenewableEnsemble)
+                elif isinstance(module, UnbalancedEnergyModule):
+                    ensemble_module = _EnsembleModule(module)
+                else:
+                    raise TypeError(f"Flex module '{name}' must be a RenewableModule or UnbalancedEnergyModule, "
+                                    f"not {type(module).__name__}.")
+
+                self._add(name, ensemble_module, self._flex)
+
+        # Actions are laid out as in Microgrid.rollout: by sorted module name.
+        self._action_slices, self.action_dim = {}, 0
+        for name in sorted({name for name, _ in plan.controllable}):
+            for ensemble_module in self._modules[name]:
+                self._action_slices[id(ensemble_module)] = slice(self.action_dim,
+                                                                 self.action_dim + ensemble_module.action_dim)
+                self.action_dim += ensemble_module.action_dim
+
+        self._initial_step = microgrid.current_step
+        self._final_step = min((series.module.final_step for series in self._series), default=np.inf)
+        self._current_step = None
+
+        self._rng = None
+        self.seed(seed)
+        self.reset()
+
+    def _add(self, name, ensemble_module, stage):
+        self._modules.setdefault(name, []).append(ensemble_module)
+        stage.append(ensemble_module)
+
+    def seed(self, seed=None):
+        """
+        Seed the noise of the realizations.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed.
+
+        Returns
+        -------
+        seed_sequence : np.random.SeedSequence
+            The seed sequence the noise is drawn from.
+
+        """
+        seed_sequence = as_seed_sequence(seed)
+        self._rng = np.random.default_rng(seed_sequence)
+        return seed_sequence
+
+    def reset(self):
+        """
+        Return every realization to the step and state of the microgrid, and sample the time series of that step.
+
+        Returns
+        -------
+        state_dict : dict[str, list[dict[str, np.ndarray]]]
+            State of every realization. See :meth:`.state_dict`.
+
+        """
+        self._current_step = self._initial_step
+
+        for modules in self._modules.values():
+            for ensemble_module in modules:
+                ensemble_module.reset(self.n_realizations)
+
+        self._sample()
+        return self.state_dict()
+
+    def _sample(self):
+        if self._current_step < self._final_step:
+            for series in self._series:
+                series.sample(self._current_step, self._rng, self.n_realizations)
+
+    def step(self, actions, normalized=True):
+        """
+        Run every realization for a single step.
+
+        Parameters
+        ----------
+        actions : array-like, shape (n_realizations, act_dim) or (act_dim, )
+            Flat action of each realization, or one action for all realizations. Laid out as in
+            :meth:`.Microgrid.rollout`.
+
+        normalized : bool, default True
+            Whether actions are normalized.
+
+        Returns
+        -------
+        reward : np.ndarray, shape (n_realizations, )
+            Reward of each realization.
+
+        done : bool
+            Whether the realizations terminate.
+
+        info : dict[str, np.ndarray]
+            Energy provided to and absorbed from the microgrid overall, and unmet load and excess production, of each
+            realization; keyed by ``'provided_energy'``, ``'absorbed_energy'``, ``'loss_load'`` and
+            ``'overgeneration'``.
+
+        """
+        actions = np.asarray(actions, dtype=float)
+
+        shape = (self.n_realizations, self.action_dim)
+
+        if actions.shape not in (shape, shape[1:]):
+            raise ValueError(f'Expected actions of shape {shape} or {shape[1:]}, received shape {actions.shape}.')
+
+        actions = np.broadcast_to(actions, shape)
+
+        n = self.n_realizations
+        reward = np.zeros(n)
+
+        # Fixed modules: loads
+        fixed_consumed = np.zeros(n)
+        for load in self._fixed:
+            fixed_consumed += load.load
+
+        # Controllable modules
+        controllable_provided, controllable_consumed = np.zeros(n), fixed_consumed.copy()
+        for ensemble_module in self._controllable:
+            action = actions[:, self._action_slices[id(ensemble_module)]]
+            module_reward, provided, absorbed = ensemble_module.step(action, normalized)
+
+            reward += module_reward
+            controllable_provided += provided
+            controllable_consumed += absorbed
+
+        difference = controllable_provided - controllable_consumed
+
+        # Flex modules: renewables provide what is needed in order, and the unbalanced energy module the rest.
+        excess = difference > 0
+        energy_needed = np.where(excess, 0.0, -1.0 * difference)
+        energy_excess = np.where(excess, difference, 0.0)
+
+        loss_load, overgeneration = np.zeros(n), np.zeros(n)
+        flex_provided, flex_consumed = np.zeros(n), np.zeros(n)
+
+        for ensemble_module in self._flex:
+            if isinstance(ensemble_module, _RenewableEnsemble):
+                provided = np.minimum(ensemble_module.renewable, energy_needed)
+                energy_needed = energy_needed - provided
+                flex_provided += provided
+            else:
+                module = ensemble_module.module
+                reward -= module.loss_load_cost * energy_needed + module.overgeneration_cost * energy_excess
+
+                loss_load += energy_needed
+                overgeneration += energy_excess
+                flex_provided += energy_needed
+                flex_consumed += energy_excess
+                energy_needed, energy_excess = np.zeros(n), np.zeros(n)
+
+        provided = controllable_provided + flex_provided
+        consumed = controllable_consumed + flex_consumed
+
+        if not np.isclose(provided, consumed).all():
+            raise RuntimeError('Microgrid modules unable to balance energy production with consumption.')
+
+        done = self._current_step >= self._final_step - 1
+
+        self._current_step += 1
+        self._sample()
+
+        info = {
+            'provided_energy': provided,
+            'absorbed_energy': consumed,
+            'loss_load': loss_load,
+            'overgeneration': overgeneration
+        }
+
+        return reward, done, info
+
+    def run(self, policy, n_steps=None, normalized=True, quantiles=(0.05, 0.5, 0.95), reset=True):
+        """
+        Run every realization under a policy, and summarize the distribution of outcomes.
+
+        Parameters
+        ----------
+        policy : callable or array-like, shape (n_steps, act_dim), (n_steps, n_realizations, act_dim) or (act_dim, )
+            Either a callable that takes the state of the realizations -- as returned by :meth:`.state_dict` -- and
+            returns their actions, or the actions of each step, shared by all realizations or not, or a single action
+            for every step.
+
+        n_steps : int or None, default None
+            Number of steps. If None, runs until the realizations terminate, or for ``len(policy)`` steps if
+            ``policy`` is an array of actions per step.
+
+        normalized : bool, default True
+            Whether actions are normalized.
+
+        quantiles : array-like of float, default (0.05, 0.5, 0.95)
+            Quantiles of the cost to compute.
+
+        reset : bool, default True
+            Whether to reset the realizations before running.
+
+        Returns
+        -------
+        results : dict
+            * ``'reward'`` : np.ndarray, shape (n_steps, n_realizations)
+                Reward of each step and realization.
+            * ``'loss_load'`` : np.ndarray, shape (n_steps, n_realizations)
+                Unmet load of each step and realization.
+            * ``'cost'`` : np.ndarray, shape (n_realizations, )
+                Total cost -- negative total reward -- of each realization.
+            * ``'cost_quantiles'`` : np.ndarray, shape (len(quantiles), )
+                Quantiles of the cost.
+            * ``'loss_load_probability'`` : float
+                Fraction of realizations with unmet load in any step.
+            * ``'step_loss_load_probability'`` : np.ndarray, shape (n_steps, )
+                Fraction of realizations with unmet load in each step.
+
+        """
+        if reset:
+            self.reset()
+
+        if callable(policy):
+            actions = None
+        else:
+            actions = np.asarray(policy, dtype=float)
+            if actions.ndim == 1:
+                actions = actions[None, ...]
+            elif n_steps is None:
+                n_steps = len(actions)
+
+        if n_steps is None:
+            n_steps = self._final_step - self._current_step
+
+        if np.isinf(n_steps):
+            raise ValueError('n_steps must be passed for microgrids without a final step.')
+
+        n_steps = int(n_steps)
+
+        if actions is not None and len(actions) not in (1, n_steps):
+            raise ValueError(f'Expected actions for {n_steps} steps, received {len(actions)}.')
+
+        rewards = np.zeros((n_steps, self.n_realizations))
+        loss_load = np.zeros((n_steps, self.n_realizations))
+
+        n = 0
+        while n < n_steps:
+            if actions is None:
+                action = policy(self.state_dict())
+            else:
+                action = actions[n if len(actions) > 1 else 0]
+
+            rewards[n], done, info = self.step(action, normalized=normalized)
+            loss_load[n] = info['loss_load']
+            n += 1
+
+            if done:
+                break
+
+        rewards, loss_load = rewards[:n], loss_load[:n]
+        cost = -1.0 * rewards.sum(axis=0)
+        has_loss_load = loss_load > 0
+
+        return {
+            'reward': rewards,
+            'loss_load': loss_load,
+            'cost': cost,
+            'cost_quantiles': np.quantile(cost, quantiles),
+            'loss_load_probability': has_loss_load.any(axis=0).mean(),
+            'step_loss_load_probability': has_loss_load.mean(axis=1)
+        }
+
+    def state_dict(self):
+        """
+        State of every realization, in the format of :meth:`.Microgrid.state_dict`.
+
+        Forecasts are not included.
+
+        Returns
+        -------
+        state_dict : dict[str, list[dict[str, np.ndarray]]]
+            State of each module by module name, with one array of shape ``(n_realizations, )`` per key.
+
+        """
+        return {name: [ensemble_module.state_dict() for ensemble_module in modules]
+                for name, modules in self._modules.items()}
+
+    @property
+    def current_step(self):
+        """
+        Current step of the realizations.
+
+        Returns
+        -------
+        current_step : int
+            Current step.
+
+        """
+        return self._current_step
+
+    def __len__(self):
+        return self.n_realizations
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(microgrid={self.microgrid.__class__.__name__}, ' \
+               f'n_realizations={self.n_realizations})'
@@ -7,14 +7,20 @@ from warnings import warn
 
 from pymgrid.microgrid import DEFAULT_HORIZON
 from pymgrid.modules import ModuleContainer, UnbalancedEnergyModule
-from pymgrid.microgrid.utils.step import MicrogridStep
+from pymgrid.microgrid.utils.step import StepPlan
 from pymgrid.utils.eq import verbose_eq
-from pymgrid.utils.logger import ModularLogger
+from pymgrid.utils.logger import ModularLogger, LogSink, _EvictedRows
 from pymgrid.utils.serialize import add_numpy_pandas_representers, add_numpy_pandas_constructors, dump_data
 from pymgrid.utils.space import MicrogridSpace
+from pymgrid.utils.rng import as_seed_sequence
 from pymgrid.utils.deprecation import deprecation_err
 
 
+def _isclose(a, b, rtol=1e-05, atol=1e-08):
+    # Scalar np.isclose.
+    return a == b or abs(a - b) <= atol + rtol * abs(b)
+
+
 class Microgrid(yaml.YAMLObject):
     """
     Microgrid class, used to define and simulate an environment with a variety of modules.
@@ -32,7 +38,7 @@ class Microgrid(yaml.YAMLObject):
         See below for an example.
 
         .. note::
-        The constructor copies modules passed to it.
+        The constructor copies modules passed to it; see ``share_time_series`` to share their time series instead.
 
     add_unbalanced_module : bool, default True.
         Whether to add an unbalanced energy module to your microgrid. Such a module computes and attributes
@@ -58,6 +64,15 @@ class Microgrid(yaml.YAMLObject):
 
         If None, :attr:`.initial_step` and :attr:`.final_step` are used to define every episode.
 
+    share_time_series : bool, default False
+        Whether to share the time series of the modules instead of copying them.
+
+        If True, the microgrid's copies of the modules -- as well as any copy of the microgrid -- refer to read-only
+        views of the time series of the modules in ``modules``; only the mutable state of the modules is copied. The
+        modules in ``modules`` are left unchanged, but modifying their time series in place modifies the microgrid's.
+        A module's time series can still be replaced through its ``time_series`` setter, which affects that module
+        only. Modules whose time series is already a read-only array share it in any case.
+
 
     Examples
     --------
@@ -106,12 +121,14 @@ class Microgrid(yaml.YAMLObject):
                  loss_load_cost=10.,
                  overgeneration_cost=2.,
                  reward_shaping_func=None,
-                 trajectory_func=None):
+                 trajectory_func=None,
+                 share_time_series=False):
 
         self._modules = self._get_module_container(modules,
                                                    add_unbalanced_module,
                                                    loss_load_cost,
-                                                   overgeneration_cost)
+                                                   overgeneration_cost,
+                                                   share_time_series)
 
         # TODO (ahalev) transform envs to wrappers, and remove microgrid from attr names)
         self.microgrid_action_space = MicrogridSpace.from_module_spaces(
@@ -123,12 +140,22 @@ class Microgrid(yaml.YAMLObject):
         self._initial_step = self._get_module_initial_step()
         self._final_step = self._get_module_final_step()
 
+        self._step_plan = StepPlan(self._modules)
+
         self.reward_shaping_func = reward_shaping_func
         self.trajectory_func = self._check_trajectory_func(trajectory_func)
 
         self._balance_logger = ModularLogger()
         self._microgrid_logger = ModularLogger()  # log additional information.
 
+        self._log_sink = None
+        self._log_sink_drop_forecasts = False
+        self._log_retention = None
+        self._log_windowed = False
+        self._log_eviction_sink = None
+        self._log_eviction_drop_forecasts = False
+        self._evicted_rows = None
+
     def _get_unbalanced_energy_module(self,
                                       loss_load_cost,
                                       overgeneration_cost):
@@ -138,7 +165,12 @@ class Microgrid(yaml.YAMLObject):
                                       overgeneration_cost=overgeneration_cost
                                       )
 
-    def _get_module_container(self, modules, add_unbalanced_module, loss_load_cost, overgeneration_cost):
+    def _get_module_container(self,
+                              modules,
+                              add_unbalanced_module,
+                              loss_load_cost,
+                              overgeneration_cost,
+                              share_time_series=False):
         """
         Types of _modules:
         Fixed source: provides energy to the microgrid.
@@ -164,7 +196,20 @@ class Microgrid(yaml.YAMLObject):
 
         :return:
         """
-        modules = deepcopy(modules)
+        memo = {}
+
+        if share_time_series and pd.api.types.is_list_like(modules):
+            for module in modules:
+                module = module[1] if isinstance(module, tuple) else module
+                time_series = getattr(module, '_time_series', None)
+                if isinstance(time_series, np.ndarray) and time_series.flags.writeable:
+                    # The copies get a read-only view; read-only arrays are shared by deepcopy, see
+                    # BaseMicrogridModule.__deepcopy__. The caller's array is left writable.
+                    view = time_series.view()
+                    view.flags.writeable = False
+                    memo[id(time_series)] = view
+
+        modules = deepcopy(modules, memo)
 
         if not pd.api.types.is_list_like(modules):
             raise TypeError("modules must be list-like of modules.")
@@ -214,6 +259,7 @@ class Microgrid(yaml.YAMLObject):
             Observations from resetting the modules as well as the flushed balance log.
         """
         self._set_trajectory()
+        self._log_windowed = self._log_retention is not None
         return {
             **{name: [module.reset() for module in module_list] for name, module_list in self.modules.iterdict()},
             **{"balance": self._balance_logger.flush(),
@@ -255,19 +301,12 @@ class Microgrid(yaml.YAMLObject):
             Additional information from this step.
 
         """
-        control_copy = control.copy()
-        microgrid_step = MicrogridStep(reward_shaping_func=self.reward_shaping_func, cost_info=self.get_cost_info())
+        plan = self._step_plan
+        controllable = []
 
-        for name, modules in self.fixed.iterdict():
-            for module in modules:
-                microgrid_step.append(name, *module.step(0.0, normalized=False))
-
-        fixed_provided, fixed_consumed, _, _ = microgrid_step.balance()
-        log_dict = self._get_log_dict(fixed_provided, fixed_consumed, prefix='fixed')
-
-        for name, modules in self.controllable.iterdict():
+        for name, modules in plan.controllable:
             try:
-                module_controls = control_copy.pop(name)
+                module_controls = control[name]
             except KeyError:
                 raise ValueError(f'Control for module "{name}" not found. Available controls:\n\t{control.keys()}')
             else:
@@ -276,84 +315,428 @@ class Microgrid(yaml.YAMLObject):
                 except TypeError:
                     _zip = zip(modules, [module_controls])
 
-            for module, _control in _zip:
-                module_step = module.step(_control, normalized=normalized)  # obs, reward, done, info.
-                microgrid_step.append(name, *module_step)
+            controllable.append((name, _zip))
 
-        controllable_fixed_provided, controllable_fixed_consumed, _, _ = microgrid_step.balance()
-        difference = controllable_fixed_provided - controllable_fixed_consumed
+        if len(control) > len(plan.controllable):
+            controllable_names = {name for name, _ in plan.controllable}
+            ignored = [name for name in control if name not in controllable_names]
+            if ignored:
+                warn(f'\nIgnoring the following keys in passed control:\n {ignored}')
 
-        log_dict = self._get_log_dict(
-            controllable_fixed_provided-fixed_provided,
-            controllable_fixed_consumed-fixed_consumed,
-            log_dict=log_dict,
-            prefix='controllable'
-        )
+        obs, info = {}, {}
+        shaped_reward, done = self._step(controllable, normalized, obs=obs, info=info)
+
+        return obs, shaped_reward, done, info
+
+    def _step(self, controllable, normalized, obs=None, info=None, provided_out=None, absorbed_out=None):
+        """
+        Step every module and log the energy balance.
+
+        :meta private:
+
+        Parameters
+        ----------
+        controllable : iterable of (str, iterable of (module, control))
+            Control of each controllable module, by module name, in step order.
+
+        normalized : bool
+            Whether controls are normalized.
+
+        obs, info : dict or None, default None
+            Dicts to collect the observations and infos of the modules into, by module name. Not collected if None,
+            unless needed to shape the reward.
+
+        provided_out, absorbed_out : np.ndarray or None, shape (n_modules, ), default None
+            Arrays to write the energy provided and absorbed by each module into, in step order.
+
+        Returns
+        -------
+        reward : float
+            Shaped reward.
+
+        done : bool
+            Whether the microgrid terminates.
+
+        """
+        plan = self._step_plan
+        plan.begin_step()
+
+        # Marginal costs before the step; only needed to shape the reward.
+        cost_info = self.get_cost_info() if self.reward_shaping_func is not None else None
+
+        if info is None and self.reward_shaping_func is not None:
+            obs, info = {}, {}
 
-        if len(control_copy) > 0:
-            warn(f'\nIgnoring the following keys in passed control:\n {list(control_copy.keys())}')
+        # Observations -- and so forecasts -- are only built if collected.
+        collect = info is not None
+        module_obs = module_info = None
+
+        for name, modules in plan.fixed:
+            if collect:
+                obs[name], info[name] = module_obs, module_info = [], []
+
+            for module in modules:
+                self._step_module(module, 0.0, False, module_obs, module_info, provided_out, absorbed_out)
+
+        fixed_provided, fixed_consumed = plan.energy_totals()
+
+        for name, module_controls in controllable:
+            if collect:
+                obs[name], info[name] = module_obs, module_info = [], []
+
+            for module, _control in module_controls:
+                self._step_module(module, _control, normalized, module_obs, module_info, provided_out, absorbed_out)
+
+        controllable_fixed_provided, controllable_fixed_consumed = plan.energy_totals()
+        difference = controllable_fixed_provided - controllable_fixed_consumed
 
         # if difference > 0, have an excess. Try to use flex sinks to dissapate
         # otherwise, insufficient. Use flex sources to make up
+        energy_excess = difference
+        energy_needed = -difference
+
+        for name, modules in plan.flex:
+            if collect:
+                obs[name], info[name] = module_obs, module_info = [], []
 
-        if difference > 0:
-            energy_excess = difference
-            for name, modules in self.flex.iterdict():
-                for module in modules:
+            for module in modules:
+                if difference > 0:
                     if not module.is_sink:
-                        sink_amt = 0.0
-                    elif module.max_consumption < energy_excess: # module cannot dissipate all excess energy
-                        sink_amt = -1.0*module.max_consumption
+                        amount = 0.0
+                    elif module.max_consumption < energy_excess:  # module cannot dissipate all excess energy
+                        amount = -1.0 * module.max_consumption
+                    else:
+                        amount = -1.0 * energy_excess
+                    energy_excess += amount
+                else:
+                    if not module.is_source:
+                        amount = 0.0
+                    elif module.max_production < energy_needed:  # module cannot provide sufficient energy
+                        amount = module.max_production
                     else:
-                        sink_amt = -1.0 * energy_excess
+                        amount = energy_needed
+                    energy_needed -= amount
 
-                    module_step = module.step(sink_amt, normalized=False)
-                    microgrid_step.append(name, *module_step)
-                    energy_excess += sink_amt
+                self._step_module(module, amount, False, module_obs, module_info, provided_out, absorbed_out)
 
+        provided, consumed = plan.energy_totals()
+        reward, done = plan.reward, plan.done
+
+        if self.reward_shaping_func is None:
+            shaped_reward = reward
+        elif not callable(self.reward_shaping_func):
+            raise TypeError(f'reward_shaping_func {self.reward_shaping_func} is not callable.')
         else:
-            energy_needed = - difference
-            for name, modules in self.flex.iterdict():
-                for module in modules:
-                    if not module.is_source:
-                        source_amt = 0.0
-                    elif module.max_production < energy_needed: # module cannot provide sufficient energy
-                        source_amt = module.max_production
-                    else:
-                        source_amt = energy_needed
+            shaped_reward = self.reward_shaping_func(reward, info, cost_info)
 
-                    module_step = module.step(source_amt, normalized=False)
-                    microgrid_step.append(name, *module_step)
-                    energy_needed -= source_amt
+        self._balance_logger.log(self._balance_entry(
+            reward,
+            shaped_reward,
+            (fixed_provided, fixed_consumed),
+            (controllable_fixed_provided, controllable_fixed_consumed),
+            (provided, consumed)
+        ))
 
-        provided, consumed, reward, shaped_reward = microgrid_step.balance(shape_reward=True)
+        if not _isclose(provided, consumed):
+            raise RuntimeError('Microgrid modules unable to balance energy production with consumption.\n'
+                               '')
 
-        log_dict = self._get_log_dict(
-            provided-controllable_fixed_provided,
-            consumed-controllable_fixed_consumed,
-            log_dict=log_dict,
-            prefix='flex'
+        self._stream_log()
+        self._flush_evicted_log()
+
+        return shaped_reward, done
+
+    @staticmethod
+    def _balance_entry(reward, shaped_reward, fixed_energy, controllable_fixed_energy, energy):
+        # Energy balance of a step, from the cumulative (provided, absorbed) energy after each stage.
+        fixed_provided, fixed_consumed = fixed_energy
+        controllable_fixed_provided, controllable_fixed_consumed = controllable_fixed_energy
+        provided, consumed = energy
+
+        return dict(
+            reward=reward,
+            shaped_reward=shaped_reward,
+            overall_provided_to_microgrid=provided,
+            overall_absorbed_from_microgrid=consumed,
+            flex_provided_to_microgrid=provided - controllable_fixed_provided,
+            flex_absorbed_from_microgrid=consumed - controllable_fixed_consumed,
+            controllable_provided_to_microgrid=controllable_fixed_provided - fixed_provided,
+            controllable_absorbed_from_microgrid=controllable_fixed_consumed - fixed_consumed,
+            fixed_provided_to_microgrid=fixed_provided,
+            fixed_absorbed_from_microgrid=fixed_consumed
         )
 
-        log_dict = self._get_log_dict(provided, consumed, log_dict=log_dict, prefix='overall')
+    def log_steps(self, reward, fixed_energy, controllable_fixed_energy, energy, shaped_reward=None):
+        """
+        Log the energy balance of several steps that were simulated outside of the microgrid.
+
+        For simulators that step the modules of many microgrids at once. Each module must have logged the steps with
+        :meth:`~pymgrid.modules.base.BaseMicrogridModule.log_steps` beforehand. The steps are then streamed to the log
+        sink, if one is set, as if they had been taken with :meth:`.step`.
 
-        self._balance_logger.log(reward=reward, shaped_reward=shaped_reward, **log_dict)
+        Parameters
+        ----------
+        reward : array-like, shape (n_steps, )
+            Reward of each step.
 
-        if not np.isclose(provided, consumed):
-            raise RuntimeError('Microgrid modules unable to balance energy production with consumption.\n'
-                               '')
+        fixed_energy, controllable_fixed_energy, energy : tuple of array-like, shape (n_steps, )
+            Energy provided to and absorbed from the microgrid in each step by the fixed modules, by the fixed and
+            controllable modules, and by all modules, respectively.
 
-        return microgrid_step.output()
+        shaped_reward : array-like, shape (n_steps, ) or None, default None
+            Shaped reward of each step. If None, the reward.
 
-    def _get_log_dict(self, provided_energy, absorbed_energy, log_dict=None, prefix=None):
-        _log_dict = dict(provided_to_microgrid=provided_energy, absorbed_from_microgrid=absorbed_energy)
-        _log_dict = {(prefix + '_' + k if prefix is not None else k): v for k, v in _log_dict.items()}
-        if log_dict:
-            _log_dict.update(log_dict)
-        return _log_dict
+        Raises
+        ------
+        ValueError
+            If a log retention is set with :meth:`.set_log_retention` and ``n_steps`` exceeds it.
+
+        """
+        n_steps = len(reward)
+        shaped_reward = reward if shaped_reward is None else shaped_reward
+
+        if self._log_retention is not None and n_steps > self._log_retention:
+            raise ValueError(f'Cannot log {n_steps} steps at once with a log retention of {self._log_retention} steps.')
+
+        self._balance_logger.log_columns(
+            self._balance_entry(reward, shaped_reward, fixed_energy, controllable_fixed_energy, energy)
+        )
+
+        self._stream_log(n_steps=n_steps)
+        self._flush_evicted_log()
+
+    def _step_module(self, module, action, normalized, module_obs, module_info, provided_out, absorbed_out):
+        """
+        Step one module and add its reward and energy to the totals of the step in progress.
+
+        :meta private:
+
+        Parameters
+        ----------
+        module : pymgrid.modules.base.BaseMicrogridModule
+            Module to step.
+
+        action : float or np.ndarray
+            Action passed to the module.
+
+        normalized : bool
+            Whether ``action`` is normalized.
+
+        module_obs, module_info : list or None
+            Lists to append the observation and info of the module to. The observation is not built if None.
+
+        provided_out, absorbed_out : np.ndarray or None
+            Arrays to write the energy provided and absorbed by the module into, at its position in step order.
+
+        """
+        plan = self._step_plan
+
+        if module_info is not None:
+            _obs, _reward, _done, _info = module.step(action, normalized=normalized)
+            module_obs.append(_obs)
+            module_info.append(_info)
+        else:
+            _reward, _done, _info = module._step(action, normalized=normalized)
+
+        plan.reward += _reward
+        if _done:
+            plan.done = True
+
+        if 'provided_energy' in _info:
+            plan.provided_energy[plan.n_provided] = _info['provided_energy']
+            plan.n_provided += 1
+        if 'absorbed_energy' in _info:
+            plan.absorbed_energy[plan.n_absorbed] = _info['absorbed_energy']
+            plan.n_absorbed += 1
+
+        if provided_out is not None:
+            provided_out[plan.n_stepped] = _info.get('provided_energy', 0.0)
+            absorbed_out[plan.n_stepped] = _info.get('absorbed_energy', 0.0)
+        plan.n_stepped += 1
+
+    def rollout(self, policy, n_steps=None, normalized=True, reset=True, as_frame=False):
+        """
+        Run the microgrid under a policy or a sequence of actions, and return the results as arrays.
+
+        Equivalent to calling :meth:`.step` in a loop -- modules are stepped and logged in the same way -- but actions
+        are passed as flat arrays, observations and infos are not collected into dicts, and results are written into
+        preallocated arrays. Use for fast evaluation of policies, e.g. in sweeps over scenarios.
+
+        Actions are flat arrays in the layout of the action space of :class:`.ContinuousMicrogridEnv`: the actions
+        of the controllable modules, sorted by module name and concatenated.
+
+        Parameters
+        ----------
+        policy : callable or array-like, shape (n_steps, act_dim)
+            Either a callable that takes the state of the microgrid -- as returned in ``'state'`` -- and returns a
+            flat action, or the flat action of each step. The state is a view of the results, and must not be modified.
+
+        n_steps : int or None, default None
+            Number of steps. If None, runs until the microgrid terminates, or for ``len(policy)`` steps if ``policy``
+            is an array. The rollout stops early if the microgrid terminates.
+
+        normalized : bool, default True
+            Whether actions and states are normalized.
+
+        reset : bool, default True
+            Whether to reset the microgrid before the rollout.
+
+        as_frame : bool, default False
+            Whether to return the results as a DataFrame.
+
+        Returns
+        -------
+        results : dict[str, np.ndarray] or pd.DataFrame
+            Results of each step:
+
+            * ``'reward'`` : np.ndarray, shape (n_steps, )
+                Reward of each step, shaped if the microgrid has a ``reward_shaping_func``.
+            * ``'provided_energy'``, ``'absorbed_energy'`` : np.ndarray, shape (n_steps, n_modules)
+                Energy provided to and absorbed from the microgrid by each module, in the order of
+                ``modules.to_list()``.
+            * ``'state'`` : np.ndarray, shape (n_steps, state_dim)
+                State of the microgrid before each step, in the order of :meth:`.state_series`.
+
+            If ``as_frame``, a DataFrame indexed by step, with columns in the format of :meth:`.get_log`: the
+            reward under ``('balance', 0, 'reward')`` and the energies and states of each module under
+            ``(module_name, module_number, key)``.
+
+        Raises
+        ------
+        ValueError
+            If ``n_steps`` is None and the microgrid has no final step, or if ``policy`` is an array that does not
+            contain ``n_steps`` actions of the right dimension.
 
-    def get_cost_info(self):
-        return self._modules.get_attrs('production_marginal_cost', 'absorption_marginal_cost', as_pandas=False)
+        Examples
+        --------
+        >>> from pymgrid import Microgrid
+        >>> microgrid = Microgrid.from_scenario(0)
+        >>> results = microgrid.rollout(np.zeros((24, 2)))
+        >>> results['reward'].shape, results['state'].shape
+        ((24,), (24, 146))
+
+        """
+        if reset:
+            self.reset()
+
+        plan = self._step_plan
+        modules = plan.modules
+        initial_step = self.current_step
+
+        # Actions are laid out by sorted module name, as in a flattened gym Dict; modules are stepped in plan order.
+        module_slices, act_dim = {}, 0
+        for _, stage_modules in sorted(plan.controllable, key=lambda stage: stage[0]):
+            for module in stage_modules:
+                dim = module.action_space['normalized'].shape[0]
+                module_slices[id(module)] = slice(act_dim, act_dim + dim)
+                act_dim += dim
+
+        # Each module is passed a view of the action buffer, such that no control is constructed in the loop.
+        action = np.zeros(act_dim)
+        controllable = tuple(
+            (name, tuple((module, action[module_slices[id(module)]]) for module in stage_modules))
+            for name, stage_modules in plan.controllable
+        )
+
+        if callable(policy):
+            actions = None
+            if n_steps is None:
+                n_steps = self.final_step - initial_step
+        else:
+            actions = np.asarray(policy, dtype=float)
+            if n_steps is None:
+                n_steps = len(actions)
+            if actions.shape != (n_steps, act_dim):
+                raise ValueError(f'Expected actions of shape {(n_steps, act_dim)}, received shape {actions.shape}.')
+
+        if np.isinf(n_steps):
+            raise ValueError('n_steps must be passed for microgrids without a final step.')
+
+        n_steps, n_modules = int(n_steps), len(modules)
+
+        state_slices, state_dim = [], 0
+        for module in modules:
+            dim = len(module.state)
+            state_slices.append(slice(state_dim, state_dim + dim))
+            state_dim += dim
+
+        rewards = np.zeros(n_steps)
+        provided = np.zeros((n_steps, n_modules))
+        absorbed = np.zeros((n_steps, n_modules))
+        states = np.zeros((n_steps, state_dim))
+
+        n = 0
+        while n < n_steps:
+            state = states[n]
+            for module, state_slice in zip(modules, state_slices):
+                module.write_state(state[state_slice], normalized=normalized)
+
+            action[:] = policy(state) if actions is None else actions[n]
+
+            rewards[n], done = self._step(controllable, normalized, provided_out=provided[n], absorbed_out=absorbed[n])
+            n += 1
+
+            if done:
+                break
+
+        # Energies were written in step order.
+        step_order = [id(module) for stage in (plan.fixed, plan.controllable, plan.flex)
+                      for _, stage_modules in stage for module in stage_modules]
+        positions = {module_id: j for j, module_id in enumerate(step_order)}
+        order = [positions[id(module)] for module in modules]
+
+        results = {
+            'reward': rewards[:n],
+            'provided_energy': provided[:n, order],
+            'absorbed_energy': absorbed[:n, order],
+            'state': states[:n]
+        }
+
+        if as_frame:
+            return self._rollout_frame(results, initial_step)
+
+        return results
+
+    def _rollout_frame(self, results, initial_step):
+        columns, n_module, n_state = {}, 0, 0
+
+        for name, modules in self._modules.iterdict():
+            for j, module in enumerate(modules):
+                for key in ('provided_energy', 'absorbed_energy'):
+                    columns[(name, j, key)] = results[key][:, n_module]
+
+                for key in module.state_dict():
+                    columns[(name, j, key)] = results['state'][:, n_state]
+                    n_state += 1
+
+                n_module += 1
+
+        columns[('balance', 0, 'reward')] = results['reward']
+
+        index = pd.RangeIndex(start=initial_step, stop=initial_step + len(results['reward']))
+        return pd.DataFrame(columns, index=index)
+
+    def get_cost_info(self, refresh=False):
+        """
+        Marginal costs of every module.
+
+        Costs are cached, and re-read from a module only when its
+        :attr:`~pymgrid.modules.base.BaseMicrogridModule.cost_version` changes -- e.g. every step for modules whose costs
+        depend on the step, such as a :class:`.GridModule` -- or when module attributes are set with
+        :meth:`.set_module_attrs`.
+
+        Parameters
+        ----------
+        refresh : bool, default False
+            Whether to re-read the costs of every module. Required after setting a cost parameter on a module directly.
+
+        Returns
+        -------
+        cost_info : dict[str, list[dict[str, float]]]
+            Production and absorption marginal costs of each module, by module name. Must not be modified.
+
+        """
+        return self._step_plan.cost_info(refresh=refresh)
 
     def sample_action(self, strict_bound=False, sample_flex_modules=False):
         """
@@ -452,7 +835,7 @@ class Microgrid(yaml.YAMLObject):
         return {module_name: [module.from_normalized(value, act=act, obs=obs) for module, value in zip(module_list, data_dict[module_name])]
                 for module_name, module_list in self._modules.iterdict() if module_name in data_dict}
 
-    def get_log(self, as_frame=True, drop_singleton_key=False, drop_forecasts=False):
+    def get_log(self, as_frame=True, drop_singleton_key=False, drop_forecasts=False, copy=True):
         """
 
         Collect a log of controls and responses of the microgrid.
@@ -466,35 +849,27 @@ class Microgrid(yaml.YAMLObject):
             Ignored otherwise.
         drop_forecasts : bool, default False
             Whether to drop columns that are of time series forecasts.
+        copy : bool, default True
+            Whether the log owns its data. If False, columns are read-only views of the module logs, which avoids a
+            copy but change if the microgrid is stepped after a :meth:`.restore`. Columns are always copied if a
+            retention is set with :meth:`.set_log_retention`.
 
         Returns
         -------
         pd.DataFrame or dict
 
         """
-        _log_dict = dict()
-        for name, modules in self._modules.iterdict():
-            for j, module in enumerate(modules):
-                for key, value in module.log_dict().items():
-                    _log_dict[(name, j, key)] = value
-
-        _log_dict = dict(sorted(_log_dict.items(), key=lambda k: k[0]))
-
-        for key, value in self._balance_logger.to_dict().items():
-            _log_dict[('balance', 0, key)] = value
-
-        pad = (0, '')
-
-        for key, value in self._microgrid_logger.items():
-            key = key if pd.api.types.is_list_like(key) else [key]
-            _log_dict[(*key, *pad[len(key)-1:])] = value
+        _log_dict = self._collect_log(copy=copy)
 
         col_names = ['module_name', 'module_number', 'field']
 
         initial_step = self._modules.get_attrs('initial_step', unique=True)
 
+        if self._log_windowed:
+            initial_step = self.current_step - len(self._balance_logger)
+
         try:
-            df = pd.DataFrame(_log_dict, index=pd.RangeIndex(start=initial_step, stop=self.current_step))
+            df = pd.DataFrame(_log_dict, index=pd.RangeIndex(start=initial_step, stop=self.current_step), copy=False)
         except ValueError as e:
             if 'Length of values' in e.args[0]:
                 module_log_lengths = pd.Series([len(log_dict) for log_dict in _log_dict.values()])
@@ -524,6 +899,178 @@ class Microgrid(yaml.YAMLObject):
 
         return df.to_dict()
 
+    def _collect_log(self, last=False, copy=True, n_last=None):
+        def entries(logger):
+            if n_last is not None:
+                return logger.last(n_last).items()
+            return logger.last().items() if last else logger.to_dict(copy=copy).items()
+
+        _log_dict = dict()
+        for name, modules in self._modules.iterdict():
+            for j, module in enumerate(modules):
+                for key, value in entries(module.logger):
+                    _log_dict[(name, j, key)] = value
+
+        _log_dict = dict(sorted(_log_dict.items(), key=lambda k: k[0]))
+
+        for key, value in entries(self._balance_logger):
+            _log_dict[('balance', 0, key)] = value
+
+        pad = (0, '')
+
+        for key, value in entries(self._microgrid_logger):
+            key = key if pd.api.types.is_list_like(key) else [key]
+            _log_dict[(*key, *pad[len(key)-1:])] = value
+
+        return _log_dict
+
+    def set_log_sink(self, sink, drop_forecasts=False):
+        """
+        Stream the log of every subsequent step to an append-only sink.
+
+        After each step, the newly logged row -- with the same columns as :meth:`.get_log` -- is appended to ``sink``.
+        Rows are written in batches by the sink; previously written rows are never rewritten.
+
+        Parameters
+        ----------
+        sink : :class:`pymgrid.utils.logger.LogSink` or None
+            Sink to stream to, e.g. a :class:`pymgrid.utils.logger.CSVLogSink`.
+            If None, closes and removes the current sink.
+
+        drop_forecasts : bool, default False
+            Whether to drop columns that are of time series forecasts.
+
+        """
+        if sink is not None and not isinstance(sink, LogSink):
+            raise TypeError(f'sink must be a LogSink, not {type(sink).__name__}.')
+
+        if self._log_sink is not None and self._log_sink is not sink:
+            self._log_sink.close()
+
+        self._log_sink = sink
+        self._log_sink_drop_forecasts = drop_forecasts
+
+    @property
+    def log_sink(self):
+        """
+        Sink that the log of each step is streamed to.
+
+        Returns
+        -------
+        sink : :class:`pymgrid.utils.logger.LogSink` or None
+            The sink, if one was set with :meth:`.set_log_sink`.
+
+        """
+        return self._log_sink
+
+    def set_log_retention(self, maxlen, eviction_sink=None, drop_forecasts=False):
+        """
+        Retain only the log of the most recent steps.
+
+        Every module log, as well as the balance log, is kept in a preallocated ring buffer of length ``maxlen``, so
+        memory use is bounded in runs that never call :meth:`.reset`. :meth:`.get_log` returns the retained window.
+
+        Parameters
+        ----------
+        maxlen : int or None
+            Number of steps to retain. If None, the full log is retained.
+
+        eviction_sink : :class:`pymgrid.utils.logger.LogSink` or None, default None
+            Sink to append the log of a step to once it falls out of the retained window,
+            with the same columns as :meth:`.get_log`. Ignored if ``maxlen`` is None.
+
+        drop_forecasts : bool, default False
+            Whether to drop columns that are of time series forecasts from evicted rows.
+
+        """
+        if eviction_sink is not None and not isinstance(eviction_sink, LogSink):
+            raise TypeError(f'eviction_sink must be a LogSink, not {type(eviction_sink).__name__}.')
+
+        if self._log_eviction_sink is not None and self._log_eviction_sink is not eviction_sink:
+            self._log_eviction_sink.close()
+
+        self._log_retention = maxlen
+        self._log_windowed = self._log_windowed or maxlen is not None
+        self._log_eviction_sink = eviction_sink if maxlen is not None else None
+        self._evicted_rows = _EvictedRows() if self._log_eviction_sink is not None else None
+        self._log_eviction_drop_forecasts = drop_forecasts
+
+        def for_logger(to_column, group=0):
+            return self._evicted_rows.for_logger(to_column, group) if self._evicted_rows is not None else None
+
+        for name, modules in self._modules.iterdict():
+            for j, module in enumerate(modules):
+                module.logger.set_retention(maxlen, for_logger(lambda key, _name=name, _j=j: (_name, _j, key)))
+
+        self._balance_logger.set_retention(maxlen, for_logger(lambda key: ('balance', 0, key), group=1))
+
+        pad = (0, '')
+
+        def other_column(key):
+            key = key if pd.api.types.is_list_like(key) else [key]
+            return (*key, *pad[len(key)-1:])
+
+        self._microgrid_logger.set_retention(maxlen, for_logger(other_column, group=2))
+
+    @property
+    def log_retention(self):
+        """
+        Number of steps of the log that are retained.
+
+        Returns
+        -------
+        maxlen : int or None
+            The retention set with :meth:`.set_log_retention`, or None if the full log is retained.
+
+        """
+        return self._log_retention
+
+    def set_log_dtype(self, dtype):
+        """
+        Set the dtype in which floating point values are logged.
+
+        Logging in ``float32`` halves the memory used by the log, at the cost of precision.
+
+        Parameters
+        ----------
+        dtype : {np.float64, np.float32}
+            Floating point dtype. Values that are already logged are converted.
+
+        """
+        for module in self._modules.iterlist():
+            module.logger.set_dtype(dtype)
+
+        self._balance_logger.set_dtype(dtype)
+        self._microgrid_logger.set_dtype(dtype)
+
+    def _flush_evicted_log(self):
+        if self._evicted_rows is None:
+            return
+
+        initial_step = self._modules.get_attrs('initial_step', unique=True)
+
+        for index, row in self._evicted_rows.pop():
+            if self._log_eviction_drop_forecasts:
+                row = {key: value for key, value in row.items() if 'forecast' not in key[-1]}
+
+            self._log_eviction_sink.append(row, index=initial_step + index)
+
+    def _stream_log(self, n_steps=1):
+        if self._log_sink is None:
+            return
+
+        if n_steps == 1:
+            rows = [self._collect_log(last=True)]
+        else:
+            columns = self._collect_log(n_last=n_steps)
+            rows = [{key: values[j] for key, values in columns.items()} for j in range(n_steps)]
+
+        for j, row in enumerate(rows, start=self.current_step - n_steps):
+            if self._log_sink_drop_forecasts:
+                row = {key: value for key, value in row.items() if 'forecast' not in key[-1]}
+
+            self._log_sink.append(row, index=j)
+
     def set_forecaster(self,
                        forecaster,
                        forecast_horizon=DEFAULT_HORIZON,
@@ -673,6 +1220,120 @@ class Microgrid(yaml.YAMLObject):
 
         return horizons[0]
 
+    def seed(self, seed=None):
+        """
+        Seed every random number generator in the microgrid.
+
+        Independent streams are spawned from ``seed`` for each module -- and, through it, its forecaster -- in module
+        order, and for the trajectory function. Microgrids seeded with distinct seeds, e.g. spawned from a common
+        :class:`numpy.random.SeedSequence`, can then be run in parallel reproducibly.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed. If None, fresh entropy is drawn from the operating system.
+
+        Returns
+        -------
+        seed_sequence : np.random.SeedSequence
+            The seed sequence the streams were spawned from.
+
+        """
+        seed_sequence = as_seed_sequence(seed)
+
+        modules = self._modules.to_list()
+        *module_seeds, trajectory_seed = seed_sequence.spawn(len(modules) + 1)
+
+        for module, module_seed in zip(modules, module_seeds):
+            module.seed(module_seed)
+
+        if hasattr(self.trajectory_func, 'seed'):
+            self.trajectory_func.seed(trajectory_seed)
+
+        return seed_sequence
+
+    def snapshot(self, include_log=True):
+        """
+        Capture the dynamic state of the microgrid, to return to it with :meth:`.restore`.
+
+        Captures the current step and, in each module, e.g. the charge of batteries, the status of gensets, the cycle
+        count of battery transition models and the state of random number generators, as well as the state of the
+        trajectory function. Parameters, time series and log contents are not copied, and arrays are held by reference;
+        taking and restoring a snapshot takes microseconds. Snapshots can be used to branch from a state, e.g. in
+        tree search or rollout-based control, without copying the microgrid.
+
+        Random numbers drawn from the global ``np.random`` state by unseeded modules or trajectory functions are not
+        captured; call :meth:`.seed` first for reproducible branches.
+
+        Parameters
+        ----------
+        include_log : bool, default True
+            Whether to capture the length of the logs, such that :meth:`.restore` drops the rows logged after the
+            snapshot. If False, the logs are left as is on restore, and no longer match the current step; use
+            this when branching without reading the log.
+
+        Returns
+        -------
+        snapshot : tuple
+            State to pass to :meth:`.restore`.
+
+        Examples
+        --------
+        >>> from pymgrid import Microgrid
+        >>> microgrid = Microgrid.from_scenario(0)
+        >>> snapshot = microgrid.snapshot()
+        >>> _ = microgrid.step(microgrid.sample_action())
+        >>> microgrid.restore(snapshot)
+        >>> microgrid.current_step
+        0
+
+        """
+        module_snapshots = tuple(module.snapshot(include_log=include_log) for module in self._step_plan.modules)
+        trajectory_snapshot = self.trajectory_func.snapshot() if hasattr(self.trajectory_func, 'snapshot') else None
+
+        if include_log:
+            log_snapshot = self._balance_logger.snapshot(), self._microgrid_logger.snapshot()
+        else:
+            log_snapshot = None
+
+        return module_snapshots, trajectory_snapshot, log_snapshot
+
+    def restore(self, snapshot):
+        """
+        Restore the dynamic state of the microgrid captured by :meth:`.snapshot`.
+
+        Logs are truncated in place, and steps taken after the restore overwrite the rows that were dropped. Logs
+        returned by :meth:`.get_log` own their data and are unaffected, unless they were collected with ``copy=False``.
+
+        Parameters
+        ----------
+        snapshot : tuple
+            State returned by :meth:`.snapshot`, from this microgrid or a copy of it.
+
+        Raises
+        ------
+        ValueError
+            If the snapshot was taken from a microgrid with a different number of modules, or if it includes the logs
+            and rows logged before it are no longer in them, e.g. because the microgrid was reset.
+
+        """
+        module_snapshots, trajectory_snapshot, log_snapshot = snapshot
+        modules = self._step_plan.modules
+
+        if len(module_snapshots) != len(modules):
+            raise ValueError(f'Snapshot has {len(module_snapshots)} modules, microgrid has {len(modules)}.')
+
+        if log_snapshot is not None:
+            balance_snapshot, microgrid_snapshot = log_snapshot
+            self._balance_logger.restore(balance_snapshot)
+            self._microgrid_logger.restore(microgrid_snapshot)
+
+        for module, module_snapshot in zip(modules, module_snapshots):
+            module.restore(module_snapshot)
+
+        if hasattr(self.trajectory_func, 'restore'):
+            self.trajectory_func.restore(trajectory_snapshot)
+
     def set_module_attrs(self, attr_dict=None, **attrs):
         """
         Set the value of an attribute in all modules containing that attribute.
@@ -697,6 +1358,7 @@ class Microgrid(yaml.YAMLObject):
 
         """
         self._modules.set_attrs(attr_dict, **attrs)
+        self._step_plan = StepPlan(self._modules)
 
     @property
     def current_step(self):
@@ -1098,6 +1760,14 @@ class Microgrid(yaml.YAMLObject):
     def __getnewargs__(self):
         return (self.modules.to_tuples(), )
 
+    def __getstate__(self):
+        # Copies of a microgrid do not stream to the original's log sink.
+        state = self.__dict__.copy()
+        state['_log_sink'] = None
+        state['_log_eviction_sink'] = None
+        state['_evicted_rows'] = None
+        return state
+
     def __len__(self):
         """
         Length of available underlying data.
@@ -12,6 +12,44 @@ class BaseTrajectory(yaml.YAMLObject):
     def __call__(self, initial_step, final_step):
         pass
 
+    def seed(self, seed=None):
+        """
+        Seed the trajectory's random number generator.
+
+        Deterministic trajectories have none, and ignore the seed.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed.
+
+        """
+        pass
+
+    def snapshot(self):
+        """
+        State of the trajectory's random number generator.
+
+        Returns
+        -------
+        snapshot : dict or None
+            State to pass to :meth:`.restore`. None for deterministic trajectories.
+
+        """
+        return None
+
+    def restore(self, snapshot):
+        """
+        Restore the state of the trajectory's random number generator.
+
+        Parameters
+        ----------
+        snapshot : dict or None
+            State returned by :meth:`.snapshot`.
+
+        """
+        pass
+
     def __repr__(self):
         params = inspect.signature(self.__init__).parameters
         formatted_params = ', '.join([f'{p}={getattr(self, p)}' for p in params])
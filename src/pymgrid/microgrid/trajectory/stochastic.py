@@ -1,20 +1,57 @@
 import numpy as np
 
 from pymgrid.microgrid.trajectory.base import BaseTrajectory
+from pymgrid.utils.rng import as_seed_sequence, generator_state, restore_generator
 
 
-class StochasticTrajectory(BaseTrajectory):
+class _SeededTrajectory(BaseTrajectory):
+    _rng = None
+
+    def seed(self, seed=None):
+        """
+        Seed the trajectory's random number generator.
+
+        Until seeded, trajectories are drawn from the global ``np.random`` state. Once seeded, they are drawn from a
+        :class:`numpy.random.Generator` owned by the trajectory.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed.
+
+        """
+        self._rng = np.random.default_rng(as_seed_sequence(seed))
+
+    def snapshot(self):
+        return generator_state(self._rng)
+
+    def restore(self, snapshot):
+        self._rng = restore_generator(self._rng, snapshot)
+
+    @classmethod
+    def to_yaml(cls, dumper, data):
+        state = {k: v for k, v in data.__dict__.items() if k != '_rng'}
+        return dumper.represent_mapping(cls.yaml_tag, state, flow_style=cls.yaml_flow_style)
+
+    def _randint(self, low, high):
+        if self._rng is None:
+            return np.random.randint(low, high)
+
+        return int(self._rng.integers(low, high))
+
+
+class StochasticTrajectory(_SeededTrajectory):
     yaml_tag = u"!StochasticTrajectory"
 
     def __call__(self, initial_step, final_step):
 
-        initial = np.random.randint(initial_step, final_step-2)
-        final = np.random.randint(initial, final_step)
+        initial = self._randint(initial_step, final_step-2)
+        final = self._randint(initial, final_step)
 
         return initial, final
 
 
-class FixedLengthStochasticTrajectory(BaseTrajectory):
+class FixedLengthStochasticTrajectory(_SeededTrajectory):
     yaml_tag = u"!FixedLengthStochasticTrajectory"
 
     def __init__(self, trajectory_length):
@@ -25,6 +62,6 @@ class FixedLengthStochasticTrajectory(BaseTrajectory):
             raise ValueError(f'Cannot create a trajectory of length {self.trajectory_length}'
                              f'between initial_step ({initial_step}) and final_step ({final_step})')
 
-        initial = np.random.randint(initial_step, final_step-self.trajectory_length)
+        initial = self._randint(initial_step, final_step-self.trajectory_length)
 
         return initial, initial + self.trajectory_length
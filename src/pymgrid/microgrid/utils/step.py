@@ -1,72 +1,115 @@
 import numpy as np
 
 
-class MicrogridStep:
-    def __init__(self, reward_shaping_func=None, cost_info=None):
-        self._reward_shaping_func = reward_shaping_func
-        self.cost_info = cost_info
-        self._obs = dict()
-        self._reward = 0.0
-        self._done = False
-        self._info = dict(absorbed_energy=[], provided_energy=[])
-
-    def append(self, module_name, obs, reward, done, info):
-        try:
-            self._obs[module_name].append(obs)
-        except KeyError:
-            self._obs[module_name] = [obs]
-        self._reward += reward
-        if done:
-            self._done = True
-
-        try:
-            self._info[module_name].append(info)
-        except KeyError:
-            self._info[module_name] = [info]
-
-        for key, value in info.items():
-            try:
-                self._info[key].append(value)
-            except KeyError:
-                pass
-
-    def balance(self, shape_reward=False):
-        provided_energy = np.sum(self._info['provided_energy'])
-        absorbed_energy = np.sum(self._info['absorbed_energy'])
-
-        if shape_reward:
-            return provided_energy, absorbed_energy, self._reward, self.shaped_reward()
-
-        return provided_energy, absorbed_energy, self._reward, None
-
-    def output(self):
-        return self._obs, self.shaped_reward(), self._done, self._output_info()
-
-    def shaped_reward(self):
-        if self._reward_shaping_func is None:
-            return self._reward
-        elif not callable(self._reward_shaping_func):
-            raise TypeError(f'reward_shaping_func {self._reward_shaping_func} is not callable.')
-
-        assert isinstance(self.cost_info, dict)
-        return self._reward_shaping_func(self._reward, self._output_info(), self.cost_info)
-
-
-    def _output_info(self):
-        return {k: v for k, v in self._info.items() if k not in ('absorbed_energy', 'provided_energy')}
-
-    @property
-    def obs(self):
-        return self._obs
-
-    @property
-    def reward(self):
-        return self._reward
-
-    @property
-    def done(self):
-        return self._done
-
-    @property
-    def info(self):
-        return self._info
\ No newline at end of file
+class StepPlan:
+    """
+    Execution plan of :meth:`.Microgrid.step`.
+
+    Fixes, once, the order in which modules are stepped and preallocates the buffers that the energy each module
+    provides or absorbs is accumulated in, such that a step does not need to traverse the module container.
+
+    Also caches the marginal costs of the modules; the costs of a module are only re-read when its
+    :attr:`~pymgrid.modules.base.BaseMicrogridModule.cost_version` changes.
+
+    Parameters
+    ----------
+    modules : pymgrid.modules.ModuleContainer
+        Modules of the microgrid.
+
+    """
+    def __init__(self, modules):
+        self.fixed = self._stage(modules.fixed)
+        self.controllable = self._stage(modules.controllable)
+        self.flex = self._stage(modules.flex)
+
+        # Modules in the order of ModuleContainer.to_list, e.g. for snapshots.
+        self.modules = tuple(modules.to_list())
+
+        self._cost_modules = tuple(
+            (name, module) for name, module_list in modules.iterdict() for module in module_list
+        )
+        self._cost_info = None
+        self._cost_entries = None
+        self._cost_versions = None
+
+        n_modules = len(modules)
+
+        # Either energy may be logged by each module; entries are packed in step order, as np.sum would see them.
+        self.provided_energy = np.zeros(n_modules)
+        self.absorbed_energy = np.zeros(n_modules)
+
+        # Totals of the step in progress, accumulated by Microgrid._step_module.
+        self.reward, self.done = 0.0, False
+        self.n_provided = self.n_absorbed = self.n_stepped = 0
+
+    def begin_step(self):
+        """
+        Reset the totals of the step in progress.
+        """
+        self.reward, self.done = 0.0, False
+        self.n_provided = self.n_absorbed = self.n_stepped = 0
+
+    def energy_totals(self):
+        """
+        Total energy provided and absorbed by the modules stepped so far in the step in progress.
+
+        Returns
+        -------
+        provided, absorbed : float
+            Total energy provided and absorbed.
+
+        """
+        return self.provided_energy[:self.n_provided].sum(), self.absorbed_energy[:self.n_absorbed].sum()
+
+    @staticmethod
+    def _stage(container):
+        return tuple((name, tuple(modules)) for name, modules in container.iterdict())
+
+    def cost_info(self, refresh=False):
+        """
+        Marginal costs of every module, in the format of ``ModuleContainer.get_attrs``.
+
+        Parameters
+        ----------
+        refresh : bool, default False
+            Whether to re-read the costs of every module, instead of only of those whose cost version changed.
+
+        Returns
+        -------
+        cost_info : dict[str, list[dict[str, float]]]
+            Production and absorption marginal costs of each module, by module name. Shared between calls until a cost
+            changes; must not be modified.
+
+        """
+        if refresh or self._cost_entries is None:
+            self._cost_entries = [_cost_entry(module) for _, module in self._cost_modules]
+            self._cost_versions = [module.cost_version for _, module in self._cost_modules]
+            self._cost_info = None
+
+        for j, (_, module) in enumerate(self._cost_modules):
+            if module.cost_version != self._cost_versions[j]:
+                self._cost_entries[j] = _cost_entry(module)
+                self._cost_versions[j] = module.cost_version
+                self._cost_info = None
+
+        if self._cost_info is None:
+            cost_info = {}
+            for (name, _), entry in zip(self._cost_modules, self._cost_entries):
+                try:
+                    cost_info[name].append(entry)
+                except KeyError:
+                    cost_info[name] = [entry]
+
+            self._cost_info = cost_info
+
+        return self._cost_info
+
+    def __repr__(self):
+        stages = ', '.join(f'{stage}={[name for name, _ in getattr(self, stage)]}'
+                           for stage in ('fixed', 'controllable', 'flex'))
+        return f'StepPlan({stages})'
+
+
+def _cost_entry(module):
+    return {attr: getattr(module, attr, NotImplemented)
+            for attr in ('production_marginal_cost', 'absorption_marginal_cost')}
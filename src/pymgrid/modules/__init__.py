@@ -1,8 +1,11 @@
+from .base.timeseries import ConstantSeries, PiecewiseConstantSeries, PeriodicSeries
 from .battery.battery_module import BatteryModule
 from .genset_module import GensetModule
 from .grid_module import GridModule
 from .load_module import LoadModule
 from .node_module import NodeModule
+from .node_group_module import NodeGroupModule
+from .power_curve import PowerCurve
 from .renewable_module import RenewableModule
 from .unbalanced_energy_module import UnbalancedEnergyModule
 
@@ -1,2 +1,3 @@
 from .base_module import BaseMicrogridModule
 from .timeseries.base_timeseries_module import BaseTimeSeriesMicrogridModule
+from .live_input_module import LiveInputModule
@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from copy import deepcopy
 import inspect
 import logging
 import yaml
@@ -8,6 +9,7 @@ from warnings import warn
 
 from pymgrid.utils.eq import verbose_eq
 from pymgrid.utils.logger import ModularLogger
+from pymgrid.utils.rng import as_seed_sequence, generator_state, restore_generator
 from pymgrid.utils.space import ModuleSpace
 from pymgrid.utils.serialize import add_numpy_pandas_representers, add_numpy_pandas_constructors, dump_data
 
@@ -33,8 +35,27 @@ class BaseMicrogridModule(yaml.YAMLObject):
     Tag used for yaml serialization.
     """
 
+    cost_depends_on_step = False
+    """
+    Whether the marginal costs of the module may change from one step to the next.
+
+    If True, :attr:`.cost_version` is incremented every step, invalidating cached cost information.
+
+    Returns : bool
+        Whether the costs depend on the step.
+
+    """
+
     _energy_pos = 0
 
+    _snapshot_attributes = ('_current_step', 'initial_step')
+    """
+    Attributes holding the dynamic state of the module, captured by :meth:`.snapshot`. Values must be immutable or
+    never modified in place.
+
+    :meta private:
+    """
+
     def __init__(self,
                  raise_errors,
                  initial_step=0,
@@ -50,6 +71,8 @@ class BaseMicrogridModule(yaml.YAMLObject):
         self._observation_space = self._get_observation_spaces()
         self.provided_energy_name, self.absorbed_energy_name = provided_energy_name, absorbed_energy_name
         self._logger = ModularLogger()
+        self._cost_version = 0
+        self._rng = None
         self.name = None  # set by ModularMicrogrid
 
     def _get_action_spaces(self, normalized_bounds):
@@ -136,6 +159,23 @@ class BaseMicrogridModule(yaml.YAMLObject):
             Will include either``provided_energy`` or ``absorbed_energy`` as a key, denoting the amount of energy
             this module provided to or absorbed from the microgrid.
 
+        """
+        reward, done, info = self._step(action, normalized=normalized)
+        obs = self.to_normalized(self.state, obs=True)
+
+        return obs, reward, done, info
+
+    def _step(self, action, normalized=True):
+        """
+        Take one step in the module without building the observation after it.
+
+        :meta private:
+
+        Returns
+        -------
+        reward, done, info
+            As in :meth:`.step`.
+
         """
         if normalized:
             denormalized_action = self._action_space.denormalize(action)
@@ -157,14 +197,12 @@ class BaseMicrogridModule(yaml.YAMLObject):
                 else:
                     denormalized_action = 0.0
 
-        state_dict = self.state_dict()
+        state_dict = self._log_state_dict()
         reward, done, info = self._unnormalized_step(denormalized_action)
         self._log(state_dict, reward=reward, **info)
         self._update_step()
 
-        obs = self.to_normalized(self.state, obs=True)
-
-        return obs, reward, done, info
+        return reward, done, info
 
     def _unnormalized_step(self, unnormalized_action):
         if unnormalized_action > 0:
@@ -278,7 +316,14 @@ class BaseMicrogridModule(yaml.YAMLObject):
 
         return self.update(absorbed_energy, as_sink=True)
 
+    def _log_state_dict(self):
+        # State logged before each step.
+        return self.state_dict()
+
     def _log(self, state_dict_pre_step, provided_energy=None, absorbed_energy=None, **info):
+        self._logger.log(self._log_entry(state_dict_pre_step, provided_energy, absorbed_energy, **info))
+
+    def _log_entry(self, state_dict_pre_step, provided_energy=None, absorbed_energy=None, **info):
         energy_info = dict()
 
         if self.provided_energy_name is not None:
@@ -291,7 +336,41 @@ class BaseMicrogridModule(yaml.YAMLObject):
         else:
             assert absorbed_energy is None, 'Cannot log absorbed_energy with NoneType absorbed_energy_name.'
 
-        self._logger.log(**info, **energy_info, **state_dict_pre_step)
+        return {**info, **energy_info, **state_dict_pre_step}
+
+    def log_steps(self, state, reward, provided_energy=None, absorbed_energy=None, **info):
+        """
+        Log several steps that were simulated outside of the module, and advance the current step past them.
+
+        Rows are logged as :meth:`.step` would have logged them. Only the log and the current step are updated; the
+        state of the module must be set through its public attributes.
+
+        Parameters
+        ----------
+        state : dict[str, array-like]
+            State of the module before each step, with the keys of :meth:`.state_dict`.
+
+        reward : array-like, shape (n_steps, )
+            Reward of each step.
+
+        provided_energy, absorbed_energy : array-like, shape (n_steps, ) or None, default None
+            Energy provided to or absorbed from the microgrid in each step.
+
+        **info
+            Additional information of each step, as returned by :meth:`.update`.
+
+        Raises
+        ------
+        ValueError
+            If the keys of ``state`` are not those of :meth:`.state_dict`.
+
+        """
+        if list(state.keys()) != list(self.state_dict().keys()):
+            raise ValueError(f'Expected state keys {list(self.state_dict().keys())}, received {list(state.keys())}.')
+
+        n_steps = len(reward)
+        self._logger.log_columns(self._log_entry(state, provided_energy, absorbed_energy, reward=reward, **info))
+        self.current_step += n_steps
 
     def _update_step(self, reset=False):
         if reset:
@@ -299,6 +378,9 @@ class BaseMicrogridModule(yaml.YAMLObject):
         else:
             self._current_step += 1
 
+        if self.cost_depends_on_step:
+            self._cost_version += 1
+
     @abstractmethod
     def update(self, external_energy_change, as_source=False, as_sink=False):
         """
@@ -357,7 +439,74 @@ class BaseMicrogridModule(yaml.YAMLObject):
                 max_bound = self._action_space.normalize(self.max_production)
                 if np.isnan(max_bound):
                     max_bound = 0
-        return np.random.rand()*(max_bound-min_bound) + min_bound
+        return self._random()*(max_bound-min_bound) + min_bound
+
+    def seed(self, seed=None):
+        """
+        Seed the module's random number generators.
+
+        Until seeded, random actions are sampled from the global ``np.random`` state. Once seeded, they are sampled
+        from a :class:`numpy.random.Generator` owned by the module.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed.
+
+        """
+        self._rng = np.random.default_rng(as_seed_sequence(seed))
+
+    def snapshot(self, include_log=True):
+        """
+        Current dynamic state of the module.
+
+        Captures the current step, the state of the module and of its random number generators, but not its
+        parameters or time series.
+
+        Parameters
+        ----------
+        include_log : bool, default True
+            Whether to capture the length of the module's log, such that :meth:`.restore` truncates it.
+
+        Returns
+        -------
+        snapshot : tuple
+            State to pass to :meth:`.restore`.
+
+        """
+        return (
+            tuple(getattr(self, attr) for attr in self._snapshot_attributes),
+            generator_state(self._rng),
+            self._logger.snapshot() if include_log else None
+        )
+
+    def restore(self, snapshot):
+        """
+        Restore the dynamic state of the module.
+
+        Parameters
+        ----------
+        snapshot : tuple
+            State returned by :meth:`.snapshot`, from this module or a copy of it.
+
+        """
+        values, rng_state, log_snapshot = snapshot
+
+        # Restored first: raises before any state is modified if the log was flushed since the snapshot.
+        if log_snapshot is not None:
+            self._logger.restore(log_snapshot)
+
+        for attr, value in zip(self._snapshot_attributes, values):
+            setattr(self, attr, value)
+
+        self._rng = restore_generator(self._rng, rng_state)
+        self._cost_version += 1
+
+    def _random(self):
+        if self._rng is None:
+            return np.random.rand()
+
+        return self._rng.random()
 
     def to_normalized(self, value, act=False, obs=False):
         """
@@ -525,6 +674,22 @@ class BaseMicrogridModule(yaml.YAMLObject):
         """
         pass
 
+    def write_state(self, out, normalized=False):
+        """
+        Write the current state of the module into an existing array.
+
+        Parameters
+        ----------
+        out : np.ndarray, shape (len(state), )
+            Array to write the state into, e.g. a slice of a preallocated observation buffer.
+
+        normalized : bool, default False
+            Whether to write normalized values.
+
+        """
+        state = self.state
+        out[:] = self._observation_space.normalize(state) if normalized else state
+
     @property
     def state(self):
         """
@@ -554,6 +719,23 @@ class BaseMicrogridModule(yaml.YAMLObject):
     @current_step.setter
     def current_step(self, value):
         self._current_step = value
+        self._cost_version += 1
+
+    @property
+    def cost_version(self):
+        """
+        Version of the module's marginal costs.
+
+        Incremented whenever :attr:`.production_marginal_cost` or :attr:`.absorption_marginal_cost` may have changed,
+        e.g. when the step of a module with ``cost_depends_on_step`` advances.
+
+        Returns
+        -------
+        cost_version : int
+            The version.
+
+        """
+        return self._cost_version
 
     @property
     @abstractmethod
@@ -1048,6 +1230,17 @@ class BaseMicrogridModule(yaml.YAMLObject):
             warn(f"Unused keys in serialized_dict: {list(serialized_dict.keys())}")
         return self
 
+    def __deepcopy__(self, memo):
+        # Read-only arrays -- e.g. shared time series -- are immutable, and are shared with the copy.
+        for value in self.__dict__.values():
+            if isinstance(value, np.ndarray) and not value.flags.writeable:
+                memo.setdefault(id(value), value)
+
+        new = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new
+        new.__dict__.update(deepcopy(self.__dict__, memo))
+        return new
+
     def verbose_eq(self, other, indent=0):
         return verbose_eq(self, other, self.__dict__.keys(), indent=indent)
 
@@ -1056,6 +1249,9 @@ class BaseMicrogridModule(yaml.YAMLObject):
             return NotImplemented
 
         def are_equal(v1, v2):
+            if isinstance(v1, np.random.Generator) and isinstance(v2, np.random.Generator):
+                return v1.bit_generator.state == v2.bit_generator.state
+
             try:
                 _are_equal = bool(v1 == v2)
                 if _are_equal:
@@ -1068,9 +1264,10 @@ class BaseMicrogridModule(yaml.YAMLObject):
             except (ValueError, TypeError):
                 return False
 
+        # _cost_version only counts changes to the cost; it is not part of the module's state.
         diff = [
             (k1, v1, v2) for (k1, v1), (k2, v2) in zip(self.__dict__.items(), other.__dict__.items())
-            if not are_equal(v1, v2)
+            if k1 != '_cost_version' and not are_equal(v1, v2)
         ]
 
         return len(diff) == 0
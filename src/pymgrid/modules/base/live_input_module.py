@@ -0,0 +1,222 @@
+import math
+import threading
+import time
+import numpy as np
+
+from pymgrid.modules.base.base_module import BaseMicrogridModule
+
+
+class _PushLock:
+    """
+    A lock that is copied and pickled as a new lock, and compares equal to any other.
+
+    :meta private:
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self._lock.__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self._lock.__exit__(exc_type, exc_val, exc_tb)
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+    def __eq__(self, other):
+        return isinstance(other, _PushLock)
+
+
+class LiveInputModule(BaseMicrogridModule):
+    """
+    Base class of modules fed by live measurements instead of a time series.
+
+    The module holds only the latest measurement, which is set with :meth:`.push` -- e.g. by a thread reading
+    telemetry -- and is used as the module's energy at each step. There is no time series, no forecaster and no final
+    step: the module never terminates an episode, and its memory does not depend on the number of steps.
+
+    Children must define ``module_type``, whose last element must be ``'fixed'``, ``state_components`` and either
+    :attr:`.is_source` or :attr:`.is_sink`.
+
+    Parameters
+    ----------
+    rating : float
+        Largest measurement expected, e.g. the power rating of the equipment. Defines the bounds of the observations:
+        ``[0, rating]`` for sources and ``[-rating, 0]`` for sinks.
+
+    initial_value : float, default 0.0
+        Measurement before the first call to :meth:`.push`.
+
+    initial_step : int, default 0
+        Initial step.
+
+    normalized_action_bounds : tuple of int or float, default (0, 1).
+        Bounds of normalized actions.
+
+    raise_errors : bool, default False
+        Whether to raise errors if bounds are exceeded in an action.
+
+    provided_energy_name : str or None, default 'provided_energy'
+        Name of the energy provided to the microgrid in the module's log.
+
+    absorbed_energy_name : str or None, default 'absorbed_energy'
+        Name of the energy absorbed from the microgrid in the module's log.
+
+    """
+
+    _snapshot_attributes = (*BaseMicrogridModule._snapshot_attributes, '_value', '_push_time')
+
+    def __init__(self,
+                 rating,
+                 initial_value=0.0,
+                 initial_step=0,
+                 normalized_action_bounds=(0, 1),
+                 raise_errors=False,
+                 provided_energy_name='provided_energy',
+                 absorbed_energy_name='absorbed_energy'):
+
+        if rating <= 0:
+            raise ValueError('rating must be positive.')
+
+        self.rating = rating
+        self.initial_value = initial_value
+        self._lock = _PushLock()
+        self._value = self._check_value(initial_value)
+        self._push_time = None
+
+        super().__init__(raise_errors,
+                         initial_step=initial_step,
+                         normalized_action_bounds=normalized_action_bounds,
+                         provided_energy_name=provided_energy_name,
+                         absorbed_energy_name=absorbed_energy_name)
+
+    @staticmethod
+    def _check_value(value):
+        value = float(value)
+
+        if not value >= 0 or math.isinf(value):
+            raise ValueError(f'Measurements must be finite and non-negative, received {value}.')
+
+        return value
+
+    @staticmethod
+    def _timestamp(timestamp):
+        return time.monotonic() if timestamp is None else timestamp
+
+    def push(self, value, timestamp=None):
+        """
+        Set the latest measurement.
+
+        Safe to call from any thread. The measurement is used from the next read of the module's state or step on.
+
+        Parameters
+        ----------
+        value : float
+            Measurement, e.g. the current load of a sink. Must be finite and non-negative.
+
+        timestamp : float or None, default None
+            Time of the measurement. If None, uses ``time.monotonic()``.
+
+        Raises
+        ------
+        ValueError
+            If ``value`` is negative or not finite.
+
+        """
+        value = self._check_value(value)
+        timestamp = self._timestamp(timestamp)
+
+        with self._lock:
+            self._value, self._push_time = value, timestamp
+
+    def update(self, external_energy_change, as_source=False, as_sink=False):
+        assert as_source and self.is_source or as_sink and self.is_sink, \
+            f'step() was called as a {"source" if as_source else "sink"} for module {self}, which is not.'
+
+        energy = self.current_value
+        info = {'provided_energy': energy} if as_source else {'absorbed_energy': energy}
+
+        return 0.0, self._done(), info
+
+    def _done(self):
+        return False
+
+    def sample_action(self, strict_bound=False):
+        return np.array([])
+
+    def _state_dict(self):
+        return {f'{self.state_components[0]}_current': self.current_obs[0]}
+
+    def serializable_state_attributes(self):
+        return ["_current_step", "_value", "_push_time"]
+
+    def restore(self, snapshot):
+        with self._lock:
+            super().restore(snapshot)
+
+    @property
+    def current_value(self):
+        """
+        Latest measurement.
+
+        Returns
+        -------
+        value : float
+            The measurement.
+
+        """
+        return self._value
+
+    @property
+    def push_time(self):
+        """
+        Time of the latest call to :meth:`.push`.
+
+        Returns
+        -------
+        push_time : float or None
+            Timestamp passed to -- or set by -- :meth:`.push`. None if no measurement was pushed.
+
+        """
+        with self._lock:
+            return self._push_time
+
+    @property
+    def current_obs(self):
+        """
+        Current observation.
+
+        Returns
+        -------
+        obs : np.ndarray, shape (1, )
+            The latest measurement; negative if the module is a sink.
+
+        """
+        return np.array([self._value if self.is_source else -self._value])
+
+    @property
+    def min_obs(self):
+        return np.array([0.0 if self.is_source else -float(self.rating)])
+
+    @property
+    def max_obs(self):
+        return np.array([float(self.rating) if self.is_source else 0.0])
+
+    @property
+    def min_act(self):
+        return np.array([])
+
+    @property
+    def max_act(self):
+        return np.array([])
+
+    @property
+    def max_production(self):
+        return self.current_value if self.is_source else 0.0
+
+    @property
+    def max_consumption(self):
+        return self.current_value if self.is_sink else 0.0
@@ -0,0 +1 @@
+from .compact_series import CompactSeries, ConstantSeries, PiecewiseConstantSeries, PeriodicSeries
@@ -2,7 +2,9 @@ import numpy as np
 
 from pymgrid.microgrid import DEFAULT_HORIZON
 from pymgrid.modules.base import BaseMicrogridModule
+from pymgrid.modules.base.timeseries.compact_series import CompactSeries
 from pymgrid.forecast.forecaster import get_forecaster, OracleForecaster, NoForecaster
+from pymgrid.utils.rng import as_seed_sequence
 
 
 class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
@@ -19,6 +21,15 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
         The state components.
     """
 
+    _snapshot_attributes = (
+        *BaseMicrogridModule._snapshot_attributes,
+        '_final_step',
+        '_current_forecast',
+        '_current_forecast_step',
+        '_forecast_tensor',
+        '_forecast_tensor_start'
+    )
+
     def __init__(self,
                  time_series,
                  raise_errors,
@@ -43,7 +54,7 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
         self._forecaster = get_forecaster(forecaster,
                                           self._get_observation_spaces(),
                                           forecast_shape=(self.forecast_horizon, len(self.state_components)),
-                                          time_series=self.time_series[initial_step:self.final_step, :],
+                                          time_series=self._forecaster_time_series(forecaster, initial_step),
                                           increase_uncertainty=forecaster_increase_uncertainty,
                                           relative_noise=forecaster_relative_noise)
 
@@ -55,26 +66,55 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
                          provided_energy_name=provided_energy_name,
                          absorbed_energy_name=absorbed_energy_name)
 
-        self._current_forecast = self.forecast()
+        self._current_forecast = None
+        self._current_forecast_step = None
+        self._precompute_forecasts = False
+        self._forecast_tensor = None
+        self._forecast_tensor_start = None
+
+    def _forecaster_time_series(self, forecaster, initial_step):
+        # Slicing a compact time series materializes it; only forecasters other than NoForecaster use it.
+        if forecaster is None:
+            return None
+
+        return self.time_series[initial_step:self._final_step, :]
 
     def _set_time_series(self, time_series):
-        _time_series = np.array(time_series)
+        if isinstance(time_series, CompactSeries):
+            return self._sign_check(time_series)
+
+        shared = isinstance(time_series, np.ndarray) and not time_series.flags.writeable
+
+        # Read-only arrays are immutable; they are shared instead of copied.
+        _time_series = np.asarray(time_series) if shared else np.array(time_series)
         try:
             shape = (-1, _time_series.shape[1])
         except IndexError:
             shape = (-1, 1)
         _time_series = _time_series.reshape(shape)
         assert len(_time_series) == len(time_series)
-        return self._sign_check(_time_series)
+        _time_series = self._sign_check(_time_series)
+
+        if shared:
+            _time_series.flags.writeable = False
+
+        return _time_series
 
     def _sign_check(self, time_series):
         if self.is_source and self.is_sink:
             return time_series
 
+        if isinstance(time_series, CompactSeries):
+            return time_series.map(self._sign_check)
+
         if not ((np.sign(time_series) <= 0).all() or (np.sign(time_series) >= 0).all()):
             raise ValueError('time_series cannot contain both positive and negative values unless it is both '
                              'a source and a sink.')
 
+        if not time_series.flags.writeable:
+            if self.is_source and (time_series >= 0).all() or not self.is_source and (time_series <= 0).all():
+                return time_series
+
         if self.is_source:
             return np.abs(time_series)
         else:
@@ -100,7 +140,34 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
 
     def _update_step(self, reset=False):
         super()._update_step(reset=reset)
-        self._current_forecast = self.forecast()
+        self._current_forecast_step = None
+
+        if reset:
+            self._forecast_tensor = None
+
+    def seed(self, seed=None):
+        """
+        Seed the module's random number generators, including that of its forecaster.
+
+        Parameters
+        ----------
+        seed : None, int, array-like[int] or np.random.SeedSequence, default None
+            Seed. Independent streams for the module and its forecaster are spawned from it.
+
+        Forecasters set afterwards with :meth:`.set_forecaster` are seeded from the module's generator.
+
+        """
+        module_seed, forecaster_seed = as_seed_sequence(seed).spawn(2)
+        super().seed(module_seed)
+        self._forecaster.seed(forecaster_seed)
+
+    def snapshot(self, include_log=True):
+        return super().snapshot(include_log=include_log), self._forecaster.snapshot()
+
+    def restore(self, snapshot):
+        module_snapshot, forecaster_snapshot = snapshot
+        super().restore(module_snapshot)
+        self._forecaster.restore(forecaster_snapshot)
 
     def forecast(self):
         """
@@ -111,6 +178,10 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
         forecast : None or np.ndarray, shape (n, len(self.state_components))
             The forecasted time series.
         """
+        forecast_tensor = self.forecast_tensor
+        if forecast_tensor is not None and 0 <= self.current_step - self._forecast_tensor_start < len(forecast_tensor):
+            return forecast_tensor[self.current_step - self._forecast_tensor_start]
+
         val_c_n = self.time_series[1+self.current_step:1+self.current_step+self.forecast_horizon, :]
         try:
             val_c = self.time_series[self.current_step, :]
@@ -123,6 +194,78 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
 
         return None if forecast is None else forecast
 
+    @property
+    def current_forecast(self):
+        """
+        Forecast of the module's time series from the current state.
+
+        Computed on first access within a step -- e.g. through :attr:`.state` or :meth:`.state_dict` -- and reused until
+        the step changes; modules whose observations are not read do not forecast. Stepping a module through
+        :meth:`.step` reads its observation after the step; a :class:`.Microgrid` reads them only if it returns them.
+
+        The module's log records the forecasts that were made: forecasts of steps at which the observation was not read
+        are logged as NaN.
+
+        Returns
+        -------
+        forecast : None or np.ndarray, shape (n, len(self.state_components))
+            The forecasted time series.
+
+        """
+        if self._current_forecast_step != self._current_step:
+            self._current_forecast = self.forecast()
+            self._current_forecast_step = self._current_step
+
+        return self._current_forecast
+
+    @property
+    def precompute_forecasts(self):
+        """
+        Whether to forecast every step of an episode at once.
+
+        If True, the forecaster produces the forecasts from every step in ``[initial_step, final_step]`` in one
+        vectorized call after each reset -- see :attr:`.forecast_tensor` -- and the forecast of each step is read from
+        them. Oracle forecasts are then views of the time series; Gaussian noise is drawn for the whole episode at
+        once, and so differs from the noise drawn step by step.
+
+        Returns
+        -------
+        precompute_forecasts : bool
+            Whether forecasts are precomputed.
+
+        """
+        return self._precompute_forecasts
+
+    @precompute_forecasts.setter
+    def precompute_forecasts(self, value):
+        self._precompute_forecasts = bool(value)
+        self._forecast_tensor = None
+        self._current_forecast_step = None
+
+    @property
+    def forecast_tensor(self):
+        """
+        Forecasts from every step of the episode.
+
+        Only available if :attr:`.precompute_forecasts` is True and the module has a forecaster.
+
+        Returns
+        -------
+        forecast_tensor : None or np.ndarray, shape (final_step - initial_step + 1, forecast_horizon, len(state_components))
+            ``forecast_tensor[j]`` is the forecast from step ``initial_step + j``. Must not be modified.
+
+        """
+        if not self._precompute_forecasts or isinstance(self._forecaster, NoForecaster):
+            return None
+
+        if self._forecast_tensor is None:
+            self._forecast_tensor = self._forecaster.forecast_episode(
+                self.time_series, self.initial_step, self.final_step + 1, self.forecast_horizon
+            )
+            self._forecast_tensor_start = self.initial_step
+
+        return self._forecast_tensor
+
     def _done(self):
         return self._current_step >= self._final_step - 1
 
@@ -146,9 +289,16 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
         """
         View of the module's time series.
 
+        A :class:`.CompactSeries` -- e.g. a :class:`.ConstantSeries` -- is kept as it is: indexing it by step
+        returns arrays of only the rows requested, without materializing the full series.
+
+        If a read-only array is passed as the time series, the module's time series is read-only as well, and is shared
+        with copies of the module; it is also shared with the caller unless its sign had to be flipped. Set a new time
+        series rather than modifying it in place.
+
         Returns
         -------
-        time_series : np.ndarray, shape (len(self), len(self.state_components))
+        time_series : np.ndarray or CompactSeries, shape (len(self), len(self.state_components))
             The underlying time series.
 
         """
@@ -160,6 +310,9 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
         self._min_obs, self._max_obs, self._min_act, self._max_act = self._get_bounds()
         self._action_space = self._get_action_spaces(self.normalized_action_bounds)
         self._observation_space = self._get_observation_spaces()
+        self._current_forecast_step = None
+        self._forecast_tensor = None
+        self._cost_version += 1
 
     @property
     def min_obs(self):
@@ -241,9 +394,14 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
         self._forecaster = get_forecaster(forecaster,
                                           self._observation_space,
                                           (self.forecast_horizon, len(self.state_components)),
-                                          self.time_series[self.initial_step:self._final_step, :],
+                                          self._forecaster_time_series(forecaster, self.initial_step),
                                           increase_uncertainty=forecaster_increase_uncertainty,
                                           relative_noise=forecaster_relative_noise)
+        self._current_forecast_step = None
+        self._forecast_tensor = None
+
+        if self._rng is not None:
+            self._forecaster.seed(self._rng.integers(2**63))
 
     @property
     def forecast_horizon(self):
@@ -273,6 +431,8 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
                                                 )
 
         self._forecaster.observation_space = self._observation_space
+        self._current_forecast_step = None
+        self._forecast_tensor = None
 
     @property
     def forecaster_increase_uncertainty(self):
@@ -334,8 +494,20 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
     def _state_dict(self):
         state_dict = dict(zip(self._state_dict_keys['current'], self.current_obs))
 
-        if self._current_forecast is not None:
-            state_dict.update(zip(self._state_dict_keys['forecast'], self._current_forecast.reshape(-1)))
+        current_forecast = self.current_forecast
+        if current_forecast is not None:
+            state_dict.update(zip(self._state_dict_keys['forecast'], current_forecast.reshape(-1)))
+
+        return state_dict
+
+    def _log_state_dict(self):
+        # Forecasts are logged if they were made within the step, e.g. to observe the module, and are NaN otherwise:
+        # forecasting only to log them would defeat lazy forecasting.
+        if self._current_forecast_step == self._current_step or not self._state_dict_keys['forecast']:
+            return self.state_dict()
+
+        state_dict = dict(zip(self._state_dict_keys['current'], self.current_obs))
+        state_dict.update(dict.fromkeys(self._state_dict_keys['forecast'], np.nan))
 
         return state_dict
 
@@ -349,3 +521,10 @@ class BaseTimeSeriesMicrogridModule(BaseMicrogridModule):
 
     def __len__(self):
         return self._time_series.shape[0]
+
+    def __eq__(self, other):
+        if type(self) == type(other):
+            # Forecasts are computed lazily; compare them as if they were not.
+            _ = self.current_forecast, other.current_forecast
+
+        return super().__eq__(other)
@@ -0,0 +1,343 @@
+import inspect
+import operator
+import numpy as np
+import yaml
+
+from copy import copy
+
+
+class CompactSeries(yaml.YAMLObject):
+    """
+    Base class of time series that are indexed by step without being materialized.
+
+    A compact series maps each step to a row of a small table of values, and can be passed as the ``time_series`` of
+    any :class:`.BaseTimeSeriesMicrogridModule`. Indexing and slicing it by step behaves as it would on the
+    equivalent array of shape ``(length, n_components)``, returning arrays of only the rows requested. Memory is
+    proportional to the size of the table, regardless of ``length``.
+
+    Use ``np.asarray(series)`` to materialize the full array.
+
+    """
+
+    yaml_dumper = yaml.SafeDumper
+    yaml_loader = yaml.SafeLoader
+
+    def __init__(self, values, length):
+        length = operator.index(length)
+        if length < 0:
+            raise ValueError('length must be non-negative.')
+
+        self._values = self._as_table(values)
+        self._length = length
+
+    @staticmethod
+    def _as_table(values):
+        values = np.array(values, dtype=float)
+
+        if values.ndim == 1:
+            values = values.reshape((-1, 1))
+
+        if values.ndim != 2 or not len(values):
+            raise ValueError('values must be a non-empty one- or two-dimensional array.')
+
+        values.flags.writeable = False
+        return values
+
+    def _index(self, steps):
+        """
+        Row of :attr:`.values` of each step in ``steps``.
+        """
+        raise NotImplementedError
+
+    def _counts(self):
+        """
+        Number of steps at each row of :attr:`.values`.
+        """
+        raise NotImplementedError
+
+    def map(self, func):
+        """
+        Apply a function to the table of values.
+
+        Parameters
+        ----------
+        func : callable
+            Takes and returns an array of shape ``(n_values, n_components)``. It may change ``n_components``, but
+            not ``n_values``.
+
+        Returns
+        -------
+        series : CompactSeries
+            The series with the transformed values. ``self`` if ``func`` returns the values unchanged.
+
+        """
+        values = func(self._values)
+
+        if values is self._values:
+            return self
+
+        values = self._as_table(values)
+
+        if len(values) != len(self._values):
+            raise ValueError('func must not change the number of values.')
+
+        series = copy(self)
+        series._values = values
+        return series
+
+    @property
+    def values(self):
+        """
+        Table of the distinct values of the series.
+
+        Returns
+        -------
+        values : np.ndarray, shape (n_values, n_components)
+            Read-only table of values.
+
+        """
+        return self._values
+
+    @property
+    def length(self):
+        """
+        Number of steps in the series.
+
+        Returns
+        -------
+        length : int
+            The length.
+
+        """
+        return self._length
+
+    @property
+    def shape(self):
+        return self._length, self._values.shape[1]
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def dtype(self):
+        return self._values.dtype
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, item):
+        if isinstance(item, tuple):
+            if len(item) > 2:
+                raise IndexError(f'too many indices for series: series is 2-dimensional, but {len(item)} were indexed')
+            rows, cols = (*item, slice(None))[:2]
+        else:
+            rows, cols = item, slice(None)
+
+        if isinstance(rows, (int, np.integer)):
+            steps = operator.index(rows)
+            if not -self._length <= steps < self._length:
+                raise IndexError(f'index {rows} is out of bounds for axis 0 with size {self._length}')
+            if steps < 0:
+                steps += self._length
+        elif isinstance(rows, slice):
+            steps = np.arange(*rows.indices(self._length))
+        else:
+            steps = np.asarray(rows)
+            if steps.dtype.kind not in 'iu':
+                raise IndexError('only integers and slices are valid indices of a series.')
+            if ((steps < -self._length) | (steps >= self._length)).any():
+                raise IndexError(f'index {rows} is out of bounds for axis 0 with size {self._length}')
+            steps = steps % max(self._length, 1)
+
+        return self._values[self._index(steps), cols]
+
+    def __array__(self, dtype=None, copy=None):
+        return self._values[self._index(np.arange(self._length))].astype(dtype or self.dtype, copy=False)
+
+    def _reduce(self, name, axis, kwargs):
+        if axis in (0, -2):
+            return getattr(self._values[self._counts() > 0], name)(axis=0, **kwargs)
+        elif axis is None:
+            return getattr(self._values[self._counts() > 0], name)(**kwargs)
+
+        return getattr(np.asarray(self), name)(axis=axis, **kwargs)
+
+    def min(self, axis=None, **kwargs):
+        return self._reduce('min', axis, kwargs)
+
+    def max(self, axis=None, **kwargs):
+        return self._reduce('max', axis, kwargs)
+
+    def mean(self, axis=None):
+        if axis not in (None, 0, -2):
+            return np.asarray(self).mean(axis=axis)
+
+        mean = np.average(self._values, axis=0, weights=self._counts())
+        return mean if axis is not None else mean.mean()
+
+    def new_kwargs(self):
+        params = inspect.signature(self.__init__).parameters
+        return {k: getattr(self, k) for k in params.keys()}
+
+    def __repr__(self):
+        params = {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in self.new_kwargs().items()}
+        formatted_params = ', '.join([f'{p}={v}' for p, v in params.items()])
+        return f'{self.__class__.__name__}({formatted_params})'
+
+    def __eq__(self, other):
+        if type(self) != type(other):
+            return NotImplemented
+
+        return all(np.array_equal(v, other_v) for v, other_v in
+                   zip(self.new_kwargs().values(), other.new_kwargs().values()))
+
+    @classmethod
+    def to_yaml(cls, dumper, data):
+        params = {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in data.new_kwargs().items()}
+        return dumper.represent_mapping(cls.yaml_tag, params, flow_style=cls.yaml_flow_style)
+
+    @classmethod
+    def from_yaml(cls, loader, node):
+        mapping = loader.construct_mapping(node, deep=True)
+        return cls(**mapping)
+
+
+class ConstantSeries(CompactSeries):
+    """
+    A time series with the same value at every step.
+
+    Parameters
+    ----------
+    value : float or array-like, shape (n_components, )
+        Value at every step. An array defines the value of each component, e.g. the import price, export price and
+        CO2 production of a :class:`.GridModule`.
+
+    length : int
+        Number of steps.
+
+    Examples
+    --------
+    >>> series = ConstantSeries([0.3, 0.27, 0.1], 8760)
+    >>> series.shape
+    (8760, 3)
+    >>> series[100]
+    array([0.3 , 0.27, 0.1 ])
+
+    """
+
+    yaml_tag = u"!ConstantSeries"
+
+    def __init__(self, value, length):
+        super().__init__(np.reshape(value, (1, -1)), length)
+
+    def _index(self, steps):
+        if isinstance(steps, int):
+            return 0
+        return np.zeros(np.shape(steps), dtype=np.intp)
+
+    def _counts(self):
+        return np.array([self._length])
+
+    @property
+    def value(self):
+        return self._values[0, 0].item() if self._values.shape[1] == 1 else self._values[0]
+
+
+class PiecewiseConstantSeries(CompactSeries):
+    """
+    A time series that is constant between a sequence of steps, e.g. a tariff schedule.
+
+    Parameters
+    ----------
+    starts : array-like[int], shape (n_values, )
+        First step of each piece. Must be strictly increasing and start at zero.
+
+    values : array-like, shape (n_values, ) or (n_values, n_components)
+        Value of each piece.
+
+    length : int
+        Number of steps.
+
+    Examples
+    --------
+    >>> series = PiecewiseConstantSeries(starts=[0, 7, 19], values=[0.1, 0.3, 0.2], length=24)
+    >>> series[6:9, 0]
+    array([0.1, 0.3, 0.3])
+
+    """
+
+    yaml_tag = u"!PiecewiseConstantSeries"
+
+    def __init__(self, starts, values, length):
+        starts = np.array(starts, dtype=np.int64)
+
+        if starts.ndim != 1 or not len(starts) or starts[0] != 0 or (np.diff(starts) <= 0).any():
+            raise ValueError('starts must be a strictly increasing one-dimensional array starting at zero.')
+
+        super().__init__(values, length)
+
+        if len(starts) != len(self._values):
+            raise ValueError(f'Received {len(starts)} starts and {len(self._values)} values.')
+
+        starts.flags.writeable = False
+        self._starts = starts
+
+    def _index(self, steps):
+        return np.searchsorted(self._starts, steps, side='right') - 1
+
+    def _counts(self):
+        return np.diff(np.clip(np.append(self._starts, self._length), 0, self._length))
+
+    @property
+    def starts(self):
+        return self._starts
+
+
+class PeriodicSeries(CompactSeries):
+    """
+    A time series that repeats a profile, e.g. a daily or weekly profile.
+
+    Parameters
+    ----------
+    profile : array-like, shape (period, ) or (period, n_components)
+        Values over one period; e.g. 24 hourly values for a daily profile, or 168 for a weekly one.
+
+    length : int
+        Number of steps.
+
+    offset : int, default 0
+        Position in the profile of the first step.
+
+    Examples
+    --------
+    >>> series = PeriodicSeries([1., 2., 3.], length=10, offset=1)
+    >>> series[:5, 0]
+    array([2., 3., 1., 2., 3.])
+
+    """
+
+    yaml_tag = u"!PeriodicSeries"
+
+    def __init__(self, profile, length, offset=0):
+        super().__init__(profile, length)
+        self._offset = operator.index(offset) % len(self._values)
+
+    def _index(self, steps):
+        return (steps + self._offset) % len(self._values)
+
+    def _counts(self):
+        period = len(self._values)
+        return self._length // period + ((np.arange(period) - self._offset) % period < self._length % period)
+
+    @property
+    def profile(self):
+        return self._values
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def period(self):
+        return len(self._values)
@@ -81,6 +81,8 @@ class BatteryModule(BaseMicrogridModule):
     yaml_dumper = yaml.SafeDumper
     yaml_loader = yaml.SafeLoader
 
+    _snapshot_attributes = (*BaseMicrogridModule._snapshot_attributes, '_current_charge', '_soc')
+
     def __init__(self,
                  min_capacity,
                  max_capacity,
@@ -254,6 +256,14 @@ class BatteryModule(BaseMicrogridModule):
                     state_dict=self.state_dict()
                     )
 
+    def snapshot(self, include_log=True):
+        return super().snapshot(include_log=include_log), self._battery_transition_model.snapshot()
+
+    def restore(self, snapshot):
+        module_snapshot, transition_model_snapshot = snapshot
+        super().restore(module_snapshot)
+        self._battery_transition_model.restore(transition_model_snapshot)
+
     def _set_min_max_act(self):
         min_act = self.model_transition(-1 * self.max_charge)
         max_act = self.model_transition(self.max_discharge)
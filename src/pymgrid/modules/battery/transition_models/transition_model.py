@@ -80,6 +80,30 @@ class BatteryTransitionModel(yaml.YAMLObject):
         else:
             return external_energy_change * efficiency
 
+    def snapshot(self):
+        """
+        Current dynamic state of the model, e.g. the number of cycles of a decaying battery.
+
+        Returns
+        -------
+        snapshot : dict
+            State to pass to :meth:`.restore`.
+
+        """
+        return self.__dict__.copy()
+
+    def restore(self, snapshot):
+        """
+        Restore the dynamic state of the model.
+
+        Parameters
+        ----------
+        snapshot : dict
+            State returned by :meth:`.snapshot`.
+
+        """
+        self.__dict__.update(snapshot)
+
     def new_kwargs(self):
         params = inspect.signature(self.__init__).parameters
         params = {k: getattr(self, k) for k in params.keys() if k not in ('args', 'kwargs')}
@@ -62,6 +62,14 @@ class GensetModule(BaseMicrogridModule):
 
     _energy_pos = 1
 
+    _snapshot_attributes = (
+        *BaseMicrogridModule._snapshot_attributes,
+        '_current_status',
+        '_goal_status',
+        '_steps_until_up',
+        '_steps_until_down'
+    )
+
     def __init__(self,
                  running_min_production,
                  running_max_production,
@@ -148,6 +156,9 @@ class GensetModule(BaseMicrogridModule):
             this module provided to or absorbed from the microgrid.
 
         """
+        return super().step(action, normalized=normalized)
+
+    def _step(self, action, normalized=True):
         if normalized:
             denormalized = self._action_space.denormalize(action)
         elif self._action_space.clip_vals:
@@ -159,7 +170,7 @@ class GensetModule(BaseMicrogridModule):
 
         assert 0 <= goal_status <= 1
         self.update_status(goal_status)
-        return super().step(denormalized, normalized=False)
+        return super()._step(denormalized, normalized=False)
 
     def get_co2(self, production):
         """
@@ -361,7 +372,7 @@ class GensetModule(BaseMicrogridModule):
             self._update_up_down_times()
 
     def sample_action(self, strict_bound=False, **kwargs):
-        return np.array([np.random.rand(), super().sample_action(strict_bound=strict_bound)])
+        return np.array([self._random(), super().sample_action(strict_bound=strict_bound)])
 
     def _raise_error(self, ask_value, available_value, as_source=False, as_sink=False, lower_bound=False):
         try:
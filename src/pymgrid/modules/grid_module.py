@@ -3,6 +3,7 @@ import yaml
 
 from pymgrid.microgrid import DEFAULT_HORIZON
 from pymgrid.modules.base import BaseTimeSeriesMicrogridModule
+from pymgrid.modules.base.timeseries import CompactSeries
 
 
 class GridModule(BaseTimeSeriesMicrogridModule):
@@ -20,7 +21,7 @@ class GridModule(BaseTimeSeriesMicrogridModule):
     max_export : float
         Maximum export at any time step.
 
-    time_series : array-like, shape (n_features, n_steps), n_features = {3, 4}
+    time_series : array-like or CompactSeries, shape (n_features, n_steps), n_features = {3, 4}
         If n_features=3, time series of ``(import_price, export_price, co2_per_kwH)`` in each column, respectively.
         Grid is assumed to have no outages.
         If n_features=4, time series of ``(import_price, export_price, co2_per_kwH, grid_status)``
@@ -74,6 +75,8 @@ class GridModule(BaseTimeSeriesMicrogridModule):
 
     state_components = np.array(['import_price', 'export_price', 'co2_per_kwh', 'grid_status'], dtype=object)
 
+    cost_depends_on_step = True
+
     def __init__(self,
                  max_import,
                  max_export,
@@ -115,6 +118,9 @@ class GridModule(BaseTimeSeriesMicrogridModule):
             raise ValueError('Time series must be two dimensional with three or four columns.'
                              'See docstring for details.')
 
+        if isinstance(time_series, CompactSeries):
+            return self._check_compact_series(time_series)
+
         if time_series.shape[1] == 4:
             if not ((np.array(time_series)[:, -1] == 0) | (np.array(time_series)[:, -1] == 1)).all():
                 raise ValueError("Last column (grid status) must contain binary values.")
@@ -128,6 +134,22 @@ class GridModule(BaseTimeSeriesMicrogridModule):
 
         return time_series
 
+    @staticmethod
+    def _check_compact_series(time_series):
+        # Checks the table of values of the series, and adds a grid status column to it if needed.
+        values = time_series.values
+
+        if values.shape[1] == 4:
+            if not ((values[:, -1] == 0) | (values[:, -1] == 1)).all():
+                raise ValueError("Last column (grid status) must contain binary values.")
+        else:
+            time_series = time_series.map(lambda v: np.c_[v, np.ones(len(v))])
+
+        if (values < 0).any():
+            raise ValueError('Time series must be non-negative.')
+
+        return time_series
+
     def _get_bounds(self):
         min_obs = self._time_series.min(axis=0)
         max_obs = self._time_series.max(axis=0)
@@ -352,7 +374,7 @@ class GridModule(BaseTimeSeriesMicrogridModule):
             True if the grid has outages.
 
         """
-        return self._time_series[:, -1].min() < 1
+        return self._time_series.min(axis=0)[-1] < 1
 
     def __repr__(self):
         return f'GridModule(max_import={self.max_import}, max_export={self.max_export})'
@@ -13,7 +13,7 @@ class LoadModule(BaseTimeSeriesMicrogridModule):
 
     Parameters
     ----------
-    time_series : array-like, shape (n_steps, )
+    time_series : array-like or CompactSeries, shape (n_steps, )
         Time series of load demand.
 
     forecaster : callable, float, "oracle", or None, default None.
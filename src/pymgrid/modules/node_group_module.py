@@ -0,0 +1,252 @@
+import numpy as np
+import yaml
+
+from pymgrid.modules.base import LiveInputModule
+from pymgrid.modules.power_curve import PowerCurve
+
+
+class NodeGroupModule(LiveInputModule):
+    """
+    A group of server nodes, e.g. a rack, modeled as a single sink.
+
+    The group holds a vector with the load of each node and absorbs their total at each step. Loads are set for all
+    nodes at once with :meth:`.update_loads` or :meth:`.update_utilization`, and the load of each node is logged in the
+    group's log entry of each step. Stepping the group costs the same regardless of the number of nodes, in contrast to
+    one :class:`.NodeModule` per node.
+
+    Parameters
+    ----------
+    node_names : list[str]
+        Name of each node.
+
+    initial_loads : float or array-like, shape (n_nodes, ), default 0.0
+        Load of each node before the first update.
+
+    node_rating : float or None, default None
+        Largest load of a node. The group's observations are bounded by ``n_nodes * node_rating``. If None, uses the
+        largest load of ``power_curve``.
+
+    initial_step : int, default 0
+        Initial step.
+
+    normalized_action_bounds : tuple of int or float, default (0, 1).
+        Bounds of normalized actions.
+
+    raise_errors : bool, default False
+        Whether to raise errors if bounds are exceeded in an action.
+
+    power_curve : :class:`.PowerCurve` or None, default None
+        Maps CPU utilization to load in :meth:`.update_utilization`, for every node.
+        If None, uses :meth:`.PowerCurve.poweredge_r660`.
+
+    Examples
+    --------
+    >>> rack = NodeGroupModule(['ES10-1', 'ES10-2', 'ES10-3'])
+    >>> rack.update_utilization([10, 55, 100])
+    >>> rack.loads
+    array([118., 281., 364.])
+    >>> rack.current_load
+    763.0
+
+    """
+
+    module_type = ("node_group", "fixed")
+    yaml_tag = "!NodeGroupModule"
+    yaml_dumper = yaml.SafeDumper
+    yaml_loader = yaml.SafeLoader
+
+    state_components = np.array(["node_group"], dtype=object)
+
+    _snapshot_attributes = (*LiveInputModule._snapshot_attributes, '_loads')
+
+    def __init__(
+        self,
+        node_names,
+        initial_loads=0.0,
+        node_rating=None,
+        initial_step=0,
+        normalized_action_bounds=(0, 1),
+        raise_errors=False,
+        power_curve=None,
+    ):
+        self._node_names = list(node_names)
+
+        if not self._node_names:
+            raise ValueError('node_names must not be empty.')
+
+        self._power_curve = power_curve if power_curve is not None else PowerCurve.poweredge_r660()
+        self._node_rating = node_rating if node_rating is not None else self._power_curve.max_watts
+        self._load_keys = [f'load_{name}' for name in self._node_names]
+
+        self.initial_loads = initial_loads
+        self._loads = self._check_loads(initial_loads)
+
+        super().__init__(
+            len(self._node_names) * self._node_rating,
+            initial_value=self._total(self._loads),
+            initial_step=initial_step,
+            normalized_action_bounds=normalized_action_bounds,
+            raise_errors=raise_errors,
+            provided_energy_name=None,
+            absorbed_energy_name="load_met",
+        )
+
+    def _check_loads(self, loads):
+        loads = np.array(np.broadcast_to(np.asarray(loads, dtype=float), (len(self._node_names), )))
+
+        if not np.isfinite(loads).all() or (loads < 0).any():
+            raise ValueError('Node loads must be finite and non-negative.')
+
+        loads.flags.writeable = False
+        return loads
+
+    @staticmethod
+    def _total(loads):
+        # Summed in order, as a microgrid sums the loads of separate node modules.
+        return sum(loads.tolist(), 0.0)
+
+    def push(self, value, timestamp=None):
+        """
+        Set the load of every node.
+
+        Safe to call from any thread.
+
+        Parameters
+        ----------
+        value : float or array-like, shape (n_nodes, )
+            Load of each node, aligned with :attr:`.node_names`. Must be finite and non-negative.
+
+        timestamp : float or None, default None
+            Time of the measurement. If None, uses ``time.monotonic()``.
+
+        Raises
+        ------
+        ValueError
+            If a load is negative or not finite.
+
+        """
+        loads = self._check_loads(value)
+        total = self._total(loads)
+        timestamp = self._timestamp(timestamp)
+
+        with self._lock:
+            self._loads, self._value, self._push_time = loads, total, timestamp
+
+    def update_loads(self, loads):
+        """
+        Set the load of every node. Equivalent to :meth:`.push`.
+
+        Parameters
+        ----------
+        loads : float or array-like, shape (n_nodes, )
+            Load of each node, aligned with :attr:`.node_names`.
+
+        """
+        self.push(loads)
+
+    def update_utilization(self, utilization):
+        """
+        Set the load of every node from its CPU utilization.
+
+        Parameters
+        ----------
+        utilization : float or array-like, shape (n_nodes, )
+            CPU utilization of each node in percent, aligned with :attr:`.node_names`. Converted to loads with
+            :attr:`.power_curve` in a single vectorized call.
+
+        """
+        self.push(self._power_curve(utilization))
+
+    def load_fields(self, loads=None):
+        """
+        Log fields of the load of each node.
+
+        :meta private:
+
+        Parameters
+        ----------
+        loads : array-like or None, default None
+            Loads to log. If None, uses :attr:`.loads`.
+
+        Returns
+        -------
+        fields : dict[str, float]
+            Load of each node, keyed by ``'load_{node_name}'``.
+
+        """
+        return dict(zip(self._load_keys, (self._loads if loads is None else loads).tolist()))
+
+    def update(self, external_energy_change, as_source=False, as_sink=False):
+        assert as_sink, f'step() was called as a source for module {self}, which is not.'
+
+        with self._lock:
+            loads, total = self._loads, self._value
+
+        return 0.0, self._done(), {'absorbed_energy': total, **self.load_fields(loads)}
+
+    def serializable_state_attributes(self):
+        return [*super().serializable_state_attributes(), "_loads"]
+
+    @property
+    def node_names(self):
+        """
+        Name of each node.
+
+        Returns
+        -------
+        node_names : list[str]
+            The names.
+
+        """
+        return self._node_names
+
+    @property
+    def node_rating(self):
+        return self._node_rating
+
+    @property
+    def loads(self):
+        """
+        Current load of each node.
+
+        Returns
+        -------
+        loads : np.ndarray, shape (n_nodes, )
+            Read-only loads, aligned with :attr:`.node_names`.
+
+        """
+        return self._loads
+
+    @property
+    def current_load(self):
+        """
+        Current total load of the nodes.
+
+        Returns
+        -------
+        load : float
+            Current load demand.
+
+        """
+        return self.current_value
+
+    @property
+    def power_curve(self):
+        """
+        Model of the load of each node as a function of its CPU utilization.
+
+        Returns
+        -------
+        power_curve : :class:`.PowerCurve`
+            The power curve.
+
+        """
+        return self._power_curve
+
+    @property
+    def n_nodes(self):
+        return len(self._node_names)
+
+    @property
+    def is_sink(self):
+        return True
@@ -1,47 +1,31 @@
 import numpy as np
 import yaml
 
-from pymgrid.microgrid import DEFAULT_HORIZON
-from pymgrid.modules.base import BaseTimeSeriesMicrogridModule
+from pymgrid.modules.base import LiveInputModule
+from pymgrid.modules.power_curve import PowerCurve
 
 
-class NodeModule(BaseTimeSeriesMicrogridModule):
+class NodeModule(LiveInputModule):
     """
-    A renewable energy module.
+    A server node.
 
-    The classic examples of renewables are photovoltaics (PV) and wind turbines.
+    The node is a fixed sink whose load is measured live: it is set with :meth:`.update_current_load` or
+    :meth:`.update_utilization`, rather than read from a time series.
 
     Parameters
     ----------
-    time_series : array-like, shape (n_steps, )
-        Time series of load demand.
+    initial_load : float
+        Load of the node before the first update.
 
-    forecaster : callable, float, "oracle", or None, default None.
-        Function that gives a forecast n-steps ahead.
+    node_name : str
+        Name of the node.
 
-        * If ``callable``, must take as arguments ``(val_c: float, val_{c+n}: float, n: int)``, where
+    rating : float or None, default None
+        Largest load of the node; defines the bounds of its observations. If None, uses the largest load of
+        ``power_curve``.
 
-          * ``val_c`` is the current value in the time series: ``self.time_series[self.current_step]``
-
-          * ``val_{c+n}`` is the value in the time series n steps in the future
-
-          * n is the number of steps in the future at which we are forecasting.
-
-          The output ``forecast = forecaster(val_c, val_{c+n}, n)`` must have the same sign
-          as the inputs ``val_c`` and ``val_{c+n}``.
-
-        * If ``float``, serves as a standard deviation for a mean-zero gaussian noise function
-          that is added to the true value.
-
-        * If ``"oracle"``, gives a perfect forecast.
-
-        * If ``None``, no forecast.
-
-    forecast_horizon : int.
-        Number of steps in the future to forecast. If forecaster is None, ignored and 0 is returned.
-
-    forecaster_increase_uncertainty : bool, default False
-        Whether to increase uncertainty for farther-out dates if using a GaussianNoiseForecaster. Ignored otherwise.
+    initial_step : int, default 0
+        Initial step.
 
     normalized_action_bounds : tuple of int or float, default (0, 1).
         Bounds of normalized actions.
@@ -51,10 +35,13 @@ class NodeModule(BaseTimeSeriesMicrogridModule):
         Whether to raise errors if bounds are exceeded in an action.
         If False, actions are clipped to the limit possible.
 
+    power_curve : :class:`.PowerCurve` or None, default None
+        Maps CPU utilization to load in :meth:`.update_utilization`.
+        If None, uses :meth:`.PowerCurve.poweredge_r660`.
+
     """
 
     module_type = ("node", "fixed")
-    # module_type = ('node', 'controllable')
     yaml_tag = "!NodeModule"
     yaml_dumper = yaml.SafeDumper
     yaml_loader = yaml.SafeLoader
@@ -63,64 +50,69 @@ class NodeModule(BaseTimeSeriesMicrogridModule):
 
     def __init__(
         self,
-        time_series,
-        load,
+        initial_load,
         node_name,
-        forecaster=None,
-        forecast_horizon=DEFAULT_HORIZON,
-        forecaster_increase_uncertainty=False,
-        forecaster_relative_noise=False,
+        rating=None,
         initial_step=0,
-        final_step=-1,
         normalized_action_bounds=(0, 1),
         raise_errors=False,
+        power_curve=None,
     ):
+        self._node_name = node_name
+        self._power_curve = power_curve if power_curve is not None else PowerCurve.poweredge_r660()
+
         super().__init__(
-            time_series,
-            raise_errors=raise_errors,
-            forecaster=forecaster,
-            forecast_horizon=forecast_horizon,
-            forecaster_increase_uncertainty=forecaster_increase_uncertainty,
-            forecaster_relative_noise=forecaster_relative_noise,
+            rating if rating is not None else self._power_curve.max_watts,
+            initial_value=initial_load,
             initial_step=initial_step,
-            final_step=final_step,
             normalized_action_bounds=normalized_action_bounds,
+            raise_errors=raise_errors,
             provided_energy_name=None,
             absorbed_energy_name="load_met",
         )
-        self._load = load
-        self._node_name = node_name
 
-    def _get_bounds(self):
-        _min_obs, _max_obs, _, _ = super()._get_bounds()
-        return _min_obs, _max_obs, np.array([]), np.array([])
+    def update_current_load(self, load: float):
+        """
+        Set the current load of the node.
 
-    def update(self, external_energy_change, as_source=False, as_sink=False):
-        assert as_sink or external_energy_change == 0.0, (
-            f"step() was called with positive energy (source) for "
-            f"module {self} but module is not a source and "
-            f"can only be called with negative energy."
-        )
+        Safe to call from any thread, see :meth:`.push`.
 
-        info = {"absorbed_energy": self.current_load}
+        Parameters
+        ----------
+        load : float
+            Current load.
 
-        return 0.0, self._done(), info
+        """
+        self.push(load)
 
-    def sample_action(self, strict_bound=False):
-        return np.array([])
+    def update_utilization(self, utilization: float):
+        """
+        Set the current load from the CPU utilization of the node.
 
-    def update_current_load(self, load: float):
-        self._load = load
+        Parameters
+        ----------
+        utilization : float
+            CPU utilization, in percent. Converted to a load with :attr:`.power_curve`.
+
+        """
+        self.push(self._power_curve(utilization).item())
 
     @property
-    def max_consumption(self):
-        return self.current_load
+    def initial_load(self):
+        return self.initial_value
 
-    """
-    This function should be modified in such a way, 
-    that instead of looking at the current timestep, 
-    it simply fetches the latest consumption and returns that.
-    """
+    @property
+    def power_curve(self):
+        """
+        Model of the load of the node as a function of its CPU utilization.
+
+        Returns
+        -------
+        power_curve : :class:`.PowerCurve`
+            The power curve.
+
+        """
+        return self._power_curve
 
     @property
     def current_load(self):
@@ -133,14 +125,12 @@ class NodeModule(BaseTimeSeriesMicrogridModule):
             Current load demand.
 
         """
-        # print(self._time_series[self._current_step].item())
-        # return -1 * self._time_series[self._current_step].item()
-        return self._load
+        return self.current_value
 
     @property
     def is_sink(self):
         return True
-    
+
     @property
     def node_name(self):
         return self._node_name
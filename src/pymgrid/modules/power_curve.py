@@ -0,0 +1,170 @@
+import inspect
+import numpy as np
+import yaml
+
+
+class PowerCurve(yaml.YAMLObject):
+    """
+    A model of the power draw of a server as a function of its CPU utilization.
+
+    The curve is defined by a table of utilization points and the power drawn at each of them, e.g. as given by the
+    Dell Enterprise Infrastructure Planning Tool (EIPT). Calling the curve on an array of utilizations returns the
+    power of each in a single vectorized operation.
+
+    Parameters
+    ----------
+    utilization : array-like, shape (n_points, )
+        Strictly increasing CPU utilization points, in percent.
+
+    watts : array-like, shape (n_points, )
+        Power drawn at each utilization point, in watts.
+
+    idle_watts : float or None, default None
+        Power drawn at zero utilization. If not None and ``utilization`` does not start at zero, a point
+        ``(0, idle_watts)`` is prepended to the table.
+
+    interpolation : {'step', 'linear'}, default 'step'
+        How to evaluate utilizations between points.
+
+        * If ``'step'``, the power of the nearest utilization point is used. On an evenly spaced table, ties are
+          rounded half to even, as with Python's ``round``.
+
+        * If ``'linear'``, the power is linearly interpolated between the two surrounding points.
+
+        In both cases, utilizations outside the table are clipped to its range, and NaN is treated as the lowest point.
+
+    Examples
+    --------
+    >>> curve = PowerCurve.poweredge_r660()
+    >>> curve([0, 12, 47, 100])
+    array([120., 118., 281., 364.])
+    >>> PowerCurve.poweredge_r660(interpolation='linear')([0, 15, 100])
+    array([120., 149., 364.])
+
+    """
+
+    yaml_dumper = yaml.SafeDumper
+    yaml_loader = yaml.SafeLoader
+    yaml_tag = u"!PowerCurve"
+
+    def __init__(self, utilization, watts, idle_watts=None, interpolation='step'):
+        utilization = np.asarray(utilization, dtype=float)
+        watts = np.asarray(watts, dtype=float)
+
+        if utilization.ndim != 1 or utilization.shape != watts.shape or not len(utilization):
+            raise ValueError('utilization and watts must be non-empty one-dimensional arrays of equal length.')
+
+        if (np.diff(utilization) <= 0).any():
+            raise ValueError('utilization must be strictly increasing.')
+
+        if interpolation not in ('step', 'linear'):
+            raise ValueError(f"interpolation must be one of 'step', 'linear', not '{interpolation}'.")
+
+        self.utilization = utilization
+        self.watts = watts
+        self.idle_watts = idle_watts
+        self.interpolation = interpolation
+
+        if idle_watts is not None and utilization[0] > 0:
+            utilization = np.concatenate(([0.0], utilization))
+            watts = np.concatenate(([idle_watts], watts))
+
+        self._points = utilization
+        self._point_watts = watts
+
+        spacing = np.diff(utilization)
+        self._spacing = spacing[0] if len(spacing) and np.allclose(spacing, spacing[0]) else None
+        self._midpoints = (utilization[1:] + utilization[:-1]) / 2
+
+    @classmethod
+    def poweredge_r660(cls, interpolation='step', idle_watts=120.0):
+        """
+        Power curve of a Dell PowerEdge R660, per the Dell EIPT.
+
+        The default setting with no additional selected processor and 4 x 32 GB RAM.
+
+        Parameters
+        ----------
+        interpolation : {'step', 'linear'}, default 'step'
+            How to evaluate utilizations between points.
+
+        idle_watts : float, default 120.0
+            Power drawn at zero utilization.
+
+        Returns
+        -------
+        PowerCurve
+            The power curve.
+
+        """
+        return cls(
+            utilization=np.arange(10, 101, 10),
+            watts=[118, 180, 203, 258, 281, 303, 331, 349, 362, 364],
+            idle_watts=idle_watts,
+            interpolation=interpolation
+        )
+
+    @property
+    def max_watts(self):
+        """
+        Largest power drawn at any utilization.
+
+        Returns
+        -------
+        max_watts : float
+            The largest power, in watts.
+
+        """
+        return self._point_watts.max().item()
+
+    def __call__(self, utilization):
+        """
+        Power drawn at each utilization.
+
+        Parameters
+        ----------
+        utilization : float or array-like
+            CPU utilization, in percent.
+
+        Returns
+        -------
+        watts : float or np.ndarray
+            Power drawn, of the same shape as ``utilization``.
+
+        """
+        utilization = np.nan_to_num(np.asarray(utilization, dtype=float), nan=self._points[0])
+
+        if self.interpolation == 'linear':
+            return np.interp(utilization, self._points, self._point_watts)
+
+        if self._spacing is not None:
+            idx = np.rint((utilization - self._points[0]) / self._spacing)
+            idx = np.clip(idx, 0, len(self._points) - 1).astype(np.intp)
+        else:
+            idx = np.searchsorted(self._midpoints, utilization, side='left')
+
+        return self._point_watts[idx]
+
+    def new_kwargs(self):
+        params = inspect.signature(self.__init__).parameters
+        return {k: getattr(self, k) for k in params.keys()}
+
+    def __repr__(self):
+        params = self.new_kwargs()
+        formatted_params = ', '.join([f'{p}={v}' for p, v in params.items()])
+        return f'{self.__class__.__name__}({formatted_params})'
+
+    def __eq__(self, other):
+        if type(self) != type(other):
+            return NotImplemented
+        return repr(self) == repr(other)
+
+    @classmethod
+    def to_yaml(cls, dumper, data):
+        params = {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in data.new_kwargs().items()}
+        return dumper.represent_mapping(cls.yaml_tag, params, flow_style=cls.yaml_flow_style)
+
+    @classmethod
+    def from_yaml(cls, loader, node):
+        mapping = loader.construct_mapping(node, deep=True)
+        return cls(**mapping)
@@ -1,17 +1,44 @@
+from abc import ABC, abstractmethod
 from collections import UserDict
+from collections.abc import Mapping
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
 
 class ModularLogger(UserDict):
-    def __init__(self, *args, **kwargs):
+    """
+    Columnar log of scalar values.
+
+    Each field is stored in a preallocated NumPy array that grows geometrically as values are logged, or -- if a
+    retention is set with :meth:`.set_retention` -- in a fixed-length ring buffer. Integer and boolean fields keep their
+    dtype until a value of a wider type is logged; non-numeric fields are stored as objects.
+
+    Parameters
+    ----------
+    *args, **kwargs
+        Initial fields of the log, as for ``dict``.
+
+    dtype : {np.float64, np.float32}, default np.float64
+        Dtype in which floating point values are stored.
+
+    """
+    _initial_capacity = 64
+
+    def __init__(self, *args, dtype=np.float64, **kwargs):
+        self._float_dtype = self._check_float_dtype(dtype)
+        self._counts = {}
+        self._maxlen = None
+        self._eviction_sink = None
+
         super().__init__(*args, **kwargs)
-        self._log_length = max(len(v) for _, v in self.items()) if len(self.data) else 0
+        self._log_length = max(self._counts.values(), default=0)
 
     def flush(self):
-        d = self.data.copy()
-        self.clear()
+        d = self.to_dict()
+        self.data = {}
+        self._counts = {}
         self._log_length = 0
         return d
 
@@ -22,33 +49,425 @@ class ModularLogger(UserDict):
 
             log_dict = log_items
 
+        evicted, evicted_index = {}, None
+
         for key, value in log_dict.items():
-            if key not in self:
-                self[key] = []
+            if getattr(value, 'ndim', 0):
+                try:
+                    value = value.item()
+                except ValueError:
+                    raise ValueError('Only scalar values can be logged.')
+
+            count = self._counts.get(key, 0)
 
             try:
-                self[key].append(value.item())
-            except AttributeError:
-                self[key].append(value)
-            except ValueError:
-                raise ValueError('Only scalar values can be logged.')
+                buffer = self.data[key]
+            except KeyError:
+                buffer = self.data[key] = self._empty(value, self._maxlen or self._initial_capacity)
+
+            if self._maxlen is None:
+                pos = count
+
+                if count == len(buffer):
+                    buffer = self.data[key] = np.concatenate((buffer, np.empty_like(buffer)))
+            else:
+                pos = count % self._maxlen
+
+                if count >= self._maxlen:
+                    evicted[key] = buffer[pos]
+                    evicted_index = count - self._maxlen
+
+            self._store(key, pos, value)
+            self._counts[key] = count + 1
+
+        if evicted and self._eviction_sink is not None:
+            self._eviction_sink.append(evicted, index=evicted_index)
 
         self._log_length += 1
 
-    def to_dict(self):
-        return self.data.copy()
+    def log_columns(self, log_dict=None, **log_items):
+        """
+        Log several rows at once.
+
+        Equivalent to logging each row with :meth:`.log`, in order, but each field is stored with a single vectorized
+        write.
+
+        Parameters
+        ----------
+        log_dict : dict[str, array-like] or None, default None
+            Values of each field, one per row. Scalar values are logged in every row.
+
+        **log_items
+            Values of each field, if ``log_dict`` is not passed.
+
+        """
+        if log_items:
+            if log_dict:
+                raise TypeError('Cannot pass both positional and keyword arguments.')
+
+            log_dict = log_items
+
+        columns = {key: np.asarray(values) for key, values in log_dict.items()}
+        n_rows = max((len(values) for values in columns.values() if values.ndim), default=1)
+
+        try:
+            columns = {key: np.broadcast_to(values, (n_rows, )) for key, values in columns.items()}
+        except ValueError:
+            raise ValueError('Only scalar values or one-dimensional values of equal length can be logged.')
+
+        evicted = {}
+
+        for key, values in columns.items():
+            count = self._counts.get(key, 0)
+
+            try:
+                buffer = self.data[key]
+            except KeyError:
+                capacity = self._maxlen or max(self._initial_capacity, n_rows)
+                buffer = self.data[key] = self._empty(values, capacity)
+
+            if self._maxlen is None:
+                if count + n_rows > len(buffer):
+                    capacity = len(buffer)
+                    while capacity < count + n_rows:
+                        capacity *= 2
+
+                    grown = np.empty(capacity, dtype=buffer.dtype)
+                    grown[:count] = buffer[:count]
+                    buffer = self.data[key] = grown
+
+                self._store(key, slice(count, count + n_rows), values)
+            else:
+                first_retained = max(count - self._maxlen, 0)
+                n_evicted = max(count + n_rows - self._maxlen, 0) - first_retained
+
+                if n_evicted:
+                    logged = self._window(key) if count else values[:0]
+                    retained = np.concatenate((logged, values))
+                    for j, value in enumerate(retained[:n_evicted], start=first_retained):
+                        evicted.setdefault(j, {})[key] = value
+
+                values = values[-self._maxlen:]
+                positions = np.arange(count + n_rows - len(values), count + n_rows) % self._maxlen
+                self._store(key, positions, values)
+
+            self._counts[key] = count + n_rows
+
+        if self._eviction_sink is not None:
+            for index in sorted(evicted):
+                self._eviction_sink.append(evicted[index], index=index)
+
+        self._log_length += n_rows
+
+    def _empty(self, value, capacity):
+        kind = self._kind(value)
+
+        if kind == 'f':
+            dtype = self._float_dtype
+        elif kind in 'biu':
+            dtype = np.result_type(value)
+        else:
+            dtype = np.dtype(object)
+
+        return np.empty(capacity, dtype=dtype)
+
+    def _store(self, key, pos, value):
+        buffer = self.data[key]
+
+        if buffer.dtype.kind != 'O':
+            kind = self._kind(value)
+
+            if kind not in 'biuf':
+                buffer = self.data[key] = buffer.astype(object)
+            elif kind == 'f' and buffer.dtype.kind != 'f':
+                buffer = self.data[key] = buffer.astype(self._float_dtype)
+            elif kind in 'iu' and buffer.dtype.kind == 'b':
+                buffer = self.data[key] = buffer.astype(np.result_type(value))
+
+        buffer[pos] = value
+
+    @staticmethod
+    def _kind(value):
+        try:
+            return value.dtype.kind
+        except AttributeError:
+            pass
+
+        if isinstance(value, bool):
+            return 'b'
+        elif isinstance(value, int):
+            return 'i'
+        elif isinstance(value, float):
+            return 'f'
+
+        return 'O'
+
+    @staticmethod
+    def _check_float_dtype(dtype):
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float64, np.float32):
+            raise ValueError(f'dtype must be float64 or float32, not {dtype}.')
+
+        return dtype
+
+    def _set_values(self, key, values):
+        values = list(values.values() if isinstance(values, Mapping) else values)
+        count = len(values)
+
+        if self._maxlen is None:
+            retained, start = values, 0
+            capacity = max(self._initial_capacity, count)
+        else:
+            retained = values[-self._maxlen:]
+            start, capacity = count - len(retained), self._maxlen
+
+        self.data[key] = self._empty(retained[0] if retained else 0.0, capacity)
+
+        # Place values where they would be had they been logged one at a time.
+        for j, value in enumerate(retained, start=start):
+            self._store(key, j % capacity, value)
+
+        self._counts[key] = count
+
+    def _window(self, key, copy=False):
+        buffer, count = self.data[key], self._counts[key]
+
+        if self._maxlen is not None:
+            # Logging overwrites a ring buffer in place, so windows of it are always copies.
+            if count <= self._maxlen:
+                return buffer[:count].copy()
+
+            pos = count % self._maxlen
+            return np.concatenate((buffer[pos:], buffer[:pos]))
+
+        if copy:
+            return buffer[:count].copy()
+
+        # Views are read-only: restoring a snapshot and logging overwrites the buffer.
+        window = buffer[:count]
+        window.flags.writeable = False
+        return window
+
+    def set_retention(self, maxlen, eviction_sink=None):
+        """
+        Retain only the most recently logged values.
+
+        Each field is stored in a preallocated ring buffer of length ``maxlen``; once it is full, logging a new value
+        overwrites the oldest one. Values that are already logged are kept, up to the last ``maxlen`` of each field.
+
+        Parameters
+        ----------
+        maxlen : int or None
+            Number of values to retain for each field. If None, the full log is retained.
+
+        eviction_sink : :class:`.LogSink` or None, default None
+            Sink to append rows to as they are overwritten. Rows are indexed by the number of rows logged before them.
+            Ignored if ``maxlen`` is None.
+
+        """
+        if maxlen is not None and (int(maxlen) != maxlen or maxlen < 1):
+            raise ValueError('maxlen must be a positive integer or None.')
+
+        if eviction_sink is not None and not callable(getattr(eviction_sink, 'append', None)):
+            raise TypeError(f'eviction_sink must be a LogSink, not {type(eviction_sink).__name__}.')
+
+        log = self.to_dict(copy=False)
+
+        self._maxlen = None if maxlen is None else int(maxlen)
+        self._eviction_sink = None if maxlen is None else eviction_sink
+        self.data = {}
+        self._counts = {}
+
+        for key, values in log.items():
+            self._set_values(key, values)
+
+        if self._maxlen is None:
+            self._log_length = max(self._counts.values(), default=0)
+
+    def snapshot(self):
+        """
+        Current length of the log, to truncate it to later.
+
+        Returns
+        -------
+        snapshot : tuple
+            State to pass to :meth:`.restore`.
+
+        """
+        return self._counts.copy(), self._log_length
+
+    def restore(self, snapshot):
+        """
+        Truncate the log to its length at a snapshot, dropping the rows logged since.
+
+        Rows that were already appended to a sink are not removed from it. Values logged after the restore overwrite
+        the dropped rows in the log's buffers, and so in read-only views returned with ``copy=False``.
+
+        Parameters
+        ----------
+        snapshot : tuple
+            State returned by :meth:`.snapshot`.
+
+        Raises
+        ------
+        ValueError
+            If rows of the snapshot are no longer in the log, e.g. because the log was flushed or rows were overwritten
+            in its ring buffer.
+
+        """
+        counts, log_length = snapshot
+
+        if any(self._counts.get(key, -1) < count for key, count in counts.items()):
+            raise ValueError('Cannot restore a log snapshot: the log was flushed since the snapshot.')
+
+        if self._maxlen is not None and self._log_length > max(log_length, self._maxlen):
+            raise ValueError('Cannot restore a log snapshot: rows of the snapshot were overwritten in the ring buffer.')
+
+        self.data = {key: buffer for key, buffer in self.data.items() if key in counts}
+        self._counts = counts.copy()
+        self._log_length = log_length
+
+    @property
+    def maxlen(self):
+        """
+        Number of values retained for each field.
+
+        Returns
+        -------
+        maxlen : int or None
+            The retention set with :meth:`.set_retention`, or None if the full log is retained.
+
+        """
+        return self._maxlen
+
+    def set_dtype(self, dtype):
+        """
+        Set the dtype in which floating point values are stored.
+
+        Parameters
+        ----------
+        dtype : {np.float64, np.float32}
+            Floating point dtype. Fields that are already logged are converted.
+
+        """
+        self._float_dtype = self._check_float_dtype(dtype)
+        self.data = {
+            key: buffer.astype(self._float_dtype) if buffer.dtype.kind == 'f' else buffer
+            for key, buffer in self.data.items()
+        }
+
+    @property
+    def dtype(self):
+        """
+        Dtype in which floating point values are stored.
+
+        Returns
+        -------
+        dtype : np.dtype
+            Floating point dtype.
+
+        """
+        return self._float_dtype
+
+    def last(self, n=None):
+        """
+        Most recently logged values of each field.
+
+        Parameters
+        ----------
+        n : int or None, default None
+            Number of values to return. If None, returns the last value of each field itself.
+
+        Returns
+        -------
+        last : dict
+            Last value, or array of the last ``n`` values, of each field.
+
+        """
+        if n is not None:
+            return {k: self._window(k)[-n:] for k in self.data.keys()}
+
+        if self._maxlen is None:
+            return {k: v[self._counts[k] - 1] for k, v in self.data.items()}
+
+        return {k: v[(self._counts[k] - 1) % self._maxlen] for k, v in self.data.items()}
+
+    def to_dict(self, copy=True):
+        """
+        Logged values of each field.
+
+        Parameters
+        ----------
+        copy : bool, default True
+            Whether to return arrays that own their data. If False, returns read-only views of the log's buffers, which
+            change if values are logged after a :meth:`.restore`. Ignored if a retention is set with
+            :meth:`.set_retention`; values are then always copied.
+
+        Returns
+        -------
+        log : dict[str, np.ndarray]
+            Values of each field.
+
+        """
+        return {k: self._window(k, copy=copy) for k in self.data.keys()}
 
     def raw(self):
-        return {k: list(map(float, v)) for k, v in self.data.items()}
+        return {k: list(map(float, v)) for k, v in self.to_dict(copy=False).items()}
+
+    def to_frame(self, copy=True):
+        """
+        Log as a DataFrame.
 
-    def to_frame(self):
-        return pd.DataFrame(self.data)
+        Parameters
+        ----------
+        copy : bool, default True
+            Whether the frame owns its data. If False, its columns are read-only views of the log's buffers. See
+            :meth:`.to_dict`.
+
+        Returns
+        -------
+        log : pd.DataFrame
+            The log.
+
+        """
+        return pd.DataFrame(self.to_dict(copy=copy), copy=False)
 
     def serialize(self, key):
         return {key: self.to_frame()} if len(self) > 0 else {}
 
+    def __getitem__(self, key):
+        if key not in self.data:
+            return super().__getitem__(key)
+
+        return self._window(key)
+
+    def __setitem__(self, key, values):
+        self._set_values(key, values)
+
+    def __delitem__(self, key):
+        del self.data[key]
+        del self._counts[key]
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+
+        if set(self.data) != set(other.keys()):
+            return False
+
+        return all(pd.Series(self[key], dtype=object).equals(pd.Series(other[key], dtype=object)) for key in self.keys())
+
     def __len__(self):
-        return self._log_length
+        if self._maxlen is None:
+            return self._log_length
+
+        return min(self._log_length, self._maxlen)
+
+    def __getstate__(self):
+        # Sinks hold external resources; copies of a logger do not append to the original's sink.
+        state = self.__dict__.copy()
+        state['_eviction_sink'] = None
+        return state
 
     @classmethod
     def from_raw(cls, raw):
@@ -57,3 +476,195 @@ class ModularLogger(UserDict):
         elif isinstance(raw, str):
             raw = pd.read_csv(raw).to_dict()
         return cls(raw)
+
+
+class _EvictedRows:
+    """
+    Merges the partial rows evicted by several loggers into complete rows.
+    """
+    def __init__(self):
+        self.rows = {}
+
+    def for_logger(self, to_column, group=0):
+        return _EvictedRowsAppender(self, to_column, group)
+
+    def pop(self):
+        rows, self.rows = self.rows, {}
+
+        for index in sorted(rows):
+            row = sorted(rows[index].items(), key=lambda item: (item[0][0], item[0][1] if item[0][0] == 0 else ()))
+            yield index, {column: value for (_, column), value in row}
+
+
+class _EvictedRowsAppender:
+    def __init__(self, evicted_rows, to_column, group):
+        self.evicted_rows = evicted_rows
+        self.to_column = to_column
+        self.group = group
+
+    def append(self, row, index=None):
+        pending = self.evicted_rows.rows.setdefault(index, {})
+        for key, value in row.items():
+            pending[(self.group, self.to_column(key))] = value
+
+
+class LogSink(ABC):
+    """
+    Append-only destination for newly logged rows.
+
+    Rows are buffered and written in batches of ``batch_size``; rows that were already written are never rewritten.
+    Call :meth:`.flush` to write any buffered rows, and :meth:`.close` once no more rows will be appended.
+
+    Parameters
+    ----------
+    batch_size : int, default 1
+        Number of rows to buffer before writing them.
+
+    """
+    def __init__(self, batch_size=1):
+        if batch_size < 1:
+            raise ValueError('batch_size must be a positive integer.')
+
+        self.batch_size = batch_size
+        self._rows = []
+        self._index = []
+        self._columns = None
+        self.n_written = 0
+
+    def append(self, row, index=None):
+        """
+        Append a single row.
+
+        Parameters
+        ----------
+        row : dict
+            Mapping of column names to scalar values.
+        index : int or None, default None
+            Index of the row. If None, uses the number of rows appended so far.
+
+        """
+        self._rows.append(row)
+        self._index.append(self.n_written + len(self._index) if index is None else index)
+
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered rows.
+        """
+        if not self._rows:
+            return
+
+        frame = pd.DataFrame.from_records(self._rows, index=self._index)
+
+        if self._columns is None:
+            self._columns = frame.columns.to_list()
+        else:
+            frame = frame.reindex(columns=self._columns)
+
+        if all(isinstance(col, tuple) for col in self._columns):
+            frame.columns = pd.MultiIndex.from_tuples(self._columns)
+
+        self._write(frame, header=(self.n_written == 0))
+
+        self.n_written += len(self._rows)
+        self._rows.clear()
+        self._index.clear()
+
+    def close(self):
+        """
+        Write all buffered rows and release any resources held by the sink.
+        """
+        self.flush()
+
+    @abstractmethod
+    def _write(self, frame, header):
+        pass
+
+    def __len__(self):
+        return self.n_written + len(self._rows)
+
+
+class CSVLogSink(LogSink):
+    """
+    Log sink that appends rows to a CSV file.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path of the CSV file.
+    batch_size : int, default 1
+        Number of rows to buffer before appending them to the file.
+    overwrite : bool, default False
+        Whether to truncate an existing file. Otherwise, rows are appended to it.
+    index : bool, default False
+        Whether to write the row index.
+
+    """
+    def __init__(self, path, batch_size=1, overwrite=False, index=False):
+        super().__init__(batch_size=batch_size)
+        self.path = Path(path)
+        self.index = index
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if overwrite and self.path.exists():
+            self.path.unlink()
+
+    def _write(self, frame, header):
+        header = header and (not self.path.exists() or self.path.stat().st_size == 0)
+        frame.to_csv(self.path, mode='a', header=header, index=self.index)
+
+
+class ParquetLogSink(LogSink):
+    """
+    Log sink that writes each batch of rows as a row group of a Parquet file.
+
+    Requires ``pyarrow``. The file is only complete once :meth:`.close` is called.
+    Column names are flattened by joining tuple components with ``sep``.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path of the Parquet file. An existing file is overwritten.
+    batch_size : int, default 100
+        Number of rows in each row group.
+    sep : str, default '/'
+        Separator used to flatten tuple column names.
+
+    """
+    def __init__(self, path, batch_size=100, sep='/'):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('ParquetLogSink requires pyarrow. Install it with "pip install pyarrow".')
+
+        super().__init__(batch_size=batch_size)
+        self.path = Path(path)
+        self.sep = sep
+        self._pa = pyarrow
+        self._writer = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, frame, header):
+        frame = frame.copy()
+        frame.columns = [
+            self.sep.join(map(str, col)) if isinstance(col, tuple) else str(col) for col in frame.columns.to_flat_index()
+        ]
+        frame = frame.astype({col: np.float64 for col, dtype in frame.dtypes.items() if dtype == object})
+
+        table = self._pa.Table.from_pandas(frame, preserve_index=True)
+
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(self.path, table.schema)
+
+        self._writer.write_table(table)
+
+    def close(self):
+        super().close()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,158 @@
+import math
+import numpy as np
+
+
+def as_seed_sequence(seed=None):
+    """
+    Convert a seed to a :class:`numpy.random.SeedSequence`.
+
+    Parameters
+    ----------
+    seed : None, int, array-like[int] or np.random.SeedSequence, default None
+        Seed. If None, fresh entropy is drawn from the operating system.
+
+    Returns
+    -------
+    seed_sequence : np.random.SeedSequence
+        ``seed`` if it is already a seed sequence; otherwise a new seed sequence.
+
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+
+    return np.random.SeedSequence(seed)
+
+
+def generator_state(rng):
+    """
+    State of a random number generator.
+
+    Parameters
+    ----------
+    rng : np.random.Generator or None
+        Generator.
+
+    Returns
+    -------
+    state : dict or None
+        State of the generator's bit generator, or None if ``rng`` is None.
+
+    """
+    return None if rng is None else rng.bit_generator.state
+
+
+def restore_generator(rng, state):
+    """
+    Set the state of a random number generator.
+
+    Parameters
+    ----------
+    rng : np.random.Generator or None
+        Generator to set the state of, if it has the same kind of bit generator as ``state``.
+
+    state : dict or None
+        State returned by :func:`.generator_state`.
+
+    Returns
+    -------
+    rng : np.random.Generator or None
+        ``rng`` -- or a new generator if ``rng`` cannot hold ``state`` -- with the given state. None if ``state`` is None.
+
+    """
+    if state is None:
+        return None
+
+    if rng is None or type(rng.bit_generator).__name__ != state['bit_generator']:
+        rng = np.random.Generator(getattr(np.random, state['bit_generator'])())
+
+    rng.bit_generator.state = state
+    return rng
+
+
+class NormalStream:
+    """
+    Stream of standard normal variates, drawn from a :class:`numpy.random.Generator` in large blocks.
+
+    Drawing a few values per step from a generator is dominated by call overhead; the stream instead draws
+    ``block_size`` values at once and hands them out in order.
+
+    Parameters
+    ----------
+    seed : None, int, array-like[int] or np.random.SeedSequence, default None
+        Seed of the generator.
+
+    block_size : int, default 65536
+        Number of values to draw from the generator at a time.
+
+    """
+
+    def __init__(self, seed=None, block_size=65536):
+        self.rng = np.random.default_rng(as_seed_sequence(seed))
+        self.block_size = block_size
+
+        self._block = np.empty(0)
+        self._pos = 0
+
+    def standard_normal(self, size):
+        """
+        Next values of the stream.
+
+        Parameters
+        ----------
+        size : int or tuple of int
+            Output shape.
+
+        Returns
+        -------
+        values : np.ndarray
+            Standard normal variates of shape ``size``. A read-only view of the current block.
+
+        """
+        n = math.prod(size) if isinstance(size, (tuple, list)) else int(size)
+
+        if self._pos + n > len(self._block):
+            remainder = self._block[self._pos:]
+            block = self.rng.standard_normal(max(self.block_size, n - len(remainder)))
+            self._block = np.concatenate((remainder, block))
+            self._block.flags.writeable = False
+            self._pos = 0
+
+        values = self._block[self._pos:self._pos + n]
+        self._pos += n
+
+        return values.reshape(size)
+
+    def snapshot(self):
+        """
+        Current state of the stream.
+
+        Returns
+        -------
+        snapshot : tuple
+            State to pass to :meth:`.restore`. Holds the current block by reference; blocks are never modified.
+
+        """
+        return self.rng.bit_generator.state, self._block, self._pos
+
+    def restore(self, snapshot):
+        """
+        Restore the state of the stream.
+
+        Parameters
+        ----------
+        snapshot : tuple
+            State returned by :meth:`.snapshot`.
+
+        """
+        state, self._block, self._pos = snapshot
+        self.rng = restore_generator(self.rng, state)
+
+    def __eq__(self, other):
+        if type(self) != type(other):
+            return NotImplemented
+
+        return self.rng.bit_generator.state == other.rng.bit_generator.state and \
+            np.array_equal(self._block[self._pos:], other._block[other._pos:])
+
+    def __repr__(self):
+        return f'NormalStream(block_size={self.block_size})'
@@ -0,0 +1,90 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    A NumPy array backed by a named block of shared memory.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the array.
+
+    dtype : data-type, default np.float64
+        Dtype of the array.
+
+    name : str or None, default None
+        Name of an existing block to attach to. If None, a new block is created and zeroed; the process that creates
+        the block must unlink it with :meth:`.close`.
+
+    """
+
+    def __init__(self, shape, dtype=np.float64, name=None):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Workers share the resource tracker of the process that created the block, which unlinks it.
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                self.shm = shared_memory.SharedMemory(name=name)
+
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+
+        if name is None:
+            self.array[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """
+        Arguments to attach to the block from another process, with :meth:`.attach`.
+
+        Returns
+        -------
+        spec : tuple
+            Name of the block, and shape and dtype of the array.
+
+        """
+        return self.shm.name, self.array.shape, self.array.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Attach to the block of another shared array.
+
+        Parameters
+        ----------
+        spec : tuple
+            Value returned by :meth:`.spec`.
+
+        Returns
+        -------
+        shared_array : SharedArray
+            Array backed by the same block.
+
+        """
+        name, shape, dtype = spec
+        return cls(shape, dtype=dtype, name=name)
+
+    def close(self, unlink=False):
+        """
+        Release the block.
+
+        Parameters
+        ----------
+        unlink : bool, default False
+            Whether to also destroy the block. Must be done once, by the process that created it.
+
+        """
+        self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
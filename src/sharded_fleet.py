@@ -0,0 +1,311 @@
+import multiprocessing as mp
+import os
+import traceback
+
+import numpy as np
+
+from pymgrid.utils.shared_array import SharedArray
+
+from fleet import FleetSimulator, expand_nodes, group_power_curves, node_modules, node_power
+
+
+SUMMARY_FIELDS = (
+    "soc",
+    "battery_charge",
+    "zone_load",
+    "current_renewable",
+    "reward",
+    "done",
+    "battery_discharge",
+    "battery_charge_amount",
+    "grid_import",
+    "grid_export",
+    "loss_load",
+    "curtailment",
+)
+
+
+def country_prefix(name):
+    """
+    Shard key grouping zones by country, e.g. 'ES10' and 'ES12' both map to 'ES'.
+    """
+    return name[:2]
+
+
+def _worker(connection, microgrids, policy, init_microgrid, node_load_name, n_nodes, node_slice,
+            summary_name, n_zones, zone_slice):
+    node_load = summary = None
+
+    try:
+        if init_microgrid is not None:
+            for microgrid in microgrids.values():
+                init_microgrid(microgrid)
+
+        fleet = FleetSimulator(microgrids)
+        node_load = SharedArray((n_nodes,), name=node_load_name)
+        summary = SharedArray((len(SUMMARY_FIELDS), n_zones), name=summary_name)
+
+        loads = node_load.array[node_slice]
+        out = {field: summary.array[j, zone_slice] for j, field in enumerate(SUMMARY_FIELDS)}
+        connection.send(("ready", None))
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+        return
+
+    try:
+        while True:
+            command = connection.recv()
+            if command is None:
+                break
+
+            try:
+                fleet.update_node_loads(loads)
+                zone_load = fleet.zone_load
+
+                battery_control, grid_control = policy(fleet)
+                reward, done, info = fleet.step(battery_control, grid_control)
+
+                out["soc"][:] = fleet.battery_soc
+                out["battery_charge"][:] = fleet.battery_charge
+                out["zone_load"][:] = zone_load
+                out["current_renewable"][:] = fleet.current_renewable
+                out["reward"][:] = reward
+                out["done"][:] = done
+                out["battery_discharge"][:] = info["battery"]["discharge_amount"]
+                out["battery_charge_amount"][:] = info["battery"]["charge_amount"]
+                out["grid_import"][:] = info["grid"]["grid_import"]
+                out["grid_export"][:] = info["grid"]["grid_export"]
+                out["loss_load"][:] = info["balancing"]["loss_load"]
+                out["curtailment"][:] = info["pv_source"]["curtailment"]
+            except Exception:
+                connection.send(("error", traceback.format_exc()))
+            else:
+                connection.send(("done", None))
+    finally:
+        try:
+            fleet.sync()
+        finally:
+            for microgrid in microgrids.values():
+                for sink in (microgrid.log_sink, microgrid._log_eviction_sink):
+                    if sink is not None:
+                        sink.close()
+
+        loads = out = None
+        node_load.close()
+        summary.close()
+
+
+class ShardedFleet:
+    """
+    Fleet of zone microgrids sharded across a pool of persistent worker processes.
+
+    Zones are grouped by ``shard_key`` -- by default their country prefix -- and the groups are spread over
+    ``n_workers`` processes. Each worker owns a :class:`.FleetSimulator` over its zones for the lifetime of the fleet.
+    Per-step node loads are written to, and per-zone summaries read from, arrays in shared memory; only a short command
+    and acknowledgement are sent over a pipe each step.
+
+    Parameters
+    ----------
+    microgrids : dict[str, pymgrid.Microgrid]
+        Zone microgrids, keyed by zone name. Each is sent to its worker once, at construction.
+
+    policy : callable
+        Called in the workers as ``policy(fleet)`` with the worker's :class:`.FleetSimulator`, after its node loads are
+        updated. Must return the battery and grid controls of the fleet's zones. Must be picklable.
+
+    n_workers : int or None, default None
+        Number of worker processes. If None, uses one per shard up to the number of CPUs.
+
+    shard_key : callable, default country_prefix
+        Maps a zone name to its shard. Zones of a shard always run in the same worker.
+
+    init_microgrid : callable or None, default None
+        Called in the workers on each microgrid before the first step, e.g. to attach log sinks -- which do not survive
+        being sent to a worker. Must be picklable.
+
+    mp_context : str or None, default None
+        Multiprocessing start method. If None, uses the platform default.
+
+    """
+
+    def __init__(self, microgrids, policy, n_workers=None, shard_key=country_prefix, init_microgrid=None,
+                 mp_context=None):
+        shards = {}
+        for name in microgrids:
+            shards.setdefault(shard_key(name), []).append(name)
+
+        if n_workers is None:
+            n_workers = min(len(shards), os.cpu_count() or 1)
+
+        if n_workers < 1:
+            raise ValueError("n_workers must be a positive integer.")
+
+        # Largest shards first, each to the currently least loaded worker.
+        workers = [[] for _ in range(min(n_workers, len(shards)))]
+        for shard in sorted(shards.values(), key=len, reverse=True):
+            min(workers, key=len).extend(shard)
+
+        self.names = np.array([name for worker in workers for name in worker], dtype=object)
+        zone_nodes = [expand_nodes(node_modules(microgrids[name])) for name in self.names]
+        node_counts = [len(nodes) for nodes in zone_nodes]
+        self.node_names = np.array([name for nodes in zone_nodes for name, _, _ in nodes], dtype=object)
+        self._node_index = {name: j for j, name in enumerate(self.node_names)}
+        self._power_curves = group_power_curves([curve for nodes in zone_nodes for _, curve, _ in nodes])
+
+        self._node_load = SharedArray((len(self.node_names),))
+        self._summary = SharedArray((len(SUMMARY_FIELDS), len(self.names)))
+
+        ctx = mp.get_context(mp_context)
+        self._connections = []
+        self._processes = []
+
+        zone_start = node_start = 0
+        for worker in workers:
+            zone_stop = zone_start + len(worker)
+            node_stop = node_start + sum(node_counts[zone_start:zone_stop])
+
+            parent, child = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(
+                    child,
+                    {name: microgrids[name] for name in worker},
+                    policy,
+                    init_microgrid,
+                    self._node_load.name,
+                    len(self.node_names),
+                    slice(node_start, node_stop),
+                    self._summary.name,
+                    len(self.names),
+                    slice(zone_start, zone_stop),
+                ),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+
+            self._connections.append(parent)
+            self._processes.append(process)
+            zone_start, node_start = zone_stop, node_stop
+
+        try:
+            self._gather()
+        except Exception:
+            self.close()
+            raise
+
+    def _gather(self):
+        errors = []
+        for connection in self._connections:
+            status, message = connection.recv()
+            if status == "error":
+                errors.append(message)
+
+        if errors:
+            raise RuntimeError("Error in fleet worker:\n" + "\n".join(errors))
+
+    def update_node_loads(self, loads):
+        """
+        Set the current load of every node.
+
+        Parameters
+        ----------
+        loads : dict[str, float] or array-like, shape (n_nodes, )
+            Node loads, either keyed by node name or aligned with :attr:`.node_names`.
+
+        """
+        if isinstance(loads, dict):
+            loads = [loads[name] for name in self.node_names]
+
+        loads = np.asarray(loads, dtype=float)
+
+        if loads.shape != self._node_load.array.shape:
+            raise ValueError(f"Expected loads of shape {self._node_load.array.shape}, received shape {loads.shape}.")
+
+        self._node_load.array[:] = loads
+
+    def update_node_utilization(self, utilization):
+        """
+        Set the current load of every node from its CPU utilization, through the power curve of each node.
+
+        Parameters
+        ----------
+        utilization : dict[str, float] or array-like, shape (n_nodes, )
+            CPU utilization in percent, either keyed by node name -- nodes that are missing are idle -- or aligned with
+            :attr:`.node_names`.
+
+        """
+        self.update_node_loads(node_power(utilization, self._node_index, self._power_curves))
+
+    def step(self):
+        """
+        Run every zone for a single step, with the controls returned by the policy.
+
+        Returns
+        -------
+        summary : dict[str, np.ndarray]
+            Per-zone arrays aligned with :attr:`.names`, keyed by the names in ``SUMMARY_FIELDS``.
+            ``soc``, ``battery_charge`` and ``current_renewable`` are after the step; the other fields are of the step.
+
+        """
+        for connection in self._connections:
+            connection.send("step")
+
+        self._gather()
+
+        return self.summary
+
+    @property
+    def summary(self):
+        """
+        Per-zone summary of the last step.
+
+        Returns
+        -------
+        summary : dict[str, np.ndarray]
+            Copies of the shared summary arrays, aligned with :attr:`.names`.
+
+        """
+        summary = {field: self._summary.array[j].copy() for j, field in enumerate(SUMMARY_FIELDS)}
+        summary["done"] = summary["done"].astype(bool)
+        return summary
+
+    @property
+    def n_workers(self):
+        return len(self._processes or [])
+
+    def close(self):
+        """
+        Stop the workers and release the shared memory.
+        """
+        if self._processes is None:
+            return
+
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                try:
+                    connection.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+
+        for connection, process in zip(self._connections, self._processes):
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+
+        self._processes = None
+        self._node_load.close(unlink=True)
+        self._summary.close(unlink=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f"ShardedFleet(n_zones={len(self.names)}, n_nodes={len(self.node_names)}, n_workers={self.n_workers})"
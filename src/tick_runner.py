@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+
+
+logger = logging.getLogger(__name__)
+
+
+class TickRunner:
+    """
+    Runs a fetch -> simulate -> publish pipeline on a drift-free, monotonic tick schedule.
+
+    Tick ``k`` fires at ``start + k * period`` on the monotonic clock, where ``period = interval / speedup``, regardless
+    of how long the work of previous ticks took. The three stages run in worker threads and are pipelined: the data of
+    each tick is fetched shortly before its deadline -- so that it includes inputs that arrived during the previous
+    tick -- and the result of tick ``k - 1`` is published while tick ``k`` is simulated.
+
+    If the work of a tick runs past the deadline of the next one, the missed ticks are skipped -- keeping later ticks on
+    the original schedule -- and reported as missed deadlines. The data of the tick that runs next is then fetched
+    again for its own time.
+
+    Parameters
+    ----------
+    fetch : callable
+        Called as ``fetch(tick_time)`` with the wall-clock :class:`datetime` at which the tick fires.
+        Returns the input of ``simulate``. Starts ``fetch_budget`` seconds before the deadline of its tick.
+
+    simulate : callable
+        Called as ``simulate(data)`` with the output of ``fetch``, once per tick and in order.
+        Returns the input of ``publish``.
+
+    publish : callable or None, default None
+        Called as ``publish(result)`` with the output of ``simulate``, concurrently with the next simulation step.
+        At most one publish is in flight at a time.
+
+    interval : float, default 3600.0
+        Simulated seconds per tick.
+
+    speedup : float, default 1.0
+        How many times faster than real time the simulation runs; each tick lasts ``interval / speedup`` seconds.
+
+    fetch_budget : float or None, default None
+        Wall-clock seconds before the deadline of a tick at which its data is fetched. If None, uses twice the duration
+        of the latest fetch, up to one period.
+
+    """
+
+    def __init__(self, fetch, simulate, publish=None, interval=3600.0, speedup=1.0, fetch_budget=None):
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        if speedup <= 0:
+            raise ValueError("speedup must be positive.")
+        if fetch_budget is not None and fetch_budget < 0:
+            raise ValueError("fetch_budget must be non-negative.")
+
+        self.fetch = fetch
+        self.simulate = simulate
+        self.publish = publish
+        self.interval = interval
+        self._speedup = speedup
+        self.fetch_budget = fetch_budget
+
+        self.ticks = 0
+        self.missed_deadlines = 0
+        self.last_lateness = 0.0
+        self._last_fetch_duration = 0.0
+        self._stopped = False
+
+    @property
+    def speedup(self):
+        """
+        How many times faster than real time the simulation runs.
+
+        Returns
+        -------
+        speedup : float
+            The configured speed-up factor.
+
+        """
+        return self._speedup
+
+    @property
+    def period(self):
+        """
+        Wall-clock seconds between ticks.
+
+        Returns
+        -------
+        period : float
+            ``interval / speedup``.
+
+        """
+        return self.interval / self._speedup
+
+    def _fetch_lead(self):
+        if self.fetch_budget is not None:
+            return self.fetch_budget
+
+        return min(2 * self._last_fetch_duration, self.period)
+
+    async def _timed_fetch(self, tick_time):
+        fetch_start = time.monotonic()
+        data = await asyncio.to_thread(self.fetch, tick_time)
+        self._last_fetch_duration = time.monotonic() - fetch_start
+        return data
+
+    def run(self, max_ticks=None):
+        """
+        Run ticks until :meth:`.stop` is called or ``max_ticks`` ticks have run.
+
+        Parameters
+        ----------
+        max_ticks : int or None, default None
+            Number of ticks to run. If None, runs until stopped.
+
+        """
+        asyncio.run(self.run_async(max_ticks=max_ticks))
+
+    def stop(self):
+        """
+        Stop after the current tick.
+        """
+        self._stopped = True
+
+    async def run_async(self, max_ticks=None):
+        """
+        Coroutine version of :meth:`.run`.
+        """
+        loop = asyncio.get_running_loop()
+
+        # The schedule starts once the data of the first tick is in, as later ticks are always prefetched.
+        first = await self._timed_fetch(datetime.now())
+
+        start = loop.time()
+        wall_start = datetime.now() + timedelta(seconds=start - time.monotonic())
+
+        def tick_time(k):
+            return wall_start + timedelta(seconds=k * self.period)
+
+        async def fetch_before_deadline(k):
+            delay = start + k * self.period - self._fetch_lead() - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            return await self._timed_fetch(tick_time(k))
+
+        self._stopped = False
+        k = 0
+        ticks = 0
+        prefetch = loop.create_future()
+        prefetch.set_result(first)
+        publishing = None
+
+        try:
+            while not self._stopped and (max_ticks is None or ticks < max_ticks):
+                deadline = start + k * self.period
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                self.last_lateness = loop.time() - deadline
+
+                data = await prefetch
+                prefetch = asyncio.ensure_future(fetch_before_deadline(k + 1))
+
+                result = await asyncio.to_thread(self.simulate, data)
+
+                if self.publish is not None:
+                    if publishing is not None:
+                        await publishing
+                    publishing = asyncio.ensure_future(asyncio.to_thread(self.publish, result))
+
+                ticks += 1
+                self.ticks += 1
+
+                next_k = max(k + 1, math.floor((loop.time() - start) / self.period) + 1)
+                if next_k > k + 1:
+                    missed = next_k - k - 1
+                    self.missed_deadlines += missed
+                    logger.warning(
+                        f"Tick {k} overran its period of {self.period:.3f}s; skipping {missed} tick(s) "
+                        f"({self.missed_deadlines} missed deadline(s) in total)."
+                    )
+
+                    # The pending data is that of a skipped tick.
+                    prefetch.cancel()
+                    prefetch = asyncio.ensure_future(fetch_before_deadline(next_k))
+
+                k = next_k
+        finally:
+            prefetch.cancel()
+            if publishing is not None:
+                await publishing
+
+    def __repr__(self):
+        return f"TickRunner(interval={self.interval}, speedup={self._speedup}, period={self.period:.3f}s)"